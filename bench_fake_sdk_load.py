@@ -0,0 +1,101 @@
+import sys
+import os
+import time
+import queue
+import tempfile
+import threading
+
+# Ensure project root is in path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Simulated MVS SDK: runs anywhere, no cameras needed (see hardware/fake_mvs.py)
+os.environ["AUTOPHOTE_FAKE_SDK"] = "1"
+
+from hardware import fake_mvs
+import services.capture_manager as capture_manager
+from services.capture_manager import CaptureManager
+
+BATCHES = 5
+PREVIEW_SECONDS = 3
+
+def run_batches(manager, cam_count):
+    """
+    Fire BATCHES save-now batches through CaptureManager and time each one
+    until every camera reported success or error.
+    Returns (times, failures): failures counts camera errors and batches
+    that did not finish.
+    """
+    done = threading.Event()
+    finished = set()
+    failures = 0
+
+    def on_status(index, status):
+        nonlocal failures
+        if status == 4:
+            failures += 1
+        if status in (3, 4):
+            finished.add(index)
+            if len(finished) == cam_count:
+                done.set()
+
+    manager.update_cam_status_callback = on_status
+    times = []
+    for _ in range(BATCHES):
+        finished.clear()
+        done.clear()
+        t0 = time.perf_counter()
+        manager.trigger_batch_capture(save_now=True)
+        if not done.wait(timeout=30):
+            failures += cam_count - len(finished)
+        times.append(time.perf_counter() - t0)
+        time.sleep(1.0)  # Batch ids are per second; keep files distinct
+    return times, failures
+
+def run_preview(manager):
+    counts = {}
+
+    def on_image(index, img):
+        counts[index + 1] = counts.get(index + 1, 0) + 1
+
+    manager.update_cam_image_callback = on_image
+    manager.start_preview()
+    time.sleep(PREVIEW_SECONDS)
+    manager.stop_preview()
+    return {cam_id: n / PREVIEW_SECONDS for cam_id, n in sorted(counts.items())}
+
+def main():
+    sim = fake_mvs.SIM
+    print(f"Simulated {len(sim.camera_ips)} x {sim.width}x{sim.height} {sim.pixel_format}, "
+          f"exposure {sim.exposure_us / 1000:.1f} ms, readout {sim.readout_ms:.0f} ms, "
+          f"link {sim.link_mbps} Mbps, packet loss {sim.packet_loss}")
+
+    with tempfile.TemporaryDirectory() as folder:
+        capture_manager.LOCAL_TEMP_BUFFER = folder
+        uploads = queue.Queue()
+        manager = CaptureManager(uploads)
+        t0 = time.perf_counter()
+        manager.initialize_cameras()
+        print(f"initialize_cameras: {len(manager.cameras)} cameras in {time.perf_counter() - t0:.2f} s")
+        if not manager.cameras:
+            sys.exit(1)
+
+        times, failures = run_batches(manager, len(manager.cameras))
+        expected = BATCHES * len(manager.cameras)
+        queued = uploads.qsize()
+        print(f"batch capture + save: avg {sum(times) / len(times) * 1000:.0f} ms, max {max(times) * 1000:.0f} ms, "
+              f"{queued}/{expected} files queued")
+        if failures or queued < expected:
+            print(f"FAILED: {failures} camera errors, {expected - queued} files missing")
+
+        fps = run_preview(manager)
+        print("preview fps per camera: " + ", ".join(f"CAM{cam_id} {rate:.1f}" for cam_id, rate in fps.items()))
+        for cam in manager.cameras:
+            stats = cam.stream_stats()
+            if stats:
+                print(f"  CAM{cam.camera_id} {stats}")
+        manager.shutdown()
+    # Averages over failed grabs are meaningless: fail the run
+    if failures or queued < expected:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Ensure project root is in path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import CAMERA_COUNT, CAMERA_IPS
+from config import GIGE_LINK_MBPS, GIGE_LINK_UTILIZATION, GIGE_RESEND, GIGE_GVSP_TIMEOUT_MS, GIGE_GVCP_TIMEOUT_MS
+from hardware.hik_camera import HikCamera, HIK_SDK_AVAILABLE
+from hardware.device_registry import DeviceRegistry
+from hardware.transport import GigETransportSettings
+
+BATCHES = 10
+
+def run_batches(hb_transfer):
+    """
+    Connect every configured camera, run BATCHES concurrent software-triggered
+    grabs and return (batch times, per-frame wire bytes, per-frame decode wall ms,
+    per-frame decode CPU ms). Decodes overlap across camera threads, so the
+    wall time includes waiting for a core; the CPU time is the decode cost itself.
+    """
+    registry = DeviceRegistry()
+    if not registry.enumerate():
+        sys.exit(1)
+
+    # Same link sharing as the app, so the wire time (and grab timeout) matches production
+    transport = GigETransportSettings(link_mbps=GIGE_LINK_MBPS, utilization=GIGE_LINK_UTILIZATION,
+                                      resend=GIGE_RESEND, gvsp_timeout_ms=GIGE_GVSP_TIMEOUT_MS,
+                                      gvcp_timeout_ms=GIGE_GVCP_TIMEOUT_MS)
+    cams = [HikCamera(camera_id=i+1, ip_address=CAMERA_IPS.get(i+1, "0.0.0.0"), registry=registry,
+                      transport=transport, hb_transfer=hb_transfer) for i in range(CAMERA_COUNT)]
+    cams = [cam for cam in cams if cam.connect()]
+    if not cams:
+        print("No cameras connected.")
+        sys.exit(1)
+
+    batch_times = []
+    try:
+        with ThreadPoolExecutor(max_workers=len(cams)) as pool:
+            for _ in range(BATCHES):
+                t0 = time.perf_counter()
+                list(pool.map(lambda cam: cam.grab_image(), cams))
+                batch_times.append(time.perf_counter() - t0)
+    finally:
+        for cam in cams:
+            cam.disconnect()
+
+    frames = BATCHES * len(cams)
+    if any(cam.hb_transfer for cam in cams):
+        wire = sum(cam.hb_stats["wire_bytes"] for cam in cams) / frames
+        decode_ms = sum(cam.hb_stats["decode_ms"] for cam in cams) / frames
+        decode_cpu_ms = sum(cam.hb_stats["decode_cpu_ms"] for cam in cams) / frames
+    else:
+        wire = sum(cam.nPayloadSize for cam in cams) / len(cams)
+        decode_ms = decode_cpu_ms = 0.0
+    return batch_times, wire, decode_ms, decode_cpu_ms, len(cams)
+
+def main():
+    if not HIK_SDK_AVAILABLE:
+        print("MVS SDK not available: this benchmark needs the SDK and connected cameras.")
+        sys.exit(1)
+
+    print(f"{'mode':<14}{'cams':>5}{'wire MB/frame':>15}{'decode wall ms':>16}{'decode CPU ms':>15}"
+          f"{'batch ms (avg/max)':>22}")
+    for hb_transfer in (False, True):
+        batch_times, wire, decode_ms, decode_cpu_ms, n = run_batches(hb_transfer)
+        avg = sum(batch_times) / len(batch_times) * 1000
+        print(f"{'HB' if hb_transfer else 'uncompressed':<14}{n:>5}{wire / 1e6:>15.2f}{decode_ms:>16.1f}"
+              f"{decode_cpu_ms:>15.1f}"
+              f"{avg:>14.0f} / {max(batch_times) * 1000:.0f}")
+
+if __name__ == "__main__":
+    main()
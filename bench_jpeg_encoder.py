@@ -0,0 +1,117 @@
+import sys
+import os
+import time
+import subprocess
+import tempfile
+import numpy as np
+from PIL import Image
+
+# Ensure project root is in path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import CAMERA_IPS, CAMERA_WIDTH, CAMERA_HEIGHT, JPEG_QUALITY
+from services.file_service import FileService
+
+Image.MAX_IMAGE_PIXELS = None
+
+RUNS = 5
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process in MB.
+    """
+    if os.name == "nt":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(),
+                                                 ctypes.byref(counters), counters.cb)
+        return counters.PeakWorkingSetSize / 1e6
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+def synthetic_pil(folder):
+    """
+    No SDK: Pillow path on a synthetic Bayer frame. The RGB frame is
+    materialized with a nearest-neighbour demosaic, a stand-in for
+    MV_CC_ConvertPixelType.
+    """
+    raw = np.random.randint(0, 255, (CAMERA_HEIGHT, CAMERA_WIDTH), dtype=np.uint8)
+    times = []
+    for i in range(RUNS):
+        t0 = time.perf_counter()
+        rgb = np.empty((CAMERA_HEIGHT, CAMERA_WIDTH, 3), dtype=np.uint8)
+        rgb[..., 0] = raw[0::2, 0::2].repeat(2, axis=0).repeat(2, axis=1)
+        rgb[..., 1] = raw[:, 1::2].repeat(2, axis=1)
+        rgb[..., 2] = raw[1::2, 1::2].repeat(2, axis=0).repeat(2, axis=1)
+        FileService.save_image(Image.fromarray(rgb), folder, f"pil_{i}.jpg", quality=JPEG_QUALITY)
+        times.append(time.perf_counter() - t0)
+        del rgb
+    return times
+
+def camera_run(mode, folder):
+    """
+    Real camera 1: grab_image + Pillow encode vs SDK encode from the frame buffer.
+    """
+    from hardware.hik_camera import HikCamera
+
+    cam = HikCamera(camera_id=1, ip_address=CAMERA_IPS.get(1, "0.0.0.0"))
+    if not cam.connect():
+        print("Camera 1 did not connect.")
+        sys.exit(1)
+    times = []
+    try:
+        for i in range(RUNS):
+            t0 = time.perf_counter()
+            if mode == "pil":
+                FileService.save_image(cam.grab_image(), folder, f"pil_{i}.jpg", quality=JPEG_QUALITY)
+            else:
+                FileService.save_frame(cam, folder, f"sdk_{i}.jpg", quality=JPEG_QUALITY)
+            times.append(time.perf_counter() - t0)
+    finally:
+        cam.disconnect()
+    return times
+
+def child(mode):
+    from hardware.hik_sdk import HIK_SDK_AVAILABLE
+
+    with tempfile.TemporaryDirectory() as folder:
+        if HIK_SDK_AVAILABLE:
+            times = camera_run(mode, folder)
+        elif mode == "pil":
+            times = synthetic_pil(folder)
+        else:
+            print("n/a")
+            return
+        size = sum(os.path.getsize(os.path.join(folder, f)) for f in os.listdir(folder)) / len(times)
+    print(f"{sum(times) / len(times) * 1000:.0f} {max(times) * 1000:.0f} {peak_rss_mb():.0f} {size / 1e6:.2f}")
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        child(sys.argv[2])
+        return
+
+    print(f"{CAMERA_WIDTH}x{CAMERA_HEIGHT}, JPEG quality {JPEG_QUALITY}, {RUNS} runs per encoder")
+    print(f"{'encoder':<10}{'ms (avg/max)':>16}{'peak RSS MB':>14}{'MB/file':>10}")
+    for mode in ("pil", "sdk"):
+        # Fresh process per encoder so peak RSS is not shared between them
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode],
+                             capture_output=True, text=True).stdout.strip().splitlines()
+        fields = out[-1].split() if out else ["n/a"]
+        if len(fields) != 4:
+            print(f"{mode:<10}{'needs the MVS SDK and camera 1':>40}")
+            continue
+        avg, worst, peak, size = fields
+        print(f"{mode:<10}{avg + ' / ' + worst:>16}{peak:>14}{size:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import sys
+import os
+import time
+import numpy as np
+from PIL import Image
+
+# Ensure project root is in path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import CAMERA_WIDTH, CAMERA_HEIGHT
+from hardware.hik_camera import bayer_superpixel
+
+Image.MAX_IMAGE_PIXELS = None
+
+PixelType_Gvsp_BayerRG8 = 17301513
+RUNS = 5
+
+def convert_and_thumbnail(raw):
+    """
+    Stand-in for the MV_CC_ConvertPixelType + thumbnail preview path:
+    materialize a full-resolution RGB8 frame (nearest-neighbour demosaic,
+    a lower bound for the SDK's interpolation), wrap it in PIL and thumbnail.
+    """
+    h, w = raw.shape
+    rgb = np.empty((h, w, 3), dtype=np.uint8)
+    rgb[0::2, 0::2, 0] = rgb[0::2, 1::2, 0] = rgb[1::2, 0::2, 0] = rgb[1::2, 1::2, 0] = raw[0::2, 0::2]
+    # RGGB: green sits at column 1 on even rows and column 0 on odd rows
+    rgb[0::2, :, 1] = raw[0::2, 1::2].repeat(2, axis=1)
+    rgb[1::2, :, 1] = raw[1::2, 0::2].repeat(2, axis=1)
+    rgb[0::2, 0::2, 2] = rgb[0::2, 1::2, 2] = rgb[1::2, 0::2, 2] = rgb[1::2, 1::2, 2] = raw[1::2, 1::2]
+    img = Image.fromarray(rgb)
+    img.thumbnail((800, 600))
+    return img
+
+def superpixel_and_thumbnail(raw, step):
+    img = Image.fromarray(bayer_superpixel(raw, PixelType_Gvsp_BayerRG8, step))
+    img.thumbnail((800, 600))
+    return img
+
+def bench(name, fn):
+    fn()  # warm-up
+    times = []
+    for _ in range(RUNS):
+        t0 = time.perf_counter()
+        img = fn()
+        times.append(time.perf_counter() - t0)
+    print(f"{name:<32} {min(times) * 1000:8.1f} ms (best of {RUNS})  -> {img.size}")
+
+def main():
+    print(f"Frame: {CAMERA_WIDTH}x{CAMERA_HEIGHT} BayerRG8")
+    raw = np.random.randint(0, 256, (CAMERA_HEIGHT, CAMERA_WIDTH), dtype=np.uint8)
+
+    bench("full RGB convert + thumbnail", lambda: convert_and_thumbnail(raw))
+    bench("superpixel 1/2 + thumbnail", lambda: superpixel_and_thumbnail(raw, 2))
+    bench("superpixel 1/4 + thumbnail", lambda: superpixel_and_thumbnail(raw, 4))
+
+if __name__ == "__main__":
+    main()
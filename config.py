@@ -80,6 +80,80 @@ CAMERA_IPS = {int(k): v for k, v in _raw_ips.items()}
 
 # Hardware Interface Settings
 USE_REAL_CAMERA = True  # Set to True when connecting real cameras
+CAMERA_CONNECT_TIMEOUT = float(_current_settings.get("camera_connect_timeout", 15))  # seconds, per camera (connected in parallel)
+# GigE transport tuning (packet size, inter-packet delay, resend, GVSP/GVCP timeouts)
+GIGE_LINK_MBPS = int(_current_settings.get("gige_link_mbps", 1000))  # Host NIC / switch uplink speed
+GIGE_LINK_UTILIZATION = float(_current_settings.get("gige_link_utilization", 0.9))  # Share of the link cameras may use
+GIGE_RESEND = bool(_current_settings.get("gige_resend", True))
+GIGE_GVSP_TIMEOUT_MS = int(_current_settings.get("gige_gvsp_timeout_ms", 300))
+GIGE_GVCP_TIMEOUT_MS = int(_current_settings.get("gige_gvcp_timeout_ms", 500))
+# Per-camera parameter profiles (MV_CC_FeatureSave/FeatureLoad + UserSet1), keyed by serial
+FEATURE_PROFILES = bool(_current_settings.get("feature_profiles", False))
+FEATURE_PROFILE_DIR = _current_settings.get("feature_profile_dir", os.path.join(BASE_DIR, "camera_profiles"))
+# Lossless HB compressed transfer (decoded on the host with MV_CC_HBDecode)
+HB_TRANSFER = bool(_current_settings.get("hb_transfer", False))
+# Max spread (ms) of staggered software triggers for cameras sharing a NIC; 0 = all at once
+TRIGGER_STAGGER_WINDOW_MS = float(_current_settings.get("trigger_stagger_window_ms", 0))
+# "poll" = GetOneFrameTimeout per grab, "callback" = SDK image callback + mailbox,
+# "ring" = SDK node ring via GetImageBuffer/FreeImageBuffer
+ACQUISITION_MODE = _current_settings.get("acquisition_mode", "poll")
+RING_NODE_COUNT = int(_current_settings.get("ring_node_count", 4))  # SDK buffer nodes per camera (ring mode)
+# Synchronized capture: one GigE action command fires all cameras (needs PTP-capable cameras)
+SYNC_TRIGGER = bool(_current_settings.get("sync_trigger", False))
+ACTION_DEVICE_KEY = int(_current_settings.get("action_device_key", 1))
+ACTION_GROUP_KEY = int(_current_settings.get("action_group_key", 1))
+ACTION_GROUP_MASK = int(_current_settings.get("action_group_mask", 0xFFFFFFFF))
+PREVIEW_DEMOSAIC = _current_settings.get("preview_demosaic", "fast")  # "fast" = NumPy Bayer superpixel, "sdk" = full convert
+PREVIEW_BINNING = int(_current_settings.get("preview_binning", 1))  # 2/4 = binned preview stream, 1 = full resolution
+PREVIEW_FPS = float(_current_settings.get("preview_fps", 5.0))  # Camera-paced free-run preview rate; 0 = camera maximum
+PREVIEW_FPS_PER_CAMERA = {int(k): float(v) for k, v in _current_settings.get("preview_fps_per_camera", {}).items()}  # {cam id: fps}
+# Final-capture Bayer conversion (preview always uses the fastest interpolation, no gamma/CCM)
+BAYER_CVT_QUALITY = int(_current_settings.get("bayer_cvt_quality", 2))  # MV_CC_SetBayerCvtQuality: 0 fast, 1 balanced, 2 optimal
+BAYER_GAMMA = float(_current_settings.get("bayer_gamma", 0.0))  # 0.1..4.0; 0 = off
+BAYER_CCM = [int(x) for x in _current_settings.get("bayer_ccm", [])]  # 9 coefficients, row-major; empty = off
+BAYER_CCM_SCALE = int(_current_settings.get("bayer_ccm_scale", 1024))  # CCM fixed-point scale (power of 2, <= 65536)
+# "pil" = convert to RGB and encode with Pillow, "sdk" = MV_CC_SaveImageToFileEx from the raw frame buffer
+# (used only when nothing has to be drawn or resized: TIMESTAMP_OVERLAY off and resize_ratio 100)
+JPEG_ENCODER = _current_settings.get("jpeg_encoder", "pil")
+TIMESTAMP_OVERLAY = bool(_current_settings.get("timestamp_overlay", True))
+
+# Line-scan cameras (by camera id): a batch capture scans LINE_SCAN_LENGTH lines into JPEG strips
+LINE_SCAN_CAMERAS = [int(x) for x in _current_settings.get("line_scan_cameras", [])]
+LINE_SCAN_LENGTH = int(_current_settings.get("line_scan_length", 20000))  # Lines per scan
+LINE_SCAN_BLOCK_LINES = int(_current_settings.get("line_scan_block_lines", 1024))  # Lines per SDK frame (Height)
+LINE_SCAN_STRIP_LINES = int(_current_settings.get("line_scan_strip_lines", 4096))  # Lines per output JPEG strip
+LINE_SCAN_LINE_RATE = int(_current_settings.get("line_scan_line_rate", 0))  # Hz, free-run; 0 = camera setting
+LINE_SCAN_TRIGGER = _current_settings.get("line_scan_trigger")  # e.g. "Line0" for encoder LineStart, None = free-run
+# GenTL (CoaXPress / CameraLink frame grabbers): these camera ids open through the producer .cti;
+# their CAMERA_IPS entry is the serial number, GenTL device ID or user-defined name
+GENTL_CAMERAS = [int(x) for x in _current_settings.get("gentl_cameras", [])]
+GENTL_CTI_PATH = _current_settings.get("gentl_cti_path", "")  # e.g. ...\Common Files\VisionEye\Runtime\Win64_x64\MvProducerCXP.cti
+# MockCamera (USE_REAL_CAMERA = False): pooled frames + exposure/readout/jitter timing; pool 0 = new noise frame per grab
+MOCK_FRAME_POOL = int(_current_settings.get("mock_frame_pool", 3))
+MOCK_SAMPLE_DIR = _current_settings.get("mock_sample_dir")  # Optional folder of sample JPEGs for the pool
+MOCK_EXPOSURE_MS = float(_current_settings.get("mock_exposure_ms", 10))
+MOCK_READOUT_MS = float(_current_settings.get("mock_readout_ms", 60))
+MOCK_JITTER_MS = float(_current_settings.get("mock_jitter_ms", 5))
+# Simulated MVS SDK (hardware/fake_mvs.py) instead of MvCameraControl.dll, for hardware-free load tests.
+# AUTOPHOTE_FAKE_SDK=1 in the environment overrides the setting.
+FAKE_SDK = os.environ.get("AUTOPHOTE_FAKE_SDK", str(int(bool(_current_settings.get("fake_sdk", False))))) == "1"
+FAKE_SDK_PROFILE = dict(_current_settings.get("fake_sdk_profile", {}))  # SimulationConfig overrides (exposure_us, packet_loss, ...)
+# Multicast preview (GigE): the control station opens cameras with Control access and streams to a group;
+# monitor stations (MONITOR_STATION = True) join read-only and never trigger or write nodes
+MULTICAST_PREVIEW = _current_settings.get("multicast_preview", False)
+MONITOR_STATION = _current_settings.get("monitor_station", False)
+MULTICAST_GROUP = _current_settings.get("multicast_group", "239.192.1.0")  # Base group; camera N streams to .N
+MULTICAST_PORT = int(_current_settings.get("multicast_port", 8787))
+# Clip recorder: preview frames around each trigger saved as CAM<n>_<batch>.avi (SDK recorder, real cameras)
+CLIP_RECORDING = _current_settings.get("clip_recording", False)
+CLIP_PRE_SECONDS = float(_current_settings.get("clip_pre_seconds", 3.0))
+CLIP_POST_SECONDS = float(_current_settings.get("clip_post_seconds", 2.0))
+CLIP_FRAME_BUDGET = int(_current_settings.get("clip_frame_budget", 120))  # Frames held for all cameras together
+CLIP_WIDTH = int(_current_settings.get("clip_width", 640))  # Clip frame width (px); 640 wide is ~0.8 MB per frame
+# Multi-light (time-division) capture: one trigger exposes MULTI_LIGHT_COUNT lighting channels line-interleaved
+# in one frame, split with MV_CC_ReconstructImage and saved as CAM<n>_<batch>_L<k>.jpg
+MULTI_LIGHT_CAMERAS = [int(x) for x in _current_settings.get("multi_light_cameras", [])]
+MULTI_LIGHT_COUNT = int(_current_settings.get("multi_light_count", 2))  # Lights per frame, 2..8 (MV_MAX_SPLIT_NUM)
 
 # UI Settings
 UI_PREVIEW_WIDTH = 360
@@ -0,0 +1,180 @@
+import ctypes
+from hardware.hik_sdk import *
+from utils.logger import setup_logger
+
+logger = setup_logger("DeviceRegistry")
+
+def ip_to_str(nip):
+    """
+    Decode a GigE nCurrentIp / nNetExport (host order uint32) to dotted quad.
+    """
+    return f"{(nip >> 24) & 0xFF}.{(nip >> 16) & 0xFF}.{(nip >> 8) & 0xFF}.{nip & 0xFF}"
+
+def _c_str(arr):
+    """
+    c_ubyte[N] (NUL-padded) -> str
+    """
+    return bytes(arr).split(b"\0", 1)[0].decode("ascii", errors="ignore").strip()
+
+class DeviceEntry:
+    """
+    One enumerated device. `info` is a private copy of MV_CC_DEVICE_INFO, so
+    it stays valid after the SDK's device list is re-enumerated.
+    """
+    def __init__(self, index, info):
+        self.index = index
+        self.info = info
+        self.tlayer_type = info.nTLayerType
+        self.ip = None
+        self.interface_ip = None  # Host NIC the device was found on (GigE only)
+        if info.nTLayerType == MV_GIGE_DEVICE:
+            gige_info = info.SpecialInfo.stGigEInfo
+            self.ip = ip_to_str(gige_info.nCurrentIp)
+            self.interface_ip = ip_to_str(gige_info.nNetExport)
+            self.serial = _c_str(gige_info.chSerialNumber)
+            self.model = _c_str(gige_info.chModelName)
+        else:
+            usb_info = info.SpecialInfo.stUsb3VInfo
+            self.serial = _c_str(usb_info.chSerialNumber)
+            self.model = _c_str(usb_info.chModelName)
+
+    def __repr__(self):
+        return f"<Device #{self.index} {self.model} SN={self.serial} IP={self.ip} via {self.interface_ip}>"
+
+class DeviceRegistry:
+    """
+    Enumerates GigE/USB devices once and indexes them by IP and serial number,
+    so every camera can be bound from the same snapshot.
+    """
+    def __init__(self):
+        self.devices = []
+        self.by_ip = {}
+        self.by_serial = {}
+
+    def enumerate(self, tlayer_type=None):
+        if not HIK_SDK_AVAILABLE:
+            logger.error("Hikvision SDK not imported. Cannot enumerate devices.")
+            return False
+        if tlayer_type is None:
+            tlayer_type = MV_GIGE_DEVICE | MV_USB_DEVICE
+
+        deviceList = MV_CC_DEVICE_INFO_LIST()
+        ret = MvCamera.MV_CC_EnumDevices(tlayer_type, deviceList)
+        if ret != 0:
+            logger.error(f"Enum Devices failed: {ret}")
+            return False
+
+        self.devices = []
+        self.by_ip = {}
+        self.by_serial = {}
+        for i in range(deviceList.nDeviceNum):
+            info = MV_CC_DEVICE_INFO()
+            ctypes.memmove(byref(info), deviceList.pDeviceInfo[i], sizeof(MV_CC_DEVICE_INFO))
+            entry = DeviceEntry(i, info)
+            self.devices.append(entry)
+            if entry.ip:
+                self.by_ip[entry.ip] = entry
+            if entry.serial:
+                self.by_serial[entry.serial] = entry
+            logger.info(f"Found {entry}")
+
+        logger.info(f"Enumerated {len(self.devices)} devices.")
+        return True
+
+    def devices_on_interface(self, interface_ip):
+        """
+        GigE devices reached through the same host NIC (they share its bandwidth).
+        """
+        return [entry for entry in self.devices if entry.interface_ip and entry.interface_ip == interface_ip]
+
+    def lookup(self, key):
+        """
+        Find a device by IP address or serial number. Returns DeviceEntry or None.
+        """
+        if not key:
+            return None
+        return self.by_ip.get(key) or self.by_serial.get(key)
+
+# GenTL transport layer type (chTLType) -> MV_*_DEVICE constant
+# (literal values: this module must import without the SDK installed)
+_GENTL_TL_TYPES = {"CXP": 0x00000100,   # MV_GENTL_CXP_DEVICE
+                   "CL": 0x00000080,    # MV_GENTL_CAMERALINK_DEVICE
+                   "GEV": 0x00000040,   # MV_GENTL_GIGE_DEVICE
+                   "XoF": 0x00000200}   # MV_GENTL_XOF_DEVICE
+
+class GenTLDeviceEntry(DeviceEntry):
+    """
+    One device found through a GenTL producer (frame grabber). `info` is a
+    private copy of MV_GENTL_DEV_INFO. Frame-grabber links are not shared
+    between cameras, so interface_ip stays None.
+    """
+    def __init__(self, index, info):
+        self.index = index
+        self.info = info
+        self.tl_type = _c_str(info.chTLType)
+        self.tlayer_type = _GENTL_TL_TYPES.get(self.tl_type, 0)
+        self.ip = None
+        self.interface_ip = None
+        self.interface_id = _c_str(info.chInterfaceID)
+        self.device_id = _c_str(info.chDeviceID)
+        self.user_name = _c_str(info.chUserDefinedName)
+        self.serial = _c_str(info.chSerialNumber)
+        self.model = _c_str(info.chModelName)
+
+    def __repr__(self):
+        return f"<GenTL {self.tl_type} #{self.index} {self.model} SN={self.serial} on {self.interface_id}>"
+
+class GenTLRegistry(DeviceRegistry):
+    """
+    Enumerates every interface of a GenTL producer (.cti) and the devices on
+    each, as in BasicDemoByGenTL. Devices are looked up by serial number,
+    GenTL device ID or user-defined name.
+    """
+    def __init__(self, cti_path):
+        super().__init__()
+        self.cti_path = cti_path
+        self.interfaces = []
+        self.by_name = {}
+
+    def enumerate(self, tlayer_type=None):
+        if not HIK_SDK_AVAILABLE:
+            logger.error("Hikvision SDK not imported. Cannot enumerate devices.")
+            return False
+
+        interfaceList = MV_GENTL_IF_INFO_LIST()
+        ret = MvCamera.MV_CC_EnumInterfacesByGenTL(interfaceList, self.cti_path)
+        if ret != 0:
+            logger.error(f"Enum GenTL interfaces ({self.cti_path}) failed: {hex(ret)}")
+            return False
+
+        self.devices = []
+        self.by_serial = {}
+        self.by_name = {}
+        self.interfaces = []
+        for i in range(interfaceList.nInterfaceNum):
+            ifInfo = interfaceList.pIFInfo[i].contents
+            self.interfaces.append(f"{_c_str(ifInfo.chTLType)}: {_c_str(ifInfo.chInterfaceID)}")
+            deviceList = MV_GENTL_DEV_INFO_LIST()
+            ret = MvCamera.MV_CC_EnumDevicesByGenTL(interfaceList.pIFInfo[i], deviceList)
+            if ret != 0:
+                logger.warning(f"Enum devices on {self.interfaces[-1]} failed: {hex(ret)}")
+                continue
+            for j in range(deviceList.nDeviceNum):
+                info = MV_GENTL_DEV_INFO()
+                ctypes.memmove(byref(info), deviceList.pDeviceInfo[j], sizeof(MV_GENTL_DEV_INFO))
+                entry = GenTLDeviceEntry(len(self.devices), info)
+                self.devices.append(entry)
+                if entry.serial:
+                    self.by_serial[entry.serial] = entry
+                for name in (entry.device_id, entry.user_name):
+                    if name:
+                        self.by_name[name] = entry
+                logger.info(f"Found {entry}")
+
+        logger.info(f"Enumerated {len(self.devices)} GenTL devices on {len(self.interfaces)} interfaces.")
+        return True
+
+    def lookup(self, key):
+        if not key:
+            return None
+        return self.by_serial.get(key) or self.by_name.get(key)
@@ -0,0 +1,1119 @@
+"""
+Simulated MvCameraControl_class for hardware-free runs (Linux, CI, dev boxes).
+
+Selected by hardware/hik_sdk.py when FAKE_SDK is set (settings "fake_sdk" or
+AUTOPHOTE_FAKE_SDK=1). It reuses the SDK's own ctypes headers shipped in
+Python/MvImport, so HikCamera, the registry and the samples see the same
+structures and constants as with the real MvCameraControl.dll.
+
+Each simulated GigE camera runs its own acquisition thread and models:
+  - trigger latency + exposure + sensor readout (+ jitter)
+  - the shared bandwidth of the host NIC it hangs off (GevSCPSPacketSize,
+    GevSCPD and protocol overhead included)
+  - packet loss, GVSP resend and incomplete frames
+  - Bayer (or Mono8) output, optional HB (zlib) compressed transfer
+  - a control-channel round-trip for every node read/write
+
+SIM.gentl_cameras adds CoaXPress cameras behind one simulated GenTL frame
+grabber (MV_CC_EnumInterfacesByGenTL / EnumDevicesByGenTL /
+CreateHandleByGenTL), each on its own link of SIM.cxp_link_mbps.
+"""
+import io
+import os
+import sys
+import json
+import math
+import time
+import zlib
+import threading
+import ctypes
+from collections import deque
+import numpy as np
+from config import CAMERA_COUNT, CAMERA_IPS, CAMERA_WIDTH, CAMERA_HEIGHT, GIGE_LINK_MBPS, FAKE_SDK_PROFILE
+from utils.logger import setup_logger
+
+# Same header modules the real MvCameraControl_class star-imports
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Python", "MvImport"))
+from ctypes import *
+from PixelType_header import *
+from CameraParams_const import *
+from CameraParams_header import *
+from MvErrorDefine_const import *
+
+logger = setup_logger("FakeMVS")
+
+# Ethernet + IP + UDP + GVSP headers per stream packet (as hardware/transport.py)
+_PACKET_OVERHEAD_BYTES = 38 + 20 + 8 + 8
+_TICK_HZ = 1_000_000_000
+_HB_FLAG = 0x80000000
+# TriggerSource "Action1" has no fixed value in the headers; any unused entry works here
+_TRIGGER_SOURCE_ACTION1 = 0x1000
+# GevIEEE1588Status port states
+_PTP_DISABLED, _PTP_MASTER, _PTP_UNCALIBRATED, _PTP_SLAVE = 3, 6, 8, 9
+
+_ENUM_SYMBOLS = {
+    "TriggerMode": {"Off": 0, "On": 1},
+    "TriggerSource": {"Line0": 0, "Line1": 1, "Line2": 2, "Line3": 3, "Counter0": 4, "Software": 7,
+                      "Action1": _TRIGGER_SOURCE_ACTION1},
+    "ImageCompressionMode": {"Off": 0, "HB": 2},
+    "MultiLightControl": {"Off": 0, "MultiLight2": 2, "MultiLight3": 3, "MultiLight4": 4},
+    "UserSetSelector": {"Default": 0, "UserSet1": 1, "UserSet2": 2, "UserSet3": 3},
+    "UserSetDefault": {"Default": 0, "UserSet1": 1, "UserSet2": 2, "UserSet3": 3},
+    "PixelFormat": {"Mono8": PixelType_Gvsp_Mono8, "BayerRG8": PixelType_Gvsp_BayerRG8,
+                    "BayerGB8": PixelType_Gvsp_BayerGB8, "BayerGR8": PixelType_Gvsp_BayerGR8,
+                    "BayerBG8": PixelType_Gvsp_BayerBG8},
+}
+
+# Nodes the device locks while streaming (TLParamsLocked)
+_LOCKED_WHILE_GRABBING = ("Width", "Height", "OffsetX", "OffsetY", "PixelFormat", "BinningHorizontal",
+                          "BinningVertical", "DecimationHorizontal", "DecimationVertical", "ImageCompressionMode", "MultiLightControl")
+
+class SimulationConfig:
+    """
+    Timing and device model. Defaults come from config.py (camera count, IPs,
+    resolution, link speed); any field can be overridden by the
+    "fake_sdk_profile" settings dict or configure() before enumeration.
+    """
+    def __init__(self):
+        self.camera_ips = [CAMERA_IPS.get(i + 1, f"192.168.1.{101 + i}") for i in range(CAMERA_COUNT)]
+        self.width = CAMERA_WIDTH
+        self.height = CAMERA_HEIGHT
+        self.pixel_format = "BayerRG8"
+        self.exposure_us = 10000.0
+        self.readout_ms = 30.0           # Full-frame sensor readout; scales with rows read
+        self.max_frame_rate = 20.0       # Sensor limit in free-run
+        self.trigger_latency_ms = 0.2
+        self.jitter_ms = 0.5             # Uniform +/- on trigger latency
+        self.link_mbps = GIGE_LINK_MBPS  # Per host NIC; cameras on one subnet share it
+        self.max_packet_size = 8164      # GetOptimalPacketSize (jumbo frames); 1500 without
+        self.packet_loss = 0.0           # Per-packet loss probability
+        self.gvcp_latency_ms = 0.3       # One control-channel round-trip (node read/write)
+        self.connect_ms = 300.0          # OpenDevice (GVCP handshake + XML download)
+        self.gentl_cameras = 0           # CoaXPress cameras on the simulated frame grabber
+        self.cxp_link_mbps = 50000       # Per camera: CXP-12, 4 lanes
+        self.ptp_lock_s = 2.0            # GevIEEE1588 on -> Listening/Uncalibrated until the clock locks
+
+    def update(self, overrides):
+        for key, value in overrides.items():
+            if not hasattr(self, key):
+                logger.warning(f"Unknown fake SDK setting: {key}")
+                continue
+            setattr(self, key, value)
+
+SIM = SimulationConfig()
+SIM.update(FAKE_SDK_PROFILE)
+
+def configure(**overrides):
+    """
+    Override SimulationConfig fields. Takes effect for devices created by the
+    next MV_CC_EnumDevices (existing devices keep their model).
+    """
+    SIM.update(overrides)
+    _DEVICES.clear()
+
+def _ip_to_int(ip):
+    a, b, c, d = (int(x) for x in ip.split("."))
+    return (a << 24) | (b << 16) | (c << 8) | d
+
+def _fill_c_str(arr, text):
+    data = text.encode("ascii")[:len(arr) - 1]
+    ctypes.memmove(arr, data, len(data))
+
+def _synthetic_frame(width, height, pixel_type, seed):
+    """
+    Smooth colour scene + sensor noise, mosaicked to the device pixel format.
+    """
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    noise = rng.integers(0, 12, (64, 64), dtype=np.uint8)
+    noise = np.tile(noise, (height // 64 + 1, width // 64 + 1))[:height, :width]
+    if pixel_type == PixelType_Gvsp_Mono8:
+        return np.minimum((x + y) / 2, 243).astype(np.uint8) + noise
+    r = np.broadcast_to(x, (height, width)).astype(np.uint8)
+    g = np.broadcast_to(y, (height, width)).astype(np.uint8)
+    b = (255 - r // 2 - g // 2).astype(np.uint8)
+    raw = np.empty((height, width), dtype=np.uint8)
+    # (row, col) of R and B in the 2x2 cell; G fills the other two sites
+    red, blue = {PixelType_Gvsp_BayerRG8: ((0, 0), (1, 1)), PixelType_Gvsp_BayerBG8: ((1, 1), (0, 0)),
+                 PixelType_Gvsp_BayerGR8: ((0, 1), (1, 0)), PixelType_Gvsp_BayerGB8: ((1, 0), (0, 1))}[pixel_type]
+    raw[:] = g
+    raw[red[0]::2, red[1]::2] = r[red[0]::2, red[1]::2]
+    raw[blue[0]::2, blue[1]::2] = b[blue[0]::2, blue[1]::2]
+    return np.minimum(raw, 243) + noise
+
+def _demosaic_rgb(raw, pixel_type):
+    """
+    Nearest-neighbour Bayer -> RGB8 (the SDK's "fast" interpolation tier).
+    """
+    height, width = raw.shape
+    if pixel_type == PixelType_Gvsp_Mono8:
+        return np.repeat(raw[:, :, None], 3, axis=2)
+    red, blue = {PixelType_Gvsp_BayerRG8: ((0, 0), (1, 1)), PixelType_Gvsp_BayerBG8: ((1, 1), (0, 0)),
+                 PixelType_Gvsp_BayerGR8: ((0, 1), (1, 0)), PixelType_Gvsp_BayerGB8: ((1, 0), (0, 1))}[pixel_type]
+    green = (red[0], 1 - red[1])
+    rgb = np.empty((height, width, 3), dtype=np.uint8)
+    for channel, (row, col) in enumerate((red, green, blue)):
+        plane = raw[row::2, col::2]
+        rgb[:, :, channel] = plane.repeat(2, axis=0).repeat(2, axis=1)[:height, :width]
+    return rgb
+
+class _Link:
+    """
+    One host NIC. Frames from the cameras behind it are serialized on the
+    wire, so simultaneous readouts queue up exactly as on a real GigE port.
+    """
+    def __init__(self, address, mbps):
+        self.address = address
+        self.bytes_per_s = mbps * 1e6 / 8
+        self._lock = threading.Lock()
+        self._free_at = 0.0
+
+    def transfer(self, ready_at, wire_bytes, paced_bytes_per_s):
+        """
+        Reserve the link for one frame. Returns the time its last packet lands.
+        """
+        rate = min(self.bytes_per_s, paced_bytes_per_s)
+        with self._lock:
+            start = max(ready_at, self._free_at)
+            # GevSCPD pacing leaves gaps other cameras can use; only the raw
+            # wire time blocks the link
+            self._free_at = start + wire_bytes / self.bytes_per_s
+        return start + wire_bytes / rate
+
+def _light_rows(height, lights, pixel_type):
+    """
+    Row indices of each light in a multi-light frame. Mono8 interleaves
+    single lines; Bayer interleaves line pairs so every light keeps whole
+    2x2 cells (the simulator's stand-in for the camera's colour line order).
+    """
+    group = 1 if pixel_type == PixelType_Gvsp_Mono8 else 2
+    usable = height // (group * lights) * group * lights
+    rows = np.arange(usable).reshape(-1, lights, group)
+    return [rows[:, light, :].ravel() for light in range(lights)]
+
+_DEVICES = []   # _SimDevice, in enumeration order
+_GENTL_INTERFACE_ID = "SIM_CXP_IF0"
+_GENTL_IF_INFO = MV_GENTL_IF_INFO()  # The frame grabber; the SDK hands out pointers to its own copy
+_LINKS = {}     # NIC address -> _Link
+
+class _SimDevice:
+    """
+    State of one simulated camera: device info, GenICam nodes, frame source.
+    """
+    def __init__(self, index, ip, gentl=False):
+        self.index = index
+        self.ip = ip
+        self.gentl = gentl
+        nic = ".".join(ip.split(".")[:3] + ["1"])
+        if gentl:
+            # Point-to-point CoaXPress link to the frame grabber
+            self.link = _LINKS.setdefault(ip, _Link(ip, SIM.cxp_link_mbps))
+        else:
+            self.link = _LINKS.setdefault(nic, _Link(nic, SIM.link_mbps))
+        self.serial = f"SIM{index + 1:05d}"
+        self.online = True
+        self.owner = None  # MvCamera that holds exclusive/control access
+        self.monitors = []  # Read-only MvCamera handles (MV_ACCESS_Monitor)
+        self.multicast = None  # (group ip, port) set by the owner, None = unicast
+
+        self.info = MV_CC_DEVICE_INFO()
+        self.info.nTLayerType = MV_GIGE_DEVICE
+        gige = self.info.SpecialInfo.stGigEInfo
+        gige.nCurrentIp = _ip_to_int(ip)
+        gige.nCurrentSubNetMask = _ip_to_int("255.255.255.0")
+        gige.nNetExport = _ip_to_int(nic)
+        _fill_c_str(gige.chManufacturerName, "Hikrobot")
+        _fill_c_str(gige.chModelName, "MV-CS200-10GC (sim)")
+        _fill_c_str(gige.chSerialNumber, self.serial)
+
+        self.gentl_info = MV_GENTL_DEV_INFO()
+        if gentl:
+            _fill_c_str(self.gentl_info.chInterfaceID, _GENTL_INTERFACE_ID)
+            _fill_c_str(self.gentl_info.chDeviceID, f"SIM_CXP_DEV{index + 1}")
+            _fill_c_str(self.gentl_info.chVendorName, "Hikrobot")
+            _fill_c_str(self.gentl_info.chModelName, "MV-CH250-90XC (sim)")
+            _fill_c_str(self.gentl_info.chTLType, "CXP")
+            _fill_c_str(self.gentl_info.chSerialNumber, self.serial)
+
+        pixel_type = _ENUM_SYMBOLS["PixelFormat"][SIM.pixel_format]
+        self.sensor_size = (SIM.width, SIM.height)
+        self.ints = {"Width": SIM.width, "Height": SIM.height, "WidthMax": SIM.width, "HeightMax": SIM.height,
+                     "OffsetX": 0, "OffsetY": 0, "GevSCPSPacketSize": 1500, "GevSCPD": 0,
+                     "GevTimestampTickFrequency": _TICK_HZ, "ActionSelector": 1, "ActionDeviceKey": 0,
+                     "ActionGroupKey": 0, "ActionGroupMask": 0}
+        self.floats = {"ExposureTime": SIM.exposure_us, "Gain": 0.0, "AcquisitionFrameRate": SIM.max_frame_rate}
+        self.enums = {"TriggerMode": 0, "TriggerSource": 7, "PixelFormat": pixel_type,
+                      "BinningHorizontal": 1, "BinningVertical": 1, "DecimationHorizontal": 1,
+                      "DecimationVertical": 1, "ImageCompressionMode": 0, "MultiLightControl": 0, "UserSetSelector": 0, "UserSetDefault": 0,
+                      "GevIEEE1588Status": _PTP_DISABLED}
+        self.bools = {"GevIEEE1588": False, "AcquisitionFrameRateEnable": False}
+        self._ptp_enabled_at = None
+        self.user_sets = {}
+        self._frames = {}  # geometry -> (raw bytes as ctypes array, HB-compressed bytes or None)
+
+    # --- Nodes ---
+    def ptp_status(self):
+        if self._ptp_enabled_at is None:
+            return _PTP_DISABLED
+        if time.monotonic() - self._ptp_enabled_at < SIM.ptp_lock_s:
+            return _PTP_UNCALIBRATED
+        # The first camera wins the best-master election
+        return _PTP_MASTER if self.index == 0 else _PTP_SLAVE
+
+    def binning(self):
+        return max(self.enums["BinningHorizontal"], self.enums["DecimationHorizontal"]), \
+               max(self.enums["BinningVertical"], self.enums["DecimationVertical"])
+
+    def payload_size(self):
+        return self.ints["Width"] * self.ints["Height"]
+
+    def resulting_frame_rate(self):
+        frame_s = self.floats["ExposureTime"] / 1e6 + self.readout_s()
+        wire_s = self.payload_size() * (1 + _PACKET_OVERHEAD_BYTES / self.ints["GevSCPSPacketSize"]) / self.link.bytes_per_s
+        rate = min(SIM.max_frame_rate, 1.0 / max(frame_s, wire_s))
+        if self.bools["AcquisitionFrameRateEnable"]:
+            rate = min(rate, self.floats["AcquisitionFrameRate"])
+        return rate
+
+    def readout_s(self):
+        rows = self.ints["Height"] * self.binning()[1]
+        return SIM.readout_ms / 1000.0 * rows / self.sensor_size[1]
+
+    def set_geometry(self, name, value):
+        if name.startswith(("Binning", "Decimation")):
+            if value not in (1, 2, 4):
+                return MV_E_PARAMETER
+            self.enums[name] = value
+            bin_h, bin_v = self.binning()
+            self.ints.update(WidthMax=self.sensor_size[0] // bin_h, HeightMax=self.sensor_size[1] // bin_v,
+                             OffsetX=0, OffsetY=0)
+            self.ints["Width"], self.ints["Height"] = self.ints["WidthMax"], self.ints["HeightMax"]
+            return MV_OK
+        axis_max = self.ints["WidthMax"] if name in ("Width", "OffsetX") else self.ints["HeightMax"]
+        other = {"Width": "OffsetX", "OffsetX": "Width", "Height": "OffsetY", "OffsetY": "Height"}[name]
+        if value < 0 or value + self.ints[other] > axis_max or value % 8:
+            return MV_E_PARAMETER
+        if name in ("Width", "Height") and value == 0:
+            return MV_E_PARAMETER
+        self.ints[name] = value
+        return MV_OK
+
+    def snapshot(self):
+        return {"ints": dict(self.ints), "floats": dict(self.floats), "enums": dict(self.enums),
+                "bools": dict(self.bools)}
+
+    def restore(self, state):
+        for group in ("ints", "floats", "enums", "bools"):
+            getattr(self, group).update(state.get(group, {}))
+        if not self.bools["GevIEEE1588"]:
+            self._ptp_enabled_at = None
+        elif self._ptp_enabled_at is None:
+            self._ptp_enabled_at = time.monotonic()
+
+    # --- Frames ---
+    def frame_source(self):
+        """
+        (raw frame array, HB payload or None) for the current geometry, built
+        once and reused so producing a frame costs only the copy.
+        """
+        hb = self.enums["ImageCompressionMode"] == 2
+        lights = self.enums["MultiLightControl"]
+        key = (self.ints["Width"], self.ints["Height"], self.enums["PixelFormat"], hb, lights)
+        if key not in self._frames:
+            width, height, pixel_type, _, _ = key
+            raw = _synthetic_frame(width, height, pixel_type, self.index)
+            if lights > 1:
+                # One brightness per light, its lines interleaved the way MV_SPLIT_BY_LINE expects
+                for light, rows in enumerate(_light_rows(height, lights, pixel_type)):
+                    raw[rows] = (raw[rows] * (0.3 + 0.7 * (light + 1) / lights)).astype(np.uint8)
+            buf = (c_ubyte * raw.size).from_buffer_copy(raw.tobytes())
+            packed = zlib.compress(bytes(buf), 1) if hb else None
+            self._frames[key] = (buf, packed)
+        return self._frames[key]
+
+def _devices():
+    if not _DEVICES:
+        _LINKS.clear()
+        _DEVICES.extend(_SimDevice(i, ip) for i, ip in enumerate(SIM.camera_ips))
+        first = len(_DEVICES)
+        _DEVICES.extend(_SimDevice(first + j, f"169.254.100.{j + 1}", gentl=True) for j in range(SIM.gentl_cameras))
+    return _DEVICES
+
+def unplug(ip):
+    """
+    Simulate a cable pull: the device stops answering and the owner's
+    exception callback fires with MV_EXCEPTION_DEV_DISCONNECT.
+    """
+    for device in _devices():
+        if device.ip == ip:
+            device.online = False
+            for handle in ([device.owner] if device.owner else []) + device.monitors:
+                handle._raise_exception(MV_EXCEPTION_DEV_DISCONNECT)
+
+def replug(ip):
+    for device in _devices():
+        if device.ip == ip:
+            device.online = True
+
+class MvCamera():
+    """
+    Drop-in for MvCameraControl_class.MvCamera. Methods the project does not
+    use fall through to __getattr__ and return MV_E_SUPPORT.
+    """
+    def __init__(self):
+        self.device = None
+        self.is_open = False
+        self.grabbing = False
+        self._access = None
+        self._multicast = None  # Group this handle receives on (monitors)
+        self._image_callback = None
+        self._exception_callback = None
+        self._node_num = 8
+        self._strategy = MV_GrabStrategy_OneByOne
+        self._resend = (True, 10, 50)
+        self._gvsp_timeout_ms = 300
+        self._cond = threading.Condition()
+        self._triggers = deque()
+        self._free = []        # node buffers ready to be filled
+        self._ready = deque()  # (node buffer, MV_FRAME_OUT_INFO_EX) waiting for the application
+        self._held = {}        # address -> node buffer lent out by GetImageBuffer
+        self._frame_num = 0
+        self._thread = None
+        self._action_results = None
+        self._record = None    # (file, width, height, channels) while recording
+        # Bayer converter state (MV_CC_SetBayerCvtQuality / Gamma / CCM), applied by ConvertPixelType
+        self._bayer_quality = 1
+        self._bayer_gamma = None   # Gamma value, None = off
+        self._bayer_ccm = None     # (3x3 matrix, scale), None = off
+
+    def __getattr__(self, name):
+        if name.startswith(("MV_CC_", "MV_GIGE_", "MV_XML_", "MV_USB_", "MV_CAML_")):
+            def unsupported(*args, **kwargs):
+                logger.debug(f"{name} is not simulated")
+                return MV_E_SUPPORT
+            return unsupported
+        raise AttributeError(name)
+
+    # --- SDK / Enumeration ---
+    @staticmethod
+    def MV_CC_Initialize():
+        return MV_OK
+
+    @staticmethod
+    def MV_CC_Finalize():
+        return MV_OK
+
+    @staticmethod
+    def MV_CC_GetSDKVersion():
+        return 0x04040000
+
+    @staticmethod
+    def MV_CC_EnumDevices(nTLayerType, stDevList):
+        devices = [d for d in _devices() if d.online and not d.gentl and nTLayerType & MV_GIGE_DEVICE]
+        stDevList.nDeviceNum = len(devices)
+        for i, device in enumerate(devices):
+            stDevList.pDeviceInfo[i] = pointer(device.info)
+        return MV_OK
+
+    @staticmethod
+    def MV_CC_EnumInterfacesByGenTL(stIFList, strGenTLPath):
+        if not strGenTLPath:
+            return MV_E_PARAMETER
+        stIFList.nInterfaceNum = 0
+        if any(d.gentl for d in _devices()):
+            ctypes.memset(byref(_GENTL_IF_INFO), 0, sizeof(MV_GENTL_IF_INFO))
+            _fill_c_str(_GENTL_IF_INFO.chInterfaceID, _GENTL_INTERFACE_ID)
+            _fill_c_str(_GENTL_IF_INFO.chTLType, "CXP")
+            _fill_c_str(_GENTL_IF_INFO.chDisplayName, "Simulated CXP frame grabber")
+            stIFList.pIFInfo[0] = pointer(_GENTL_IF_INFO)
+            stIFList.nInterfaceNum = 1
+        return MV_OK
+
+    @staticmethod
+    def MV_CC_EnumDevicesByGenTL(stIFInfo, stDevList):
+        devices = [d for d in _devices() if d.online and d.gentl]
+        stDevList.nDeviceNum = len(devices)
+        for i, device in enumerate(devices):
+            stDevList.pDeviceInfo[i] = pointer(device.gentl_info)
+        return MV_OK
+
+    @staticmethod
+    def MV_CC_IsDeviceAccessible(stDevInfo, nAccessMode):
+        device = MvCamera._find(stDevInfo)
+        return bool(device and device.online and device.owner is None)
+
+    @staticmethod
+    def _find(stDevInfo):
+        ip = stDevInfo.SpecialInfo.stGigEInfo.nCurrentIp
+        for device in _devices():
+            if device.info.SpecialInfo.stGigEInfo.nCurrentIp == ip:
+                return device
+        return None
+
+    # --- Handle / Device ---
+    def MV_CC_CreateHandle(self, stDevInfo):
+        self.device = self._find(stDevInfo)
+        return MV_OK if self.device else MV_E_PARAMETER
+
+    MV_CC_CreateHandleWithoutLog = MV_CC_CreateHandle
+
+    def MV_CC_CreateHandleByGenTL(self, stDevInfo):
+        serial = bytes(stDevInfo.chSerialNumber).split(b"\0", 1)[0].decode("ascii")
+        self.device = next((d for d in _devices() if d.gentl and d.serial == serial), None)
+        return MV_OK if self.device else MV_E_PARAMETER
+
+    def MV_CC_DestroyHandle(self):
+        if self.is_open:
+            self.MV_CC_CloseDevice()
+        self.device = None
+        return MV_OK
+
+    def MV_CC_OpenDevice(self, nAccessMode=MV_ACCESS_Exclusive, nSwitchoverKey=0):
+        if self.device is None:
+            return MV_E_HANDLE
+        if not self.device.online:
+            return MV_E_NETER
+        if nAccessMode == MV_ACCESS_Monitor:
+            # Read-only: allowed next to a Control owner, never next to an Exclusive one
+            owner = self.device.owner
+            if owner is not None and owner._access != MV_ACCESS_Control:
+                return MV_E_ACCESS_DENIED
+            time.sleep(SIM.connect_ms / 1000.0)
+            self.device.monitors.append(self)
+        else:
+            if self.device.owner is not None:
+                return MV_E_ACCESS_DENIED
+            time.sleep(SIM.connect_ms / 1000.0)
+            self.device.owner = self
+        self._access = nAccessMode
+        self.is_open = True
+        return MV_OK
+
+    def MV_CC_CloseDevice(self):
+        if self.grabbing:
+            self.MV_CC_StopGrabbing()
+        if self.device and self.device.owner is self:
+            self.device.owner = None
+            self.device.multicast = None
+        if self.device and self in self.device.monitors:
+            self.device.monitors.remove(self)
+        self.is_open = False
+        return MV_OK
+
+    def MV_CC_IsDeviceConnected(self):
+        return bool(self.is_open and self.device.online)
+
+    def MV_CC_RegisterExceptionCallBack(self, ExceptionCallBackFun, pUser):
+        self._exception_callback = ExceptionCallBackFun
+        return MV_OK
+
+    def MV_CC_RegisterImageCallBackEx(self, CallBackFun, pUser):
+        if self.grabbing:
+            return MV_E_CALLORDER
+        self._image_callback = CallBackFun
+        return MV_OK
+
+    def _raise_exception(self, nMsgType):
+        if self._exception_callback:
+            self._exception_callback(nMsgType, None)
+
+    # --- Nodes (every call is one GVCP round-trip) ---
+    def _gvcp(self):
+        if not (self.is_open and self.device.online):
+            return MV_E_NETER
+        time.sleep(SIM.gvcp_latency_ms / 1000.0)
+        return MV_OK
+
+    def _gvcp_write(self):
+        ret = self._gvcp()
+        if ret == MV_OK and self._access == MV_ACCESS_Monitor:
+            return MV_E_ACCESS_DENIED
+        return ret
+
+    def MV_CC_GetIntValue(self, strKey, stIntValue):
+        ret = self._gvcp()
+        if ret != MV_OK:
+            return ret
+        device = self.device
+        if strKey == "PayloadSize":
+            value = device.payload_size()
+        elif strKey in device.ints:
+            value = device.ints[strKey]
+        else:
+            return MV_E_SUPPORT
+        ints = device.ints
+        limits = {"Width": ints["WidthMax"] - ints["OffsetX"], "Height": ints["HeightMax"] - ints["OffsetY"],
+                  "OffsetX": ints["WidthMax"] - ints["Width"], "OffsetY": ints["HeightMax"] - ints["Height"],
+                  "GevSCPSPacketSize": 9000}
+        stIntValue.nCurValue = value
+        stIntValue.nMin = 0
+        stIntValue.nMax = limits.get(strKey, value)
+        stIntValue.nInc = 8 if strKey in ("Width", "Height", "OffsetX", "OffsetY") else 1
+        return MV_OK
+
+    def MV_CC_SetIntValue(self, strKey, nValue):
+        ret = self._gvcp_write()
+        if ret != MV_OK:
+            return ret
+        if self.grabbing and strKey in _LOCKED_WHILE_GRABBING:
+            return MV_E_GC_ACCESS
+        if strKey in ("Width", "Height", "OffsetX", "OffsetY"):
+            return self.device.set_geometry(strKey, int(nValue))
+        if strKey not in self.device.ints or strKey.endswith("Max") or strKey == "GevTimestampTickFrequency":
+            return MV_E_SUPPORT
+        self.device.ints[strKey] = int(nValue)
+        return MV_OK
+
+    def MV_CC_GetFloatValue(self, strKey, stFloatValue):
+        ret = self._gvcp()
+        if ret != MV_OK:
+            return ret
+        if strKey == "ResultingFrameRate":
+            value = self.device.resulting_frame_rate()
+        elif strKey in self.device.floats:
+            value = self.device.floats[strKey]
+        else:
+            return MV_E_SUPPORT
+        stFloatValue.fCurValue = value
+        stFloatValue.fMin = 0.0
+        stFloatValue.fMax = 1e7
+        return MV_OK
+
+    def MV_CC_SetFloatValue(self, strKey, fValue):
+        ret = self._gvcp_write()
+        if ret != MV_OK:
+            return ret
+        if strKey not in self.device.floats:
+            return MV_E_SUPPORT
+        self.device.floats[strKey] = float(fValue)
+        return MV_OK
+
+    def MV_CC_GetEnumValue(self, strKey, stEnumValue):
+        ret = self._gvcp()
+        if ret != MV_OK:
+            return ret
+        if strKey not in self.device.enums:
+            return MV_E_SUPPORT
+        if strKey == "GevIEEE1588Status":
+            self.device.enums[strKey] = self.device.ptp_status()
+        stEnumValue.nCurValue = self.device.enums[strKey]
+        symbols = list(_ENUM_SYMBOLS.get(strKey, {}).values())
+        stEnumValue.nSupportedNum = len(symbols)
+        for i, value in enumerate(symbols[:len(stEnumValue.nSupportValue)]):
+            stEnumValue.nSupportValue[i] = value
+        return MV_OK
+
+    def MV_CC_SetEnumValue(self, strKey, nValue):
+        ret = self._gvcp_write()
+        if ret != MV_OK:
+            return ret
+        if strKey not in self.device.enums:
+            return MV_E_SUPPORT
+        if self.grabbing and strKey in _LOCKED_WHILE_GRABBING:
+            return MV_E_GC_ACCESS
+        if strKey.startswith(("Binning", "Decimation")):
+            return self.device.set_geometry(strKey, int(nValue))
+        symbols = _ENUM_SYMBOLS.get(strKey)
+        if symbols and nValue not in symbols.values():
+            return MV_E_PARAMETER
+        self.device.enums[strKey] = int(nValue)
+        return MV_OK
+
+    def MV_CC_SetEnumValueByString(self, strKey, sValue):
+        symbols = _ENUM_SYMBOLS.get(strKey, {})
+        if sValue not in symbols:
+            self._gvcp()
+            return MV_E_PARAMETER
+        return self.MV_CC_SetEnumValue(strKey, symbols[sValue])
+
+    def MV_CC_GetBoolValue(self, strKey, BoolValue):
+        ret = self._gvcp()
+        if ret != MV_OK:
+            return ret
+        if strKey not in self.device.bools:
+            return MV_E_SUPPORT
+        BoolValue.value = self.device.bools[strKey]
+        return MV_OK
+
+    def MV_CC_SetBoolValue(self, strKey, bValue):
+        ret = self._gvcp_write()
+        if ret != MV_OK:
+            return ret
+        if strKey not in self.device.bools:
+            return MV_E_SUPPORT
+        if strKey == "GevIEEE1588" and bool(bValue) != self.device.bools[strKey]:
+            self.device._ptp_enabled_at = time.monotonic() if bValue else None
+        self.device.bools[strKey] = bool(bValue)
+        return MV_OK
+
+    def MV_CC_SetCommandValue(self, strKey):
+        ret = self._gvcp_write()
+        if ret != MV_OK:
+            return ret
+        device = self.device
+        if strKey == "TriggerSoftware":
+            if device.enums["TriggerMode"] == 1 and device.enums["TriggerSource"] == 7:
+                self._trigger(time.perf_counter())
+            return MV_OK
+        if strKey == "UserSetSave":
+            device.user_sets[device.enums["UserSetSelector"]] = device.snapshot()
+            return MV_OK
+        if strKey == "UserSetLoad":
+            state = device.user_sets.get(device.enums["UserSetSelector"])
+            if state:
+                device.restore(state)
+            return MV_OK
+        return MV_E_SUPPORT
+
+    def MV_CC_InvalidateNodes(self):
+        return MV_OK
+
+    def MV_CC_FeatureSave(self, strFileName):
+        if not self.is_open:
+            return MV_E_CALLORDER
+        with open(strFileName, "w", encoding="utf-8") as f:
+            json.dump(self.device.snapshot(), f, indent=1)
+        return MV_OK
+
+    def MV_CC_FeatureLoad(self, strFileName):
+        if not self.is_open:
+            return MV_E_CALLORDER
+        if self._access == MV_ACCESS_Monitor:
+            return MV_E_ACCESS_DENIED
+        try:
+            with open(strFileName, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return MV_E_PARAMETER
+        # One GVCP write per stored node, as the SDK replays the file
+        time.sleep(SIM.gvcp_latency_ms / 1000.0 * sum(len(v) for v in state.values()))
+        self.device.restore(state)
+        return MV_OK
+
+    # --- GigE transport ---
+    def MV_CC_GetOptimalPacketSize(self):
+        return SIM.max_packet_size if self.is_open else MV_E_CALLORDER
+
+    def MV_GIGE_SetResend(self, bEnable, nMaxResendPercent=10, nResendTimeout=50):
+        self._resend = (bool(bEnable), nMaxResendPercent, nResendTimeout)
+        return MV_OK
+
+    def MV_GIGE_SetGvspTimeout(self, nMillisec):
+        self._gvsp_timeout_ms = nMillisec
+        return MV_OK
+
+    def MV_GIGE_SetGvcpTimeout(self, nMillisec):
+        return MV_OK
+
+    def MV_GIGE_SetTransmissionType(self, stTransmissionType):
+        if not self.is_open or self.grabbing:
+            return MV_E_CALLORDER
+        if stTransmissionType.enTransmissionType == MV_GIGE_TRANSTYPE_UNICAST:
+            group = None
+        elif stTransmissionType.enTransmissionType == MV_GIGE_TRANSTYPE_MULTICAST:
+            group = (stTransmissionType.nDestIp, stTransmissionType.nDestPort)
+        else:
+            return MV_E_SUPPORT
+        if self.device.owner is self:
+            # The camera streams to the group; the owner receives it like any member
+            self.device.multicast = group
+        self._multicast = group
+        return MV_OK
+
+    def MV_GIGE_IssueActionCommand(self, pstActionCmdInfo, pstActionCmdResults):
+        fired_at = time.perf_counter()
+        acked = []
+        for device in _devices():
+            owner = device.owner
+            if owner is None or not device.online or not owner.grabbing:
+                continue
+            if (device.enums["TriggerMode"] == 1 and device.enums["TriggerSource"] == _TRIGGER_SOURCE_ACTION1
+                    and device.ints["ActionDeviceKey"] == pstActionCmdInfo.nDeviceKey
+                    and device.ints["ActionGroupKey"] == pstActionCmdInfo.nGroupKey
+                    and device.ints["ActionGroupMask"] & pstActionCmdInfo.nGroupMask):
+                owner._trigger(fired_at)
+                acked.append(device)
+        results = (MV_ACTION_CMD_RESULT * max(len(acked), 1))()
+        for result, device in zip(results, acked):
+            _fill_c_str(result.strDeviceAddress, device.ip)
+            result.nStatus = MV_OK
+        self._action_results = results  # SDK-owned memory: keep alive until the next command
+        pstActionCmdResults.nNumResults = len(acked)
+        pstActionCmdResults.pResults = cast(results, POINTER(MV_ACTION_CMD_RESULT))
+        return MV_OK
+
+    # --- Streaming ---
+    def MV_CC_SetImageNodeNum(self, nNum):
+        if self.grabbing:
+            return MV_E_CALLORDER
+        self._node_num = max(1, int(nNum))
+        return MV_OK
+
+    def MV_CC_SetGrabStrategy(self, enGrabStrategy):
+        self._strategy = enGrabStrategy
+        return MV_OK
+
+    def MV_CC_StartGrabbing(self):
+        if not self.is_open:
+            return MV_E_CALLORDER
+        if self.grabbing:
+            return MV_OK
+        size = self.device.payload_size()
+        self._free = [(c_ubyte * size)() for _ in range(self._node_num)]
+        # Build (and HB-compress) the synthetic frame now: a real camera pays no host time for it per trigger
+        self.device.frame_source()
+        self._ready.clear()
+        self._held.clear()
+        self._triggers.clear()
+        self.grabbing = True
+        if self._access != MV_ACCESS_Monitor:
+            # Monitors only receive what the owner's stream delivers to their group
+            self._thread = threading.Thread(target=self._acquisition_loop, daemon=True)
+            self._thread.start()
+        return MV_OK
+
+    def MV_CC_StopGrabbing(self):
+        if not self.grabbing:
+            return MV_OK
+        with self._cond:
+            self.grabbing = False
+            self._cond.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+        return MV_OK
+
+    def _trigger(self, fired_at):
+        with self._cond:
+            self._triggers.append(fired_at)
+            self._cond.notify_all()
+
+    def _acquisition_loop(self):
+        device = self.device
+        next_free_run = time.perf_counter()
+        while self.grabbing:
+            if not device.online:
+                time.sleep(0.05)
+                continue
+            if device.enums["TriggerMode"] == 1:
+                with self._cond:
+                    if not self._triggers:
+                        self._cond.wait(timeout=0.1)
+                    if not self._triggers or not self.grabbing:
+                        continue
+                    fired_at = self._triggers.popleft()
+            else:
+                fired_at = max(next_free_run, time.perf_counter())
+                next_free_run = fired_at + 1.0 / device.resulting_frame_rate()
+
+            exposure_start = fired_at + (SIM.trigger_latency_ms + np.random.uniform(-1, 1) * SIM.jitter_ms) / 1000.0
+            ready_at = max(exposure_start, fired_at) + device.floats["ExposureTime"] / 1e6 + device.readout_s()
+            raw, packed = device.frame_source()
+            frame_len = len(packed) if packed is not None else len(raw)
+            arrives_at, lost = self._transfer(ready_at, frame_len)
+            delay = arrives_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if self.grabbing:
+                self._deliver(raw, packed, exposure_start, lost)
+
+    def _transfer(self, ready_at, frame_len):
+        """
+        Wire time on the shared NIC with packetization, GevSCPD pacing,
+        packet loss and resend. Returns (arrival time, packets still missing).
+        """
+        device = self.device
+        packet_size = device.ints["GevSCPSPacketSize"]
+        packets = math.ceil(frame_len / (packet_size - _PACKET_OVERHEAD_BYTES))
+        lost = int(np.random.binomial(packets, SIM.packet_loss)) if SIM.packet_loss > 0 else 0
+        resend, max_percent, resend_timeout_ms = self._resend
+        missing = lost
+        extra_s = 0.0
+        if lost and resend and lost * 100 <= packets * max_percent:
+            # One resend round trip; resent packets can be lost again
+            missing = int(np.random.binomial(lost, SIM.packet_loss))
+            extra_s = min(resend_timeout_ms, self._gvsp_timeout_ms) / 1000.0 * 0.1
+            packets += lost
+        wire_bytes = frame_len + packets * _PACKET_OVERHEAD_BYTES
+        packet_time = packet_size / device.link.bytes_per_s + device.ints["GevSCPD"] / _TICK_HZ
+        paced_rate = packet_size / packet_time
+        return device.link.transfer(ready_at, wire_bytes, paced_rate) + extra_s, missing
+
+    def _frame_info(self, raw, packed, exposure_start, lost):
+        device = self.device
+        self._frame_num += 1
+        info = MV_FRAME_OUT_INFO_EX()
+        info.nWidth = device.ints["Width"]
+        info.nHeight = device.ints["Height"]
+        info.enPixelType = device.enums["PixelFormat"] | (_HB_FLAG if packed is not None else 0)
+        info.nFrameNum = self._frame_num
+        ticks = int(exposure_start * _TICK_HZ)
+        info.nDevTimeStampHigh = (ticks >> 32) & 0xFFFFFFFF
+        info.nDevTimeStampLow = ticks & 0xFFFFFFFF
+        info.nHostTimeStamp = int(time.time() * 1000)
+        info.nFrameLen = len(packed) if packed is not None else len(raw)
+        info.fExposureTime = device.floats["ExposureTime"]
+        info.fGain = device.floats["Gain"]
+        info.nOffsetX = device.ints["OffsetX"]
+        info.nOffsetY = device.ints["OffsetY"]
+        info.nLostPacket = lost
+        return info
+
+    def _deliver(self, raw, packed, exposure_start, lost):
+        info = self._frame_info(raw, packed, exposure_start, lost)
+        src = packed if packed is not None else raw
+        self._receive(src, info)
+        # Multicast: the frame crossed the link once (see _transfer); every member receives it
+        group = self.device.multicast
+        if group:
+            for monitor in list(self.device.monitors):
+                if monitor.grabbing and monitor._multicast == group:
+                    monitor._receive(src, MV_FRAME_OUT_INFO_EX.from_buffer_copy(info))
+
+    def _receive(self, src, info):
+        if self._image_callback:
+            node = self._free[0]
+            if info.nFrameLen > len(node):
+                return  # Nodes sized before a geometry change on the owner
+            ctypes.memmove(node, src, info.nFrameLen)
+            self._image_callback(cast(node, POINTER(c_ubyte)), pointer(info), None)
+            return
+        with self._cond:
+            if self._free:
+                node = self._free.pop()
+            elif self._strategy != MV_GrabStrategy_OneByOne and self._ready:
+                node, _ = self._ready.popleft()  # Latest* strategies overwrite the oldest frame
+            else:
+                return  # OneByOne with every node full: the new frame is dropped
+            if info.nFrameLen > len(node):
+                self._free.append(node)
+                return
+        ctypes.memmove(node, src, info.nFrameLen)
+        with self._cond:
+            self._ready.append((node, info))
+            self._cond.notify_all()
+
+    def _next_ready(self, nMsec):
+        deadline = time.perf_counter() + nMsec / 1000.0
+        with self._cond:
+            while not self._ready:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0 or not self.grabbing:
+                    return None
+                self._cond.wait(timeout=remaining)
+            if self._strategy == MV_GrabStrategy_LatestImagesOnly:
+                while len(self._ready) > 1:
+                    self._free.append(self._ready.popleft()[0])
+            return self._ready.popleft()
+
+    def MV_CC_GetOneFrameTimeout(self, pData, nDataSize, stFrameInfo, nMsec=1000):
+        if not self.grabbing:
+            return MV_E_CALLORDER
+        if self._image_callback:
+            return MV_E_CALLORDER
+        item = self._next_ready(nMsec)
+        if item is None:
+            return MV_E_NODATA
+        node, info = item
+        try:
+            if nDataSize < info.nFrameLen:
+                return MV_E_NOENOUGH_BUF
+            ctypes.memmove(pData, node, info.nFrameLen)
+            ctypes.memmove(byref(stFrameInfo), byref(info), sizeof(MV_FRAME_OUT_INFO_EX))
+            return MV_OK
+        finally:
+            with self._cond:
+                self._free.append(node)
+
+    def MV_CC_GetImageBuffer(self, stFrame, nMsec):
+        if not self.grabbing or self._image_callback:
+            return MV_E_CALLORDER
+        item = self._next_ready(nMsec)
+        if item is None:
+            return MV_E_NODATA
+        node, info = item
+        with self._cond:
+            self._held[addressof(node)] = node
+        stFrame.pBufAddr = cast(node, POINTER(c_ubyte))
+        ctypes.memmove(byref(stFrame.stFrameInfo), byref(info), sizeof(MV_FRAME_OUT_INFO_EX))
+        return MV_OK
+
+    def MV_CC_FreeImageBuffer(self, stFrame):
+        address = cast(stFrame.pBufAddr, c_void_p).value
+        with self._cond:
+            node = self._held.pop(address, None)
+            if node is None:
+                return MV_E_PARAMETER
+            # Nodes from before a restart (other size) are simply dropped
+            if len(node) == self.device.payload_size():
+                self._free.append(node)
+        return MV_OK
+
+    def MV_CC_ClearImageBuffer(self):
+        with self._cond:
+            while self._ready:
+                self._free.append(self._ready.popleft()[0])
+        return MV_OK
+
+    def MV_CC_GetValidImageNum(self, nValidImageNum):
+        nValidImageNum.value = len(self._ready)
+        return MV_OK
+
+    # --- Image processing ---
+    def _raw_view(self, pData, nWidth, nHeight):
+        return np.ctypeslib.as_array(cast(pData, POINTER(c_ubyte)), shape=(nHeight * nWidth,)).reshape(nHeight, nWidth)
+
+    def MV_CC_SetBayerCvtQuality(self, nBayerCvtQuality):
+        if nBayerCvtQuality not in (0, 1, 2, 3):
+            return MV_E_PARAMETER
+        self._bayer_quality = nBayerCvtQuality
+        return MV_OK
+
+    def MV_CC_SetBayerFilterEnable(self, bFilterEnable):
+        return MV_OK
+
+    def MV_CC_SetBayerGammaParam(self, stGammaParam):
+        if stGammaParam.enGammaType == MV_CC_GAMMA_TYPE_NONE:
+            self._bayer_gamma = None
+        elif stGammaParam.enGammaType == MV_CC_GAMMA_TYPE_VALUE and 0.1 <= stGammaParam.fGammaValue <= 4.0:
+            self._bayer_gamma = stGammaParam.fGammaValue
+        else:
+            return MV_E_PARAMETER
+        return MV_OK
+
+    def MV_CC_SetBayerCCMParamEx(self, stCCMParam):
+        scale = stCCMParam.nCCMScale
+        if not stCCMParam.bCCMEnable:
+            self._bayer_ccm = None
+        elif scale <= 0 or scale > 65536 or scale & (scale - 1):
+            return MV_E_PARAMETER
+        else:
+            self._bayer_ccm = (np.array(stCCMParam.nCCMat[:], dtype=np.float32).reshape(3, 3), scale)
+        return MV_OK
+
+    def _bayer_rgb(self, raw, pixel_type):
+        """
+        Demosaic with the handle's converter settings, then CCM and gamma.
+        Every quality tier uses the nearest-neighbour demosaic: host CPU time
+        here would only slow the simulated cameras, not model the DLL.
+        """
+        rgb = _demosaic_rgb(raw, pixel_type)
+        if pixel_type == PixelType_Gvsp_Mono8:
+            return rgb
+        if self._bayer_ccm is not None:
+            matrix, scale = self._bayer_ccm
+            rgb = np.clip(rgb @ (matrix.T / scale), 0, 255).astype(np.uint8)
+        if self._bayer_gamma is not None:
+            lut = (255 * (np.arange(256) / 255.0) ** (1.0 / self._bayer_gamma)).astype(np.uint8)
+            rgb = lut[rgb]
+        return rgb
+
+    def MV_CC_ConvertPixelType(self, stConvertParam):
+        width, height = stConvertParam.nWidth, stConvertParam.nHeight
+        src_type = stConvertParam.enSrcPixelType
+        if stConvertParam.enDstPixelType != PixelType_Gvsp_RGB8_Packed:
+            return MV_E_SUPPORT
+        if src_type not in _ENUM_SYMBOLS["PixelFormat"].values():
+            return MV_E_SUPPORT
+        nDstLen = width * height * 3
+        if stConvertParam.nDstBufferSize < nDstLen:
+            return MV_E_NOENOUGH_BUF
+        rgb = self._bayer_rgb(self._raw_view(stConvertParam.pSrcData, width, height), src_type)
+        ctypes.memmove(stConvertParam.pDstBuffer, rgb.ctypes.data, nDstLen)
+        stConvertParam.nDstLen = nDstLen
+        return MV_OK
+
+    def MV_CC_ReconstructImage(self, stReconstructParam):
+        width, height = stReconstructParam.nWidth, stReconstructParam.nHeight
+        pixel_type = stReconstructParam.enPixelType
+        lights = stReconstructParam.nExposureNum
+        if stReconstructParam.enReconstructMethod != MV_SPLIT_BY_LINE or pixel_type not in _ENUM_SYMBOLS["PixelFormat"].values():
+            return MV_E_SUPPORT
+        if not 2 <= lights <= MV_MAX_SPLIT_NUM or stReconstructParam.nSrcDataLen < width * height:
+            return MV_E_PARAMETER
+        raw = self._raw_view(stReconstructParam.pSrcData, width, height)
+        for light, rows in enumerate(_light_rows(height, lights, pixel_type)):
+            out = stReconstructParam.stDstBufList[light]
+            if out.nBufSize < rows.size * width:
+                return MV_E_NOENOUGH_BUF
+            part = np.ascontiguousarray(raw[rows])
+            ctypes.memmove(out.pBuf, part.ctypes.data, part.nbytes)
+            out.nWidth, out.nHeight, out.enPixelType, out.nBufLen = width, rows.size, pixel_type, part.nbytes
+        return MV_OK
+
+    def MV_CC_HBDecode(self, stDecodeParam):
+        packed = ctypes.string_at(stDecodeParam.pSrcBuf, stDecodeParam.nSrcLen)
+        try:
+            raw = zlib.decompress(packed)
+        except zlib.error:
+            return MV_E_PARAMETER
+        if stDecodeParam.nDstBufSize < len(raw):
+            return MV_E_NOENOUGH_BUF
+        device = self.device
+        ctypes.memmove(stDecodeParam.pDstBuf, raw, len(raw))
+        stDecodeParam.nWidth = device.ints["Width"]
+        stDecodeParam.nHeight = device.ints["Height"]
+        stDecodeParam.enDstPixelType = device.enums["PixelFormat"]
+        stDecodeParam.nDstBufLen = len(raw)
+        return MV_OK
+
+    def MV_CC_SaveImageToFileEx(self, stSaveFileParam):
+        from PIL import Image
+
+        width, height = stSaveFileParam.nWidth, stSaveFileParam.nHeight
+        pixel_type = stSaveFileParam.enPixelType
+        if pixel_type not in _ENUM_SYMBOLS["PixelFormat"].values():
+            return MV_E_SUPPORT
+        raw = self._raw_view(stSaveFileParam.pData, width, height)
+        img = Image.fromarray(raw if pixel_type == PixelType_Gvsp_Mono8 else self._bayer_rgb(raw, pixel_type))
+        path = ctypes.string_at(stSaveFileParam.pcImagePath).decode("mbcs" if os.name == "nt" else "utf-8")
+        if stSaveFileParam.enImageType == MV_Image_Jpeg:
+            img.save(path, "JPEG", quality=stSaveFileParam.nQuality)
+        else:
+            img.save(path)
+        return MV_OK
+
+    # --- Recording ---
+    def MV_CC_StartRecord(self, stRecordParam):
+        if self.device is None:
+            return MV_E_HANDLE
+        if self._record is not None:
+            return MV_E_CALLORDER
+        if stRecordParam.enPixelType == PixelType_Gvsp_RGB8_Packed:
+            channels = 3
+        elif stRecordParam.enPixelType == PixelType_Gvsp_Mono8:
+            channels = 1
+        else:
+            return MV_E_SUPPORT
+        if stRecordParam.nWidth % 2 or stRecordParam.nHeight % 2 or not 1 / 16 <= stRecordParam.fFrameRate <= 120:
+            return MV_E_PARAMETER
+        try:
+            f = open(stRecordParam.strFilePath.decode("utf-8"), "wb")
+        except OSError:
+            return MV_E_PARAMETER
+        self._record = (f, stRecordParam.nWidth, stRecordParam.nHeight, channels)
+        return MV_OK
+
+    def MV_CC_InputOneFrame(self, stInputFrameInfo):
+        from PIL import Image
+
+        if self._record is None:
+            return MV_E_CALLORDER
+        f, width, height, channels = self._record
+        if stInputFrameInfo.nDataLen != width * height * channels:
+            return MV_E_PARAMETER
+        data = np.ctypeslib.as_array(stInputFrameInfo.pData, shape=(stInputFrameInfo.nDataLen,))
+        frame = data.reshape(height, width) if channels == 1 else data.reshape(height, width, 3)
+        # Motion-JPEG elementary stream (concatenated JPEGs) stands in for the SDK's AVI muxer
+        buf = io.BytesIO()
+        Image.fromarray(frame).save(buf, "JPEG", quality=85)
+        f.write(buf.getvalue())
+        return MV_OK
+
+    def MV_CC_StopRecord(self):
+        if self._record is None:
+            return MV_E_CALLORDER
+        self._record[0].close()
+        self._record = None
+        return MV_OK
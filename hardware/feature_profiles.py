@@ -0,0 +1,124 @@
+import os
+import json
+import hashlib
+from utils.logger import setup_logger
+
+logger = setup_logger("FeatureProfiles")
+
+class FeatureProfileStore:
+    """
+    Per-camera GenICam parameter profiles (MV_CC_FeatureSave .mfs files),
+    keyed by serial number.
+
+    A profile is captured once and restored in bulk with MV_CC_FeatureLoad
+    instead of setting nodes one by one. It is also written to the camera's
+    UserSet1 (made the power-up default), so a power-cycled camera comes back
+    with it already applied. <serial>.applied records the hash of the last
+    profile pushed to that camera and the values of a few check nodes read
+    back from it; when the hash matches the file and the device still reports
+    those values, the reload is skipped entirely.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _paths(self, serial):
+        base = os.path.join(self.directory, serial)
+        return base + ".mfs", base + ".applied"
+
+    @staticmethod
+    def _file_hash(path):
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def has_profile(self, serial):
+        return os.path.exists(self._paths(serial)[0])
+
+    def restore(self, nodes, serial, camera_id, check_nodes):
+        """
+        Bring an open (not grabbing) camera to its stored profile.
+        nodes is the camera's NodeAccessor; check_nodes [(kind, name), ...]
+        are read back to confirm a matching hash still describes the device
+        (a reset, power cycle without UserSet1, a swapped unit or an edit in
+        MVS changes them).
+        Returns "matched" (already applied), "loaded", "missing" or "failed".
+        """
+        profile_path, applied_path = self._paths(serial)
+        if not os.path.exists(profile_path):
+            return "missing"
+
+        profile_hash = self._file_hash(profile_path)
+        applied = self._read_applied(applied_path)
+        if applied.get("hash") == profile_hash:
+            current = self._read_check_nodes(nodes, check_nodes)
+            drifted = {name: (value, current.get(name)) for name, value in applied.get("nodes", {}).items()
+                       if current.get(name) != value}
+            if not drifted and set(current) == set(applied.get("nodes", {})):
+                logger.info(f"Cam {camera_id} profile {serial} already applied, skipping reload.")
+                return "matched"
+            logger.warning(f"Cam {camera_id} differs from its applied profile (stored, device): {drifted}; reloading.")
+
+        ret = nodes.handle.MV_CC_FeatureLoad(profile_path)
+        if ret != 0:
+            logger.error(f"Cam {camera_id} feature load failed: {hex(ret)}")
+            return "failed"
+        nodes.invalidate()
+        self._store_user_set(nodes.handle, camera_id)
+        self._mark_applied(applied_path, profile_hash, self._read_check_nodes(nodes, check_nodes))
+        logger.info(f"Cam {camera_id} profile {serial} loaded.")
+        return "loaded"
+
+    def save(self, nodes, serial, camera_id, check_nodes):
+        """
+        Capture the camera's current parameters as its profile.
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+        except OSError as e:
+            logger.error(f"Failed to create profile directory {self.directory}: {e}")
+            return False
+
+        profile_path, applied_path = self._paths(serial)
+        ret = nodes.handle.MV_CC_FeatureSave(profile_path)
+        if ret != 0:
+            logger.error(f"Cam {camera_id} feature save failed: {hex(ret)}")
+            return False
+        self._store_user_set(nodes.handle, camera_id)
+        self._mark_applied(applied_path, self._file_hash(profile_path), self._read_check_nodes(nodes, check_nodes))
+        logger.info(f"Cam {camera_id} profile saved to {profile_path}")
+        return True
+
+    @staticmethod
+    def _store_user_set(handle, camera_id):
+        ret = handle.MV_CC_SetEnumValueByString("UserSetSelector", "UserSet1")
+        ret |= handle.MV_CC_SetCommandValue("UserSetSave")
+        ret |= handle.MV_CC_SetEnumValueByString("UserSetDefault", "UserSet1")
+        if ret != 0:
+            logger.warning(f"Cam {camera_id} could not store UserSet1 ({hex(ret)}); profile applies until power-off only.")
+
+    @staticmethod
+    def _read_check_nodes(nodes, check_nodes):
+        values = {}
+        for kind, name in check_nodes:
+            value = getattr(nodes, "get_" + kind)(name)
+            if value is not None:
+                # Float nodes (ExposureTime) read back with rounding noise
+                values[name] = round(value, 1) if kind == "float" else value
+        return values
+
+    @staticmethod
+    def _read_applied(applied_path):
+        """
+        {"hash": ..., "nodes": {name: value}}; empty when missing or in the old
+        hash-only format (the profile is then reloaded once).
+        """
+        try:
+            with open(applied_path, "r", encoding="utf-8") as f:
+                applied = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return applied if isinstance(applied, dict) else {}
+
+    @staticmethod
+    def _mark_applied(applied_path, profile_hash, node_values):
+        with open(applied_path, "w", encoding="utf-8") as f:
+            json.dump({"hash": profile_hash, "nodes": node_values}, f, indent=1)
@@ -0,0 +1,28 @@
+from hardware.hik_sdk import *
+from hardware.hik_camera import HikCamera
+from hardware.device_registry import GenTLRegistry
+from utils.logger import setup_logger
+
+logger = setup_logger("GenTL")
+
+class GenTLCamera(HikCamera):
+    """
+    CoaXPress / CameraLink camera behind a frame grabber, opened through its
+    GenTL producer (.cti) with MV_CC_EnumInterfacesByGenTL /
+    MV_CC_EnumDevicesByGenTL / MV_CC_CreateHandleByGenTL, as in
+    BasicDemoByGenTL. Once the handle exists the SDK API is the same as for
+    GigE, so triggering, acquisition modes, preview and saving are inherited
+    unchanged; GigE-only steps (transport tuning, multicast) are skipped
+    because the device is not MV_GIGE_DEVICE.
+
+    ip_address holds the serial number, GenTL device ID or user-defined name.
+    """
+    def __init__(self, camera_id, ip_address, cti_path, **kwargs):
+        super().__init__(camera_id, ip_address, **kwargs)
+        self.cti_path = cti_path
+
+    def _new_registry(self):
+        return GenTLRegistry(self.cti_path)
+
+    def _create_handle(self, entry):
+        return self.handle.MV_CC_CreateHandleByGenTL(entry.info)
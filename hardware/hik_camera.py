@@ -1,37 +1,260 @@
 
-import sys
+import os
 import threading
 import time
 import ctypes
+from collections import deque
+from contextlib import contextmanager
 import numpy as np
 from PIL import Image
 from hardware.mock_camera import CameraBase
+from hardware.hik_sdk import *
+from hardware.device_registry import DeviceRegistry
+from hardware.node_access import NodeAccessor
 from utils.logger import setup_logger
 
 logger = setup_logger("HikHardware")
 
-# --- SDK IMPORT CHECK ---
-# Default installation path for Hikrobot MVS Python SDK
-SDK_PATH = r"C:\Program Files (x86)\MVS\Development\Samples\Python\MvImport"
+def _buffer_view(buf, count):
+    """
+    uint8 NumPy view over a ctypes array or POINTER(c_ubyte), without copying.
+    """
+    if isinstance(buf, ctypes.Array):
+        return np.frombuffer(buf, dtype=np.uint8, count=count)
+    return np.ctypeslib.as_array(buf, shape=(count,))
 
-try:
-    sys.path.append(SDK_PATH)
-    from MvCameraControl_class import *
-    HIK_SDK_AVAILABLE = True
-except ImportError:
-    HIK_SDK_AVAILABLE = False
-    logger.warning(f"Hikvision SDK not found at {SDK_PATH}. Please verify installation path.")
+PIXEL_TYPE_MONO8 = 17301505  # PixelType_Gvsp_Mono8
+
+# GevIEEE1588Status port states with a locked PTP clock (6 = Master, 9 = Slave)
+PTP_LOCKED_STATES = (6, 9)
+
+# Bayer8 pixel types -> (row, col) of the R and B sites in each 2x2 cell
+BAYER8_LAYOUTS = {
+    17301513: ((0, 0), (1, 1)),  # PixelType_Gvsp_BayerRG8
+    17301515: ((1, 1), (0, 0)),  # PixelType_Gvsp_BayerBG8
+    17301512: ((0, 1), (1, 0)),  # PixelType_Gvsp_BayerGR8
+    17301514: ((1, 0), (0, 1)),  # PixelType_Gvsp_BayerGB8
+}
+
+def bayer_superpixel(raw, pixel_type, step=2):
+    """
+    Cheap preview demosaic: every 2x2 Bayer cell becomes one RGB pixel
+    (R, mean of the two G, B) using strided slicing only.
+    raw: (height, width) uint8 Bayer mosaic.
+    step=2 -> half resolution, step=4 -> quarter resolution (every other cell).
+    """
+    (r_y, r_x), (b_y, b_x) = BAYER8_LAYOUTS[pixel_type]
+    # The two green sites are the other diagonal of the cell
+    g1_y, g1_x = r_y, b_x
+    g2_y, g2_x = b_y, r_x
+    h = raw.shape[0] // step * step
+    w = raw.shape[1] // step * step
+    raw = raw[:h, :w]
+
+    out = np.empty((h // step, w // step, 3), dtype=np.uint8)
+    out[..., 0] = raw[r_y::step, r_x::step]
+    g = raw[g1_y::step, g1_x::step] >> 1
+    g += raw[g2_y::step, g2_x::step] >> 1
+    out[..., 1] = g
+    out[..., 2] = raw[b_y::step, b_x::step]
+    return out
+
+# SDK callbacks use stdcall on Windows (see Python/Grab_Callback sample)
+_callback_ctype = getattr(ctypes, "WINFUNCTYPE", ctypes.CFUNCTYPE)
+
+class FrameSlot:
+    """
+    One preallocated raw frame buffer plus a copy of its frame info.
+    """
+    def __init__(self):
+        self.buffer = None
+        self.size = 0
+        self.nFrameLen = 0
+        self.info = None
+
+    def store(self, pData, pFrameInfo):
+        nFrameLen = pFrameInfo.contents.nFrameLen
+        if self.buffer is None or self.size < nFrameLen:
+            self.buffer = (ctypes.c_ubyte * nFrameLen)()
+            self.size = nFrameLen
+        ctypes.memmove(self.buffer, pData, nFrameLen)
+        if self.info is None:
+            self.info = MV_FRAME_OUT_INFO_EX()
+        ctypes.memmove(byref(self.info), pFrameInfo, sizeof(MV_FRAME_OUT_INFO_EX))
+        self.nFrameLen = nFrameLen
+
+class FrameMailbox:
+    """
+    Bounded hand-off of raw frames from the SDK callback thread to Python.
+    Holds at most `depth` ready frames; when full the oldest one is dropped so
+    consumers always get the most recent frame. Slots returned by get() must
+    be handed back with recycle().
+    """
+    def __init__(self, depth=2):
+        self.depth = depth
+        self._cond = threading.Condition()
+        self._ready = deque()
+        self._free = []
+        self._slot_count = 0
+        self.received = 0
+        self.dropped = 0
+
+    def put(self, pData, pFrameInfo):
+        # Runs on the SDK thread: only the memcpy happens outside the lock.
+        with self._cond:
+            self.received += 1
+            if self._free:
+                slot = self._free.pop()
+            elif self._slot_count < self.depth + 1:
+                slot = FrameSlot()
+                self._slot_count += 1
+            elif self._ready:
+                slot = self._ready.popleft()
+                self.dropped += 1
+            else:
+                self.dropped += 1
+                return
+        slot.store(pData, pFrameInfo)
+        with self._cond:
+            self._ready.append(slot)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """
+        Wait for the next frame. Returns a FrameSlot or None on timeout.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._ready, timeout=timeout):
+                return None
+            return self._ready.popleft()
+
+    def recycle(self, slot):
+        with self._cond:
+            self._free.append(slot)
+
+    def clear(self):
+        """
+        Drop any frames that arrived before the caller's trigger.
+        """
+        with self._cond:
+            while self._ready:
+                self._free.append(self._ready.popleft())
 
 class HikCamera(CameraBase):
-    def __init__(self, camera_id, ip_address):
+    supports_raw_encode = True
+    supports_clip_record = True
+    # Read back at connect: a stored profile is only trusted while the device still reports these
+    PROFILE_CHECK_NODES = (("enum", "PixelFormat"), ("int", "Width"), ("int", "Height"), ("float", "ExposureTime"),
+                           ("enum", "TriggerMode"), ("enum", "TriggerSource"))
+
+    def __init__(self, camera_id, ip_address, acquisition_mode="poll", ring_node_count=4, preview_binning=1,
+                 preview_demosaic="fast", registry=None, transport=None, hb_transfer=False,
+                 profile_store=None, access="exclusive", multicast_group=None, multicast_port=8787,
+                 preview_fps=5.0, multi_light=0, conversion_profiles=None, ptp=False):
         self.camera_id = camera_id
+        # IP address or serial number from config.CAMERA_IPS
         self.ip_address = ip_address
+        self.nodes = None  # NodeAccessor for the open handle
+        # Shared DeviceRegistry snapshot; connect() enumerates on its own if None
+        self.registry = registry
+        self.device = None
+        # GigETransportSettings applied at connect (GigE devices only)
+        self.transport = transport
+        self.transport_info = None
+
+        # FeatureProfileStore: bulk parameter restore at connect (None = node by node)
+        self.profile_store = profile_store
+        self.profile_state = None
+
+        # High-bandwidth (HB) lossless compressed transfer, decoded on the host
+        self.hb_transfer = hb_transfer
+        self.pHBBuf = None
+        self.nHBBufSize = 0
+        # decode_ms is wall-clock (includes waiting for the CPU), decode_cpu_ms the decoding thread's CPU time
+        self.hb_stats = {"frames": 0, "wire_bytes": 0, "decoded_bytes": 0, "decode_ms": 0.0, "decode_cpu_ms": 0.0}
+
+        # Multi-light (time-division) exposure: lighting channels line-interleaved in one frame,
+        # split with MV_CC_ReconstructImage by grab_multi_light(); 0 = off
+        self.multi_light = multi_light
+        self._split_bufs = []
+        self._split_buf_size = 0
+
+        # Link supervision: called (from the SDK thread) when the device drops
+        self.exception_listener = None
+        self._exception_callback = None
+        # "exclusive": sole owner, "control": owner that lets monitors join,
+        # "monitor": read-only viewer of a multicast stream (no node writes, no triggers)
+        self.access = access
+        self.monitor = access == "monitor"
+        # Multicast destination (GigE); the control station and its monitors use the same group
+        self.multicast_group = multicast_group
+        self.multicast_port = multicast_port
+
+        # "poll": MV_CC_GetOneFrameTimeout per grab
+        # "callback": frames pushed by MV_CC_RegisterImageCallBackEx into self.mailbox
+        # "ring": SDK-owned node ring read with MV_CC_GetImageBuffer/FreeImageBuffer
+        # Monitors cannot trigger, so they always read passively from the ring
+        self.acquisition_mode = "ring" if self.monitor and acquisition_mode == "poll" else acquisition_mode
+        self.ring_node_count = ring_node_count
+        # Free-run preview rate set on the camera (AcquisitionFrameRate); 0 = as fast as it can
+        self.preview_fps = preview_fps
+        # ResultingFrameRate read back while previewing, reported through fps_listener(camera_id, fps)
+        self.resulting_fps = None
+        self.fps_listener = None
+        self._fps_checked_at = 0.0
+        # Sensor-side reduction factor while previewing (1 = full resolution)
+        self.preview_binning = preview_binning
+        # "fast": NumPy superpixel from raw Bayer8, "sdk": MV_CC_ConvertPixelType + thumbnail
+        self.preview_demosaic = preview_demosaic
         self.handle = None
         self.connected = False
         
         # Buffer for raw data
         self.pData = None
         self.nPayloadSize = 0
+
+        # Reusable RGB conversion buffer (see acquire_frame/release_frame)
+        self.pRGBBuf = None
+        self.nRGBSize = 0
+        # Bayer -> RGB settings of the handle's converter per use: "preview" is the fastest
+        # interpolation with no filtering, "full" (final capture) the best quality plus gamma/CCM.
+        # quality: MV_CC_SetBayerCvtQuality (0 fast .. 2 optimal), gamma: 0 = off,
+        # ccm: 9 coefficients (row-major, scaled by ccm_scale) or None = off
+        self.conversion_profiles = conversion_profiles or {
+            "preview": {"quality": 0, "gamma": 0.0, "ccm": None, "ccm_scale": 1024},
+            "full": {"quality": 2, "gamma": 0.0, "ccm": None, "ccm_scale": 1024},
+        }
+        self._active_conversion = None  # Profile currently set on the handle
+        # Time spent converting raw frames per profile (see conversion_timing)
+        self.conversion_stats = {name: {"frames": 0, "ms": 0.0} for name in self.conversion_profiles}
+        self._frame_lock = threading.Lock()
+        # The SDK keeps one recorder per handle
+        self._record_lock = threading.Lock()
+
+        # Callback acquisition (acquisition_mode == "callback")
+        self.mailbox = FrameMailbox()
+        self._held_slot = None
+        self._image_callback = None
+
+        # Ring acquisition (acquisition_mode == "ring")
+        self._held_out_frame = None
+        self._grab_strategy = None
+        self._last_frame_num = None
+        self.ring_stats = {"frames": 0, "dropped": 0, "overruns": 0, "lost_packets": 0}
+
+        # Sensor profile: "full" for capture, "preview" while streaming
+        self.sensor_profile = "full"
+        self._full_roi = None
+
+        # Action-command trigger / device timestamps of the last grabbed frame.
+        # ptp enables IEEE 1588 at connect: the clocks need seconds to lock before the first batch
+        self.ptp = ptp
+        self.action_armed = False
+        self.last_frame_timestamp = None
+        self.timestamp_tick_hz = None
+
+        # Grab timeout (ms): exposure + readout + wire time at this camera's link share, see _update_grab_timeout
+        self.grab_timeout_ms = 1000
         
         # Streaming State
         self.streaming = False
@@ -44,70 +267,99 @@ class HikCamera(CameraBase):
 
         logger.info(f"Connecting to Camera {self.camera_id} ({self.ip_address})...")
         
-        # 1. Enum Devices
-        deviceList = MV_CC_DEVICE_INFO_LIST()
-        tlayerType = MV_GIGE_DEVICE | MV_USB_DEVICE
-        ret = MvCamera.MV_CC_EnumDevices(tlayerType, deviceList)
-        if ret != 0:
-            logger.error(f"Enum Devices failed: {ret}")
-            return False
-
-        # 2. Find Device by IP
-        target_device_info = None
-        for i in range(deviceList.nDeviceNum):
-            mvcc_dev_info = cast(deviceList.pDeviceInfo[i], POINTER(MV_CC_DEVICE_INFO)).contents
-            if mvcc_dev_info.nTLayerType == MV_GIGE_DEVICE:
-                # Get IP from GigE Info
-                gige_info = mvcc_dev_info.SpecialInfo.stGigEInfo
-                # Convert c_ubyte array to string
-                current_ip = f"{gige_info.nCurrentIp & 0xFF000000 >> 24}.{gige_info.nCurrentIp & 0x00FF0000 >> 16}.{gige_info.nCurrentIp & 0x0000FF00 >> 8}.{gige_info.nCurrentIp & 0x000000FF}"
-                
-                # Note: The above bitwise might depend on endianness, easier to compare strict strings if accessible
-                # A safer way in Python SDK examples usually iterates and prints IPs.
-                # For now, let's trust the logic or use a simpler match if needed.
-                # Actually, the easier strategy is to match by UserDefinedName or SerialNumber if IP is tricky.
-                # But let's assume we scan all and connect to any for demo, or match IP string.
-                pass
-            
-            # SIMPLIFICATION FOR THIS PROJECT:
-            # We assume connection by Index for now if IP matching is complex in raw ctypes
-            # Ideally, we match config IP.
-            if i == (self.camera_id - 1): # Simple mapping: Cam 1 -> Index 0
-                target_device_info = mvcc_dev_info
-                break
-
-        if target_device_info is None:
-            logger.error(f"Camera {self.camera_id} not found in device list.")
-            return False
-
-        # 3. Create Handle
-        self.handle = MvCamera()
-        ret = self.handle.MV_CC_CreateHandle(target_device_info)
-        if ret != 0:
-            logger.error(f"Create Handle failed: {ret}")
+        # 1-3. Enumerate, find the device and create its handle
+        entry = self._bind_device()
+        if entry is None:
             return False
+        self.device = entry
+        # Converter settings belong to the handle; a new handle starts from SDK defaults
+        self._active_conversion = None
 
         # 4. Open Device
-        ret = self.handle.MV_CC_OpenDevice(MV_ACCESS_Exclusive, 0)
+        access_mode = {"exclusive": MV_ACCESS_Exclusive, "control": MV_ACCESS_Control,
+                       "monitor": MV_ACCESS_Monitor}[self.access]
+        ret = self.handle.MV_CC_OpenDevice(access_mode, 0)
         if ret != 0:
             logger.error(f"Open Device failed: {ret}")
             return False
 
-        # 5. Configure Parameters
-        # Set Trigger Mode = On (1)
-        ret = self.handle.MV_CC_SetEnumValue("TriggerMode", 1)
-        # Set Trigger Source = Software (7)
-        ret = self.handle.MV_CC_SetEnumValue("TriggerSource", 7)
+        self.nodes = NodeAccessor(self.handle)
+
+        # 5. Configure Parameters (the control station owns them; monitors only read)
+        # A stored profile (captured in trigger mode) restores everything in one call
+        if self.monitor:
+            self.profile_state = "monitor"
+        elif self.profile_store and entry.serial:
+            self.profile_state = self.profile_store.restore(self.nodes, entry.serial, self.camera_id,
+                                                            self.PROFILE_CHECK_NODES)
+        if self.profile_state not in ("matched", "loaded", "monitor"):
+            # Trigger Mode = On (1), Trigger Source = Software (7)
+            self.nodes.apply([("enum", "TriggerMode", 1), ("enum", "TriggerSource", 7)])
+        
+        if self.ptp and entry.tlayer_type == MV_GIGE_DEVICE and not self.monitor:
+            ret = self.nodes.set_bool("GevIEEE1588", True)
+            if ret != 0:
+                logger.warning(f"Camera {self.camera_id} PTP enable failed ({hex(ret)}), sync skew is not comparable.")
+
+        # HB compression changes the payload, so switch it before sizing buffers
+        if self.hb_transfer and not self.monitor:
+            ret = self.nodes.set_enum("ImageCompressionMode", "HB")
+            if ret != 0:
+                logger.warning(f"Camera {self.camera_id} does not support HB transfer ({hex(ret)}), using uncompressed.")
+                self.hb_transfer = False
+
+        # Multi-light: the camera strobes the lights in turn and interleaves their lines
+        if self.multi_light > 1 and not self.monitor:
+            ret = self.nodes.set_enum("MultiLightControl", self.multi_light)
+            if ret != 0:
+                logger.warning(f"Camera {self.camera_id} set MultiLightControl {self.multi_light} failed ({hex(ret)}), "
+                               f"frames are split as configured on the device.")
         
         # Get Payload Size for buffer allocation
-        stParam = MVCC_INTVALUE()
-        memset(byref(stParam), 0, sizeof(MVCC_INTVALUE))
-        ret = self.handle.MV_CC_GetIntValue("PayloadSize", stParam)
-        self.nPayloadSize = stParam.nCurValue
+        self.nPayloadSize = self.nodes.get_int("PayloadSize", 0)
         
         # Allocate buffer
         self.pData = (c_ubyte * self.nPayloadSize)()
 
+        # Mono8 sensors deliver single-channel images (no RGB expansion)
+        self.pixel_format = "Mono8" if self.nodes.get_enum("PixelFormat") == PIXEL_TYPE_MONO8 else "RGB8"
+
+        # Packet size / inter-packet delay / resend: must be set before grabbing
+        if self.transport and entry.tlayer_type == MV_GIGE_DEVICE and not self.monitor:
+            cameras_per_link = len(self.registry.devices_on_interface(entry.interface_ip)) or 1
+            self.transport_info = self.transport.apply(self.nodes, self.camera_id, cameras_per_link, self.nPayloadSize)
+
+        # First connect with profiles enabled: capture the configured state once (before grabbing locks UserSetSave)
+        if self.profile_state == "missing":
+            self.save_feature_profile()
+
+        # Multicast: one stream from the camera, any number of monitor stations on the group
+        if self.multicast_group and entry.tlayer_type == MV_GIGE_DEVICE:
+            if not self._set_multicast() and self.monitor:
+                return False
+
+        # Device-lost notifications for the supervisor
+        self._exception_callback = _callback_ctype(None, c_uint, c_void_p)(self._on_exception)
+        ret = self.handle.MV_CC_RegisterExceptionCallBack(self._exception_callback, None)
+        if ret != 0:
+            logger.warning(f"Register exception callback failed: {ret}")
+
+        # Callback mode: the SDK pushes frames, so register before grabbing starts
+        if self.acquisition_mode == "callback":
+            # Keep a reference: the SDK only holds a raw function pointer
+            self._image_callback = _callback_ctype(None, POINTER(c_ubyte), POINTER(MV_FRAME_OUT_INFO_EX), c_void_p)(self._on_image)
+            ret = self.handle.MV_CC_RegisterImageCallBackEx(self._image_callback, None)
+            if ret != 0:
+                logger.error(f"Register image callback failed: {ret}")
+                return False
+
+        # Ring mode: size the SDK node ring before grabbing starts
+        if self.acquisition_mode == "ring":
+            ret = self.handle.MV_CC_SetImageNodeNum(self.ring_node_count)
+            if ret != 0:
+                logger.warning(f"Set image node num failed: {ret}")
+            self._set_grab_strategy(MV_GrabStrategy_OneByOne)
+
         # 6. Start Grabbing
         ret = self.handle.MV_CC_StartGrabbing()
         if ret != 0:
@@ -116,111 +368,838 @@ class HikCamera(CameraBase):
 
         # --- DIAGNOSTICS: Check actual parameters ---
         try:
-            stFloatVal = MVCC_FLOATVALUE()
-            memset(byref(stFloatVal), 0, sizeof(MVCC_FLOATVALUE))
-            self.handle.MV_CC_GetFloatValue("ExposureTime", stFloatVal)
-            current_exposure = stFloatVal.fCurValue
-            
-            self.handle.MV_CC_GetFloatValue("Gain", stFloatVal)
-            current_gain = stFloatVal.fCurValue
+            current_exposure = self.nodes.get_float("ExposureTime")
+            current_gain = self.nodes.get_float("Gain")
             
-            logger.info(f"DIAGNOSTICS - Cam {self.camera_id} | Exposure: {current_exposure} us | Gain: {current_gain}")
+            logger.info(f"DIAGNOSTICS - Cam {self.camera_id} | Exposure: {current_exposure} us | Gain: {current_gain} | "
+                        f"Node round-trips at connect: {self.nodes.round_trips}")
         except:
             logger.warning("Could not read diagnostic params.")
         # --------------------------------------------
+        self._update_grab_timeout()
 
         self.connected = True
         logger.info(f"Camera {self.camera_id} connected successfully.")
         return True
 
+    def _update_grab_timeout(self):
+        """
+        Size the grab timeout to how long a frame can really take: exposure
+        and sensor readout (one ResultingFrameRate period covers both) plus
+        the wire time at this camera's share of the link (GevSCPD pacing
+        spreads a NIC's bandwidth over all its cameras), with a 1.5x + 500 ms
+        margin. Never below the SDK sample default of 1000 ms.
+        """
+        exposure_ms = (self.nodes.get_float("ExposureTime") or 0.0) / 1000.0
+        fps = self.nodes.get_float("ResultingFrameRate")
+        sensor_ms = max(exposure_ms, 1000.0 / fps) if fps else exposure_ms
+        wire_ms = self.transport_info["frame_ms"] if self.transport_info else 0.0
+        self.grab_timeout_ms = max(1000, int((sensor_ms + wire_ms) * 1.5) + 500)
+        logger.info(f"Cam {self.camera_id} grab timeout {self.grab_timeout_ms} ms "
+                    f"(sensor ~{sensor_ms:.0f} ms, wire ~{wire_ms:.0f} ms)")
+
+    def _new_registry(self):
+        return DeviceRegistry()
+
+    def _create_handle(self, entry):
+        return self.handle.MV_CC_CreateHandle(entry.info)
+
+    def _bind_device(self):
+        """
+        Find this camera in the registry by IP / serial number and create its
+        handle. Returns the DeviceEntry, or None.
+        """
+        # 1. Enum Devices (once per registry, shared by all cameras)
+        if self.registry is None:
+            registry = self._new_registry()
+            if not registry.enumerate():
+                return None
+            self.registry = registry
+        registry = self.registry
+
+        # 2. Find Device by IP / Serial Number
+        entry = registry.lookup(self.ip_address)
+        if entry is None and self.ip_address in (None, "", "0.0.0.0"):
+            # No binding configured: fall back to enumeration order (Cam 1 -> Index 0)
+            if self.camera_id - 1 < len(registry.devices):
+                entry = registry.devices[self.camera_id - 1]
+                logger.warning(f"Camera {self.camera_id} has no configured IP/serial, using device index {entry.index}.")
+
+        if entry is None:
+            logger.error(f"Camera {self.camera_id} ({self.ip_address}) not found in device list.")
+            return None
+
+        # 3. Create Handle
+        self.handle = MvCamera()
+        ret = self._create_handle(entry)
+        if ret != 0:
+            logger.error(f"Create Handle failed: {ret}")
+            return None
+        return entry
+
+    def _set_multicast(self):
+        """
+        MV_GIGE_SetTransmissionType(MULTICAST) to multicast_group:multicast_port,
+        as in Python/MultiCast. Must run before grabbing starts.
+        """
+        a, b, c, d = (int(x) for x in self.multicast_group.split("."))
+        stTransmissionType = MV_TRANSMISSION_TYPE()
+        memset(byref(stTransmissionType), 0, sizeof(MV_TRANSMISSION_TYPE))
+        stTransmissionType.enTransmissionType = MV_GIGE_TRANSTYPE_MULTICAST
+        stTransmissionType.nDestIp = (a << 24) | (b << 16) | (c << 8) | d
+        stTransmissionType.nDestPort = self.multicast_port
+        ret = self.handle.MV_GIGE_SetTransmissionType(stTransmissionType)
+        if ret != 0:
+            logger.error(f"Cam {self.camera_id} multicast {self.multicast_group}:{self.multicast_port} failed: {hex(ret)}")
+            return False
+        logger.info(f"Cam {self.camera_id} streaming multicast to {self.multicast_group}:{self.multicast_port} ({self.access})")
+        return True
+
+    def save_feature_profile(self):
+        """
+        Capture the current camera parameters as this camera's profile
+        (call after changing exposure/gain/white balance/ROI).
+        """
+        if not self.profile_store or not self.device or not self.device.serial:
+            return False
+        ok = self.profile_store.save(self.nodes, self.device.serial, self.camera_id, self.PROFILE_CHECK_NODES)
+        if ok:
+            self.profile_state = "matched"
+        return ok
+
     def disconnect(self):
         if self.handle:
             self.handle.MV_CC_StopGrabbing()
             self.handle.MV_CC_CloseDevice()
             self.handle.MV_CC_DestroyHandle()
+            self.handle = None
+            self.nodes = None
         
         self.connected = False
         logger.info(f"Camera {self.camera_id} disconnected.")
 
-    def grab_image(self):
+    # --- Link Supervision ---
+    def _on_exception(self, nMsgType, pUser):
+        """
+        MV_CC_RegisterExceptionCallBack handler (SDK thread): only flag the
+        loss here, the supervisor does the reconnect.
+        """
+        logger.error(f"Camera {self.camera_id} exception {hex(nMsgType)} (device lost)")
+        self.connected = False
+        if self.exception_listener:
+            self.exception_listener(self)
+
+    def is_alive(self):
+        """
+        True while the device answers (MV_CC_IsDeviceConnected).
+        """
+        if not self.connected or not self.handle:
+            return False
+        return bool(self.handle.MV_CC_IsDeviceConnected())
+
+    def reconnect(self):
+        """
+        Drop the dead handle and bind again from a fresh enumeration.
+        connect() re-applies trigger, transport, ring and callback settings.
+        The caller restarts streaming if it was active.
+        """
+        self.streaming = False
+        if self.stream_thread:
+            self.stream_thread.join(timeout=2.0)
+            self.stream_thread = None
+        with self._frame_lock:
+            self._release_held_slot()
+            self.disconnect()
+        self.mailbox.clear()
+        self.sensor_profile = "full"
+        self._grab_strategy = None
+        self._last_frame_num = None
+        self.action_armed = False
+
+        # Enumerate again: the device may have come back on another index
+        registry = self._new_registry()
+        if not registry.enumerate():
+            return False
+        self.registry = registry
+        return self.connect()
+
+    def grab_image(self, send_trigger=True):
         """
         Software Trigger -> Capture -> Convert to PIL
+        The returned PIL image owns its own copy of the pixels, so it stays
+        valid after the camera's frame buffer is reused.
+        send_trigger=False waits for a frame fired externally (action command).
+        """
+        with self.frame(send_trigger) as arr:
+            # Disable DecompressionBomb warning globally for this module
+            Image.MAX_IMAGE_PIXELS = None
+            return self._owned_image(arr)
+
+    def _owned_image(self, arr):
+        """
+        PIL image with its own pixels from a frame view; call while the frame is held.
+        Mono8 cameras return "L" images; anything else is RGB.
+        """
+        img = Image.fromarray(arr)
+        if img.mode == "RGB":
+            return img # fromarray copies RGB data
+        # 2-D "L" images share the view's memory (pData, a mailbox slot, a ring node)
+        return img.copy() if self.pixel_format == "Mono8" else img.convert("RGB")
+
+    # --- Zero-copy Frame Access ---
+    # Ownership contract:
+    #   acquire_frame() returns a NumPy view over memory owned by this camera
+    #   (the reusable RGB buffer, or self.pData when color conversion fails).
+    #   The view is only valid until release_frame() is called. Until then the
+    #   camera holds its frame lock, so the next grab on this camera blocks
+    #   instead of overwriting pixels the caller is still reading.
+    #   Copy (np.array(view) / Image.fromarray(view)) anything that must
+    #   outlive the release.
+    def acquire_frame(self, send_trigger=True):
+        """
+        Software Trigger -> Capture -> Convert into the preallocated RGB buffer.
+        Returns a (height, width, 3) uint8 view, or (height, width) for Mono8
+        frames (a view of the raw buffer) and the Mono fallback. Must be
+        paired with release_frame().
+        """
+        stFrameInfo, pSrcData, nSrcDataLen = self._acquire_raw(send_trigger)
+        try:
+            return self._convert_frame(stFrameInfo, pSrcData, nSrcDataLen)
+        except Exception:
+            self.release_frame()
+            raise
+
+    def _acquire_raw(self, send_trigger=True):
+        """
+        Take the frame lock, trigger and return the raw frame as
+        (stFrameInfo, pSrcData, nSrcDataLen); pSrcData None means self.pData.
+        Must be paired with release_frame().
         """
         if not self.connected or not self.handle:
              raise Exception(f"HikCamera {self.camera_id} not connected")
+        if self.monitor:
+            # Read-only: wait for the next frame the control station produces
+            send_trigger = False
 
-        # 1. Send Software Trigger Command
-        ret = self.handle.MV_CC_SetCommandValue("TriggerSoftware")
+        self._frame_lock.acquire()
+        try:
+            if self.acquisition_mode == "callback":
+                slot = self._trigger_and_wait(send_trigger=send_trigger)
+                self._held_slot = slot
+                self._record_timestamp(slot.info)
+                return slot.info, slot.buffer, slot.nFrameLen
+            if self.acquisition_mode == "ring":
+                stOutFrame = self._trigger_and_get_buffer(send_trigger=send_trigger)
+                self._held_out_frame = stOutFrame
+                self._record_timestamp(stOutFrame.stFrameInfo)
+                return stOutFrame.stFrameInfo, stOutFrame.pBufAddr, stOutFrame.stFrameInfo.nFrameLen
+            stFrameInfo = self._trigger_and_fetch(send_trigger=send_trigger)
+            self._record_timestamp(stFrameInfo)
+            return stFrameInfo, None, None
+        except Exception:
+            self._release_held_slot()
+            self._frame_lock.release()
+            raise
+
+    def grab_to_file(self, filepath, quality=80, send_trigger=True):
+        """
+        Software Trigger -> Capture -> JPEG-encode the raw (e.g. Bayer) frame
+        in the SDK with MV_CC_SaveImageToFileEx. No RGB frame is built in
+        Python, so no overlay or resize can be applied.
+        Returns a small preview PIL image for the UI.
+        """
+        stFrameInfo, pSrcData, nSrcDataLen = self._acquire_raw(send_trigger)
+        try:
+            stFrameInfo, pSrcData, nSrcDataLen = self._decode_hb(stFrameInfo, pSrcData, nSrcDataLen)
+            if pSrcData is None:
+                pSrcData, nSrcDataLen = self.pData, stFrameInfo.nFrameLen
+
+            self._use_conversion("full")
+            stSaveParam = MV_SAVE_IMAGE_TO_FILE_PARAM_EX()
+            memset(byref(stSaveParam), 0, sizeof(stSaveParam))
+            stSaveParam.enPixelType = stFrameInfo.enPixelType
+            stSaveParam.nWidth = stFrameInfo.nWidth
+            stSaveParam.nHeight = stFrameInfo.nHeight
+            stSaveParam.pData = cast(pSrcData, POINTER(c_ubyte))
+            stSaveParam.nDataLen = nSrcDataLen
+            stSaveParam.enImageType = MV_Image_Jpeg
+            stSaveParam.nQuality = min(max(int(quality), 51), 99)  # SDK accepts (50, 99]
+            stSaveParam.pcImagePath = ctypes.create_string_buffer(filepath.encode("mbcs" if os.name == "nt" else "utf-8"))
+            stSaveParam.iMethodValue = min(self.conversion_profiles["full"]["quality"], 2)  # Bayer interpolation: 0 fast, 1 balanced, 2 optimal
+            ret = self.handle.MV_CC_SaveImageToFileEx(stSaveParam)
+            if ret != 0:
+                raise Exception(f"SaveImageToFileEx failed: {hex(ret)}")
+            return self._preview_image(stFrameInfo, pSrcData, nSrcDataLen)
+        finally:
+            self.release_frame()
+
+    def grab_multi_light(self, send_trigger=True):
+        """
+        Software Trigger -> one multi-light frame -> MV_CC_ReconstructImage
+        (MV_SPLIT_BY_LINE) into one image per lighting channel, as in
+        MultiLightCtrl_ImageStitching. Returns a list of multi_light PIL
+        images (light 1 first, RGB or "L" as grab_image), each owning its pixels.
+        """
+        nExposureNum = self.multi_light
+        if not 2 <= nExposureNum <= MV_MAX_SPLIT_NUM:
+            raise Exception(f"HikCamera {self.camera_id} multi_light {nExposureNum} outside 2..{MV_MAX_SPLIT_NUM}")
+        stFrameInfo, pSrcData, nSrcDataLen = self._acquire_raw(send_trigger)
+        try:
+            stFrameInfo, pSrcData, nSrcDataLen = self._decode_hb(stFrameInfo, pSrcData, nSrcDataLen)
+            if pSrcData is None:
+                pSrcData, nSrcDataLen = self.pData, stFrameInfo.nFrameLen
+
+            # One reusable output buffer per light, each a 1/N share of the frame
+            nBufSize = nSrcDataLen // nExposureNum
+            if len(self._split_bufs) != nExposureNum or self._split_buf_size < nBufSize:
+                self._split_bufs = [(c_ubyte * nBufSize)() for _ in range(nExposureNum)]
+                self._split_buf_size = nBufSize
+
+            stReconstructParam = MV_RECONSTRUCT_IMAGE_PARAM()
+            memset(byref(stReconstructParam), 0, sizeof(stReconstructParam))
+            stReconstructParam.nWidth = stFrameInfo.nWidth
+            stReconstructParam.nHeight = stFrameInfo.nHeight
+            stReconstructParam.enPixelType = stFrameInfo.enPixelType
+            stReconstructParam.pSrcData = cast(pSrcData, POINTER(c_ubyte))
+            stReconstructParam.nSrcDataLen = nSrcDataLen
+            stReconstructParam.nExposureNum = nExposureNum
+            stReconstructParam.enReconstructMethod = MV_SPLIT_BY_LINE
+            for i, buf in enumerate(self._split_bufs):
+                stReconstructParam.stDstBufList[i].pBuf = cast(buf, POINTER(c_ubyte))
+                stReconstructParam.stDstBufList[i].nBufSize = self._split_buf_size
+            ret = self.handle.MV_CC_ReconstructImage(stReconstructParam)
+            if ret != 0:
+                raise Exception(f"ReconstructImage failed: {hex(ret)}")
+
+            images = []
+            for i, buf in enumerate(self._split_bufs):
+                stOutput = stReconstructParam.stDstBufList[i]
+                stLightInfo = MV_FRAME_OUT_INFO_EX()
+                ctypes.memmove(byref(stLightInfo), byref(stFrameInfo), sizeof(MV_FRAME_OUT_INFO_EX))
+                stLightInfo.nWidth = stOutput.nWidth
+                stLightInfo.nHeight = stOutput.nHeight
+                stLightInfo.enPixelType = stOutput.enPixelType
+                stLightInfo.nFrameLen = stOutput.nBufLen
+                Image.MAX_IMAGE_PIXELS = None
+                images.append(self._owned_image(self._convert_frame(stLightInfo, buf, stOutput.nBufLen)))
+            return images
+        finally:
+            self.release_frame()
+
+    def record_clip(self, frames, fps, filepath, bitrate_kbps=2000):
+        """
+        Encode RGB frames (equal-sized (h, w, 3) uint8 arrays) into an AVI
+        with the SDK recorder: MV_CC_StartRecord -> InputOneFrame per frame
+        -> StopRecord. Independent of grabbing, so preview keeps running.
+        """
+        if not self.handle or not frames:
+            return False
+        height, width = frames[0].shape[:2]
+        stRecordPar = MV_CC_RECORD_PARAM()
+        memset(byref(stRecordPar), 0, sizeof(MV_CC_RECORD_PARAM))
+        stRecordPar.enPixelType = PixelType_Gvsp_RGB8_Packed
+        stRecordPar.nWidth = width
+        stRecordPar.nHeight = height
+        stRecordPar.fFrameRate = fps
+        stRecordPar.nBitRate = bitrate_kbps
+        stRecordPar.enRecordFmtType = MV_FormatType_AVI
+        stRecordPar.strFilePath = filepath.encode("utf-8")  # The recorder expects UTF-8 even on Windows
+
+        with self._record_lock:
+            ret = self.handle.MV_CC_StartRecord(stRecordPar)
+            if ret != 0:
+                logger.error(f"Cam {self.camera_id} start record failed: {hex(ret)}")
+                return False
+            stInputFrameInfo = MV_CC_INPUT_FRAME_INFO()
+            memset(byref(stInputFrameInfo), 0, sizeof(MV_CC_INPUT_FRAME_INFO))
+            try:
+                for frame in frames:
+                    frame = np.ascontiguousarray(frame)
+                    stInputFrameInfo.pData = frame.ctypes.data_as(POINTER(c_ubyte))
+                    stInputFrameInfo.nDataLen = frame.nbytes
+                    ret = self.handle.MV_CC_InputOneFrame(stInputFrameInfo)
+                    if ret != 0:
+                        logger.warning(f"Cam {self.camera_id} record input frame failed: {hex(ret)}")
+            finally:
+                ret = self.handle.MV_CC_StopRecord()
         if ret != 0:
-             raise Exception(f"Trigger failed: {ret}")
+            logger.error(f"Cam {self.camera_id} stop record failed: {hex(ret)}")
+            return False
+        return True
+
+    def release_frame(self):
+        """
+        Hand the frame buffer back to the camera so the next grab can reuse it.
+        Views returned by acquire_frame() must not be used after this call.
+        """
+        self._release_held_slot()
+        self._frame_lock.release()
+
+    def _release_held_slot(self):
+        if self._held_slot is not None:
+            self.mailbox.recycle(self._held_slot)
+            self._held_slot = None
+        if self._held_out_frame is not None:
+            self.handle.MV_CC_FreeImageBuffer(self._held_out_frame)
+            self._held_out_frame = None
+
+    @contextmanager
+    def frame(self, send_trigger=True):
+        """
+        with cam.frame() as arr: ... -> acquire_frame()/release_frame() pair.
+        """
+        arr = self.acquire_frame(send_trigger)
+        try:
+            yield arr
+        finally:
+            self.release_frame()
+
+    def _trigger_and_fetch(self, send_trigger=True):
+        """
+        Send a software trigger and read the raw payload into self.pData.
+        Returns the MV_FRAME_OUT_INFO_EX of the received frame.
+        """
+        # 1. Send Software Trigger Command
+        if send_trigger:
+            ret = self.nodes.command("TriggerSoftware")
+            if ret != 0:
+                 raise Exception(f"Trigger failed: {ret}")
 
         # 2. Get Frame
         stFrameInfo = MV_FRAME_OUT_INFO_EX()
         memset(byref(stFrameInfo), 0, sizeof(MV_FRAME_OUT_INFO_EX))
         
-        # Wait up to 1000ms
-        ret = self.handle.MV_CC_GetOneFrameTimeout(byref(self.pData), self.nPayloadSize, stFrameInfo, 1000)
-        
-        if ret == 0:
-            # Success
-            width = stFrameInfo.nWidth
-            height = stFrameInfo.nHeight
-            pixelType = stFrameInfo.enPixelType
-            
-            logger.info(f"Frame Captured: {width}x{height} | PayloadSize: {self.nPayloadSize} | PixelType: {pixelType}")
+        # Wait as long as this camera's frame can take (see _update_grab_timeout)
+        ret = self.handle.MV_CC_GetOneFrameTimeout(byref(self.pData), self.nPayloadSize, stFrameInfo, self.grab_timeout_ms)
+        if ret != 0:
+             raise Exception(f"GetFrame failed: {ret}")
+
+        width = stFrameInfo.nWidth
+        height = stFrameInfo.nHeight
+        logger.info(f"Frame Captured: {width}x{height} | PayloadSize: {self.nPayloadSize} | PixelType: {stFrameInfo.enPixelType}")
 
-            # Check for insane dimensions
-            if width > 20000 or height > 20000:
-                logger.error(f"Insane dimensions: {width}x{height}. Rejecting.")
-                raise Exception(f"Invalid dimensions: {width}x{height}")
+        # Check for insane dimensions
+        if width > 20000 or height > 20000:
+            logger.error(f"Insane dimensions: {width}x{height}. Rejecting.")
+            raise Exception(f"Invalid dimensions: {width}x{height}")
+        return stFrameInfo
 
+    # --- Action Command (Synchronized) Trigger ---
+    def arm_action_trigger(self, device_key, group_key, group_mask):
+        """
+        Switch the trigger source to Action1 so a single
+        MV_GIGE_IssueActionCommand broadcast fires every armed camera at once.
+        Stale frames are discarded here, so grab_image(send_trigger=False)
+        returns the action-triggered frame. Returns False if unsupported.
+        """
+        if self.monitor:
+            return False
+        with self._frame_lock:
+            # PTP (enabled at connect) keeps device timestamps comparable across cameras
+            if self.ptp:
+                status = self.nodes.get_enum("GevIEEE1588Status")
+                if status not in PTP_LOCKED_STATES:
+                    logger.warning(f"Cam {self.camera_id} PTP clock not locked (GevIEEE1588Status={status}); "
+                                   f"action timing and reported skew are unsynchronized.")
+            failed = self.nodes.apply([
+                ("int", "ActionSelector", 1),
+                ("int", "ActionDeviceKey", device_key),
+                ("int", "ActionGroupKey", group_key),
+                ("int", "ActionGroupMask", group_mask),
+                ("enum", "TriggerSource", "Action1"),
+            ])
+            if failed:
+                logger.warning(f"Cam {self.camera_id} action trigger not supported ({failed})")
+                self.nodes.set_enum("TriggerSource", 7)
+                return False
+
+            if self.timestamp_tick_hz is None:
+                self.timestamp_tick_hz = self.nodes.get_int("GevTimestampTickFrequency")
+            self.mailbox.clear()
+            self.handle.MV_CC_ClearImageBuffer()
+            self.action_armed = True
+            return True
+
+    def disarm_action_trigger(self):
+        """
+        Back to software trigger (TriggerSource = 7).
+        """
+        if not self.action_armed:
+            return
+        with self._frame_lock:
+            self.nodes.set_enum("TriggerSource", 7)
+            self.action_armed = False
+
+    def _record_timestamp(self, stFrameInfo):
+        self.last_frame_timestamp = (stFrameInfo.nDevTimeStampHigh << 32) | stFrameInfo.nDevTimeStampLow
+
+    # --- Callback Acquisition ---
+    def _on_image(self, pData, pFrameInfo, pUser):
+        """
+        MV_CC_RegisterImageCallBackEx handler. Runs on the SDK grab thread:
+        copy the payload into the mailbox and return immediately.
+        """
+        try:
+            if pFrameInfo:
+                self.mailbox.put(pData, pFrameInfo)
+        except Exception as e:
+            logger.error(f"Cam {self.camera_id} image callback error: {e}")
+
+    def _trigger_and_wait(self, timeout=None, send_trigger=True):
+        """
+        Callback-mode counterpart of _trigger_and_fetch: trigger, then wait
+        for the SDK thread to deliver the frame into the mailbox.
+        timeout (s) defaults to the camera's grab timeout.
+        """
+        if timeout is None:
+            timeout = self.grab_timeout_ms / 1000.0
+        if send_trigger:
+            self.mailbox.clear()
+            ret = self.nodes.command("TriggerSoftware")
+            if ret != 0:
+                 raise Exception(f"Trigger failed: {ret}")
+
+        slot = self.mailbox.get(timeout=timeout)
+        if slot is None:
+            raise Exception(f"GetFrame timed out after {timeout}s (callback mode)")
+        return slot
+
+    # --- Ring Acquisition ---
+    def _set_grab_strategy(self, strategy):
+        """
+        LatestImagesOnly for preview (stale nodes are discarded by the SDK),
+        OneByOne for capture (every triggered frame is delivered in order).
+        """
+        if self._grab_strategy == strategy:
+            return
+        ret = self.handle.MV_CC_SetGrabStrategy(strategy)
+        if ret != 0:
+            logger.warning(f"Cam {self.camera_id} set grab strategy {strategy} failed: {ret}")
+            return
+        self._grab_strategy = strategy
+
+    def _get_image_buffer(self, timeout_ms=1000):
+        """
+        Borrow the next node from the SDK ring. The caller must hand it back
+        with MV_CC_FreeImageBuffer. Returns None on timeout.
+        """
+        stOutFrame = MV_FRAME_OUT()
+        memset(byref(stOutFrame), 0, sizeof(stOutFrame))
+        ret = self.handle.MV_CC_GetImageBuffer(stOutFrame, timeout_ms)
+        if ret != 0:
+            return None
+        self._update_ring_stats(stOutFrame.stFrameInfo)
+        return stOutFrame
+
+    def _update_ring_stats(self, stFrameInfo):
+        stats = self.ring_stats
+        stats["frames"] += 1
+        stats["lost_packets"] += stFrameInfo.nLostPacket
+        # Gaps in the device frame number = frames the ring never delivered.
+        # Expected under LatestImagesOnly (preview), an overrun under OneByOne.
+        if self._last_frame_num is not None and stFrameInfo.nFrameNum > self._last_frame_num + 1:
+            stats["dropped"] += stFrameInfo.nFrameNum - self._last_frame_num - 1
+        self._last_frame_num = stFrameInfo.nFrameNum
+        if self._grab_strategy == MV_GrabStrategy_OneByOne:
+            nValidNum = c_uint(0)
+            if self.handle.MV_CC_GetValidImageNum(nValidNum) == 0 and nValidNum.value >= self.ring_node_count - 1:
+                stats["overruns"] += 1
+
+    def _trigger_and_get_buffer(self, timeout_ms=None, send_trigger=True):
+        """
+        Ring-mode counterpart of _trigger_and_fetch: discard stale nodes,
+        trigger, and borrow the resulting node without copying it.
+        timeout_ms defaults to the camera's grab timeout.
+        """
+        if timeout_ms is None:
+            timeout_ms = self.grab_timeout_ms
+        self._set_grab_strategy(MV_GrabStrategy_OneByOne)
+        if send_trigger:
+            self.handle.MV_CC_ClearImageBuffer()
+            ret = self.nodes.command("TriggerSoftware")
+            if ret != 0:
+                 raise Exception(f"Trigger failed: {ret}")
+
+        stOutFrame = self._get_image_buffer(timeout_ms)
+        if stOutFrame is None:
+            raise Exception(f"GetImageBuffer timed out after {timeout_ms}ms")
+        return stOutFrame
+
+    def stream_stats(self):
+        """
+        Acquisition counters for the active mode (for logs / dashboard).
+        Poll mode keeps no frame counters; returns None when there is nothing to report.
+        """
+        if self.acquisition_mode == "callback":
+            stats = {"frames": self.mailbox.received, "dropped": self.mailbox.dropped}
+        elif self.acquisition_mode == "ring":
+            stats = dict(self.ring_stats)
+        else:
+            stats = {}
+        if self.nodes:
+            stats["node_round_trips"] = self.nodes.round_trips
+        timing = self.conversion_timing()
+        if timing:
+            stats["convert_ms"] = timing
+        return stats or None
+
+    # --- Sensor Profiles (preview vs full resolution) ---
+    def _reconfigure_stream(self, apply_fn):
+        """
+        Binning/ROI nodes are locked while grabbing: stop the stream, apply the
+        change, resize the payload buffer and restart. Runs under the frame
+        lock so no grab can observe a half-switched camera.
+        """
+        with self._frame_lock:
+            self.handle.MV_CC_StopGrabbing()
             try:
-                # 3. Handle data with Color Conversion
-                # Use SDK to convert Bayer/Mono to RGB8Packed
-                PixelType_Gvsp_RGB8_Packed = 0x02180014 # Constant
-                
-                nRGBSize = width * height * 3
-                # Allocate ctypes buffer for RGB
-                pRGBBuf = (ctypes.c_ubyte * nRGBSize)()
-                
-                stConvertParam = MV_CC_PIXEL_CONVERT_PARAM()
-                memset(byref(stConvertParam), 0, sizeof(stConvertParam))
-                stConvertParam.nWidth = width
-                stConvertParam.nHeight = height
-                stConvertParam.pSrcData = self.pData
-                stConvertParam.nSrcDataLen = self.nPayloadSize
-                stConvertParam.enSrcPixelType = pixelType
-                stConvertParam.enDstPixelType = PixelType_Gvsp_RGB8_Packed
-                stConvertParam.pDstBuffer = cast(pRGBBuf, POINTER(ctypes.c_ubyte))
-                stConvertParam.nDstBufferSize = nRGBSize
-                
-                ret_conv = self.handle.MV_CC_ConvertPixelType(stConvertParam)
-                
-                if ret_conv == 0:
-                    # Conversion Success -> Create RGB Image
-                    # Disable DecompressionBomb warning globally for this module
-                    Image.MAX_IMAGE_PIXELS = None
-                    
-                    rgb_bytes = ctypes.string_at(pRGBBuf, nRGBSize)
-                    img = Image.frombytes('RGB', (width, height), rgb_bytes)
-                    
-                    # Log once to confirm color works (debug)
-                    # logger.info(f"Converted to RGB8. Size: {len(rgb_bytes)}")
-                    return img
-                
-                else:
-                    logger.warning(f"Color conversion failed (ret={hex(ret_conv)}), falling back to Mono/Raw")
-                    # Fallback to original logic
-                    raw_bytes = ctypes.string_at(self.pData, self.nPayloadSize)
-                    Image.MAX_IMAGE_PIXELS = None 
-                    img = Image.frombytes('L', (width, height), raw_bytes)
-                    return img.convert("RGB")
-                    
-            except Exception as e:
-                logger.error(f"Image processing failed: {e}")
-                raise e
+                apply_fn()
+            finally:
+                nPayloadSize = self.nodes.get_int("PayloadSize")
+                if nPayloadSize and nPayloadSize != self.nPayloadSize:
+                    self.nPayloadSize = nPayloadSize
+                    self.pData = (c_ubyte * self.nPayloadSize)()
+                if self.acquisition_mode == "ring":
+                    self._last_frame_num = None
+                ret = self.handle.MV_CC_StartGrabbing()
+                if ret != 0:
+                    logger.error(f"Cam {self.camera_id} restart grabbing failed: {ret}")
+
+    def _apply_preview_profile(self):
+        """
+        Reduce the sensor output by preview_binning: binning first (keeps the
+        field of view and sums light), then decimation, then a centered ROI.
+        """
+        factor = self.preview_binning
+        self._full_roi = {name: self.nodes.get_int(name) for name in ("Width", "Height", "OffsetX", "OffsetY")}
+
+        for h_node, v_node in (("BinningHorizontal", "BinningVertical"), ("DecimationHorizontal", "DecimationVertical")):
+            if not self.nodes.apply([("enum", h_node, factor), ("enum", v_node, factor)]):
+                logger.info(f"Cam {self.camera_id} preview profile: {h_node}/{v_node} x{factor}")
+                return
+            self.nodes.apply([("enum", h_node, 1), ("enum", v_node, 1)])
+
+        # No binning/decimation support: stream a centered window instead
+        full_w, full_h = self._full_roi["Width"], self._full_roi["Height"]
+        if not full_w or not full_h:
+            logger.warning(f"Cam {self.camera_id} preview profile unavailable, streaming full resolution.")
+            return
+        roi_w = (full_w // factor) // 16 * 16
+        roi_h = (full_h // factor) // 16 * 16
+        self.nodes.apply([
+            ("int", "Width", roi_w),
+            ("int", "Height", roi_h),
+            ("int", "OffsetX", ((full_w - roi_w) // 2) // 16 * 16),
+            ("int", "OffsetY", ((full_h - roi_h) // 2) // 16 * 16),
+        ])
+        logger.info(f"Cam {self.camera_id} preview profile: ROI {roi_w}x{roi_h}")
+
+    def _apply_full_profile(self):
+        writes = [("enum", name, 1) for name in ("BinningHorizontal", "BinningVertical", "DecimationHorizontal", "DecimationVertical")]
+        if self._full_roi:
+            # Offsets first so the full width/height fits again
+            writes += [("int", name, self._full_roi[name]) for name in ("OffsetX", "OffsetY", "Width", "Height")
+                       if self._full_roi[name] is not None]
+        self.nodes.apply(writes)
+
+    def set_sensor_profile(self, profile):
+        """
+        Switch between the "preview" (reduced) and "full" sensor profiles.
+        No-op when preview_binning is 1 or the profile is already active.
+        """
+        if self.preview_binning <= 1 or profile == self.sensor_profile or not self.handle or self.monitor:
+            return
+        apply_fn = self._apply_preview_profile if profile == "preview" else self._apply_full_profile
+        self._reconfigure_stream(apply_fn)
+        self.sensor_profile = profile
+
+    # --- Preview Rendering ---
+    def _preview_image(self, stFrameInfo, pSrcData=None, nSrcDataLen=None):
+        """
+        Build the small PIL image for the UI from a raw frame. Bayer8 frames
+        skip the full-resolution SDK demosaic when preview_demosaic == "fast".
+        Caller holds the frame lock.
+        """
+        stFrameInfo, pSrcData, nSrcDataLen = self._decode_hb(stFrameInfo, pSrcData, nSrcDataLen)
+        width = stFrameInfo.nWidth
+        height = stFrameInfo.nHeight
+        if self.preview_demosaic == "fast" and stFrameInfo.enPixelType in BAYER8_LAYOUTS:
+            if pSrcData is None:
+                pSrcData = self.pData
+            raw = _buffer_view(pSrcData, width * height).reshape(height, width)
+            # Quarter resolution while that still covers the 800px preview
+            step = 4 if width // 4 >= 800 else 2
+            t0 = time.perf_counter()
+            img = Image.fromarray(bayer_superpixel(raw, stFrameInfo.enPixelType, step))
+            self._record_conversion("preview", t0)
         else:
-             raise Exception(f"GetFrame failed: {ret}")
+            img = Image.fromarray(self._convert_frame(stFrameInfo, pSrcData, nSrcDataLen, profile="preview"))
+        img.thumbnail((800, 600))
+        # Mono8 is expanded only after the thumbnail, so the preview stays cheap
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        return img
+
+    # --- HB Decode ---
+    def _decode_hb(self, stFrameInfo, pSrcData=None, nSrcDataLen=None):
+        """
+        If the frame arrived HB-compressed (pixel type with the 0x80000000
+        bit), decode it with MV_CC_HBDecode into the reusable self.pHBBuf and
+        return (decoded frame info, buffer, length). Uncompressed frames pass
+        through untouched.
+        """
+        if not (stFrameInfo.enPixelType & 0x80000000):
+            return stFrameInfo, pSrcData, nSrcDataLen
+        if pSrcData is None:
+            pSrcData = self.pData
+
+        nDstSize = max(self.nPayloadSize, stFrameInfo.nWidth * stFrameInfo.nHeight * 2)
+        if self.pHBBuf is None or self.nHBBufSize < nDstSize:
+            self.pHBBuf = (c_ubyte * nDstSize)()
+            self.nHBBufSize = nDstSize
+
+        stDecodeParam = MV_CC_HB_DECODE_PARAM()
+        memset(byref(stDecodeParam), 0, sizeof(stDecodeParam))
+        stDecodeParam.pSrcBuf = cast(pSrcData, POINTER(c_ubyte))
+        stDecodeParam.nSrcLen = stFrameInfo.nFrameLen
+        stDecodeParam.pDstBuf = cast(self.pHBBuf, POINTER(c_ubyte))
+        stDecodeParam.nDstBufSize = self.nHBBufSize
+
+        t0 = time.perf_counter()
+        cpu0 = time.thread_time()
+        ret = self.handle.MV_CC_HBDecode(stDecodeParam)
+        if ret != 0:
+            raise Exception(f"HB Decode failed: {hex(ret)}")
+
+        stats = self.hb_stats
+        stats["frames"] += 1
+        stats["wire_bytes"] += stFrameInfo.nFrameLen
+        stats["decoded_bytes"] += stDecodeParam.nDstBufLen
+        stats["decode_ms"] += (time.perf_counter() - t0) * 1000
+        stats["decode_cpu_ms"] += (time.thread_time() - cpu0) * 1000
+
+        stDecoded = MV_FRAME_OUT_INFO_EX()
+        ctypes.memmove(byref(stDecoded), byref(stFrameInfo), sizeof(MV_FRAME_OUT_INFO_EX))
+        stDecoded.nWidth = stDecodeParam.nWidth
+        stDecoded.nHeight = stDecodeParam.nHeight
+        stDecoded.enPixelType = stDecodeParam.enDstPixelType
+        stDecoded.nFrameLen = stDecodeParam.nDstBufLen
+        return stDecoded, self.pHBBuf, stDecodeParam.nDstBufLen
+
+    def _ensure_rgb_buffer(self, nRGBSize):
+        """
+        (Re)allocate the per-camera RGB buffer only when the frame size changes.
+        """
+        if self.pRGBBuf is None or self.nRGBSize != nRGBSize:
+            self.pRGBBuf = (ctypes.c_ubyte * nRGBSize)()
+            self.nRGBSize = nRGBSize
+        return self.pRGBBuf
+
+    # --- Conversion Profiles ---
+    def _use_conversion(self, profile):
+        """
+        Put the handle's Bayer converter into the given conversion profile.
+        The settings are SDK state shared by every conversion on this handle,
+        so they are only rewritten when the profile changes. Caller holds the
+        frame lock.
+        """
+        if profile == self._active_conversion:
+            return
+        settings = self.conversion_profiles[profile]
+        failed = []
+
+        ret = self.handle.MV_CC_SetBayerCvtQuality(settings["quality"])
+        if ret != 0:
+            failed.append(("quality", hex(ret)))
+        ret = self.handle.MV_CC_SetBayerFilterEnable(False)
+        if ret != 0:
+            failed.append(("filter", hex(ret)))
+
+        stGammaParam = MV_CC_GAMMA_PARAM()
+        memset(byref(stGammaParam), 0, sizeof(stGammaParam))
+        stGammaParam.enGammaType = MV_CC_GAMMA_TYPE_VALUE if settings["gamma"] else MV_CC_GAMMA_TYPE_NONE
+        stGammaParam.fGammaValue = settings["gamma"] or 1.0
+        ret = self.handle.MV_CC_SetBayerGammaParam(stGammaParam)
+        if ret != 0:
+            failed.append(("gamma", hex(ret)))
+
+        stCCMParam = MV_CC_CCM_PARAM_EX()
+        memset(byref(stCCMParam), 0, sizeof(stCCMParam))
+        stCCMParam.bCCMEnable = bool(settings["ccm"])
+        for i, value in enumerate(settings["ccm"] or ()):
+            stCCMParam.nCCMat[i] = int(value)
+        stCCMParam.nCCMScale = settings["ccm_scale"]
+        ret = self.handle.MV_CC_SetBayerCCMParamEx(stCCMParam)
+        if ret != 0:
+            failed.append(("ccm", hex(ret)))
+
+        if failed:
+            logger.warning(f"Cam {self.camera_id} conversion profile '{profile}' not fully applied: {failed}")
+        self._active_conversion = profile
+
+    def _record_conversion(self, profile, t0):
+        stats = self.conversion_stats.setdefault(profile, {"frames": 0, "ms": 0.0})
+        stats["frames"] += 1
+        stats["ms"] += (time.perf_counter() - t0) * 1000
+
+    def conversion_timing(self):
+        """
+        Average raw -> RGB conversion time (ms) per profile that has run.
+        """
+        return {profile: round(stats["ms"] / stats["frames"], 2)
+                for profile, stats in self.conversion_stats.items() if stats["frames"]}
+
+    def _convert_frame(self, stFrameInfo, pSrcData=None, nSrcDataLen=None, profile="full"):
+        """
+        Convert the raw frame to RGB8 in place in self.pRGBBuf and return a
+        NumPy view over it (no intermediate bytes copy). profile selects the
+        conversion settings ("preview" or "full"). Mono8 frames are returned
+        as a (height, width) view of the raw buffer, without conversion.
+        """
+        stFrameInfo, pSrcData, nSrcDataLen = self._decode_hb(stFrameInfo, pSrcData, nSrcDataLen)
+        width = stFrameInfo.nWidth
+        height = stFrameInfo.nHeight
+        if pSrcData is None:
+            pSrcData = self.pData
+            nSrcDataLen = self.nPayloadSize
+        if stFrameInfo.enPixelType == PIXEL_TYPE_MONO8:
+            return _buffer_view(pSrcData, width * height).reshape(height, width)
+
+        try:
+            # 3. Handle data with Color Conversion
+            # Use SDK to convert Bayer/Mono to RGB8Packed
+            PixelType_Gvsp_RGB8_Packed = 0x02180014 # Constant
+            
+            nRGBSize = width * height * 3
+            pRGBBuf = self._ensure_rgb_buffer(nRGBSize)
+            
+            stConvertParam = MV_CC_PIXEL_CONVERT_PARAM()
+            memset(byref(stConvertParam), 0, sizeof(stConvertParam))
+            stConvertParam.nWidth = width
+            stConvertParam.nHeight = height
+            stConvertParam.pSrcData = pSrcData
+            stConvertParam.nSrcDataLen = nSrcDataLen
+            stConvertParam.enSrcPixelType = stFrameInfo.enPixelType
+            stConvertParam.enDstPixelType = PixelType_Gvsp_RGB8_Packed
+            stConvertParam.pDstBuffer = cast(pRGBBuf, POINTER(ctypes.c_ubyte))
+            stConvertParam.nDstBufferSize = nRGBSize
+            
+            self._use_conversion(profile)
+            t0 = time.perf_counter()
+            ret_conv = self.handle.MV_CC_ConvertPixelType(stConvertParam)
+            self._record_conversion(profile, t0)
+            
+            if ret_conv == 0:
+                # Conversion Success -> View the RGB buffer directly
+                return _buffer_view(pRGBBuf, nRGBSize).reshape(height, width, 3)
+            
+            logger.warning(f"Color conversion failed (ret={hex(ret_conv)}), falling back to Mono/Raw")
+            # Fallback to original logic: treat the raw payload as 8-bit mono
+            return _buffer_view(pSrcData, width * height).reshape(height, width)
+                
+        except Exception as e:
+            logger.error(f"Image processing failed: {e}")
+            raise e
 
     # --- Streaming Support ---
     def start_streaming(self, callback):
@@ -232,8 +1211,29 @@ class HikCamera(CameraBase):
             return
             
         logger.info(f"Camera {self.camera_id} starting preview stream...")
+        self.set_sensor_profile("preview")
         self.streaming = True
-        self.stream_thread = threading.Thread(target=self._preview_loop, args=(callback,), daemon=True)
+        if self.monitor:
+            # The control station paces the stream; just read the newest frame
+            if self.acquisition_mode == "callback":
+                self.mailbox.clear()
+                target = self._mailbox_preview_loop
+            else:
+                self._set_grab_strategy(MV_GrabStrategy_LatestImagesOnly)
+                target = self._ring_preview_loop
+        else:
+            # Free-run: the camera paces the preview at preview_fps
+            self._apply_preview_fps()
+            if self.acquisition_mode == "callback":
+                # Frames arrive via the mailbox
+                self.mailbox.clear()
+                target = self._mailbox_preview_loop
+            else:
+                # Always read the newest frame, stale ones are dropped by the SDK
+                self._set_grab_strategy(MV_GrabStrategy_LatestImagesOnly)
+                target = self._ring_preview_loop if self.acquisition_mode == "ring" else self._preview_loop
+            self.nodes.set_enum("TriggerMode", 0)
+        self.stream_thread = threading.Thread(target=target, args=(callback,), daemon=True)
         self.stream_thread.start()
 
     def stop_streaming(self):
@@ -249,35 +1249,162 @@ class HikCamera(CameraBase):
             self.stream_thread.join(timeout=2.0)
             self.stream_thread = None
 
+        if self.monitor:
+            self.mailbox.clear()
+            if self.handle:
+                self.handle.MV_CC_ClearImageBuffer()
+        elif self.handle:
+            # Back to software trigger (no rate cap) for snapshot capture
+            self.nodes.apply([("enum", "TriggerMode", 1), ("enum", "TriggerSource", 7),
+                              ("bool", "AcquisitionFrameRateEnable", False)])
+            self.mailbox.clear()
+            if self.acquisition_mode != "callback":
+                self._set_grab_strategy(MV_GrabStrategy_OneByOne)
+                self.handle.MV_CC_ClearImageBuffer()
+            if self.acquisition_mode == "ring":
+                logger.info(f"Camera {self.camera_id} ring stats: {self.stream_stats()}")
+
+        # Full resolution again before any trigger_batch_capture
+        self.set_sensor_profile("full")
+
+    def set_preview_fps(self, fps):
+        """
+        Change the preview rate; applied to the camera at once while streaming.
+        """
+        self.preview_fps = fps
+        if self.streaming and self.handle and not self.monitor:
+            self._apply_preview_fps()
+
+    def _apply_preview_fps(self):
+        """
+        AcquisitionFrameRateEnable/AcquisitionFrameRate, as CamOperation's
+        set_frame_rate does. Only paces free-run acquisition.
+        """
+        if self.preview_fps and self.preview_fps > 0:
+            failed = self.nodes.apply([("bool", "AcquisitionFrameRateEnable", True),
+                                       ("float", "AcquisitionFrameRate", float(self.preview_fps))])
+        else:
+            failed = self.nodes.apply([("bool", "AcquisitionFrameRateEnable", False)])
+        if failed:
+            logger.warning(f"Cam {self.camera_id} frame rate {self.preview_fps} not set: {failed}")
+        self._fps_checked_at = 0.0
+
+    def _report_frame_rate(self):
+        """
+        Read ResultingFrameRate about once a second while previewing.
+        """
+        now = time.perf_counter()
+        if now - self._fps_checked_at < 1.0:
+            return
+        self._fps_checked_at = now
+        fps = self.nodes.get_float("ResultingFrameRate")
+        if fps is None:
+            return
+        self.resulting_fps = fps
+        if self.fps_listener:
+            self.fps_listener(self.camera_id, fps)
+
     def _preview_loop(self, callback):
+        """
+        Poll-mode preview: the camera free-runs at preview_fps, so each fetch
+        blocks until the next frame instead of triggering and sleeping.
+        """
         while self.streaming:
             try:
-                # Reuse existing grab_image logic 
-                # (Ideally we would have a lighter 'grab_frame' without deep copying for preview, 
-                #  but for stability let's stick to the working grab_image)
-                start_time = time.time()
-                
                 # We can suppress errors here to avoid spamming logs during preview
                 try:
-                    img = self.grab_image()
+                    with self._frame_lock:
+                        stFrameInfo = self._trigger_and_fetch(send_trigger=False)
+                        # Resize for UI efficiency (e.g., 800px width)
+                        # This is crucial: don't send 20MP images to the UI event loop 5 times a second!
+                        img = self._preview_image(stFrameInfo)
                 except Exception:
                     time.sleep(0.5)
                     continue
 
                 if not self.streaming: break
-
-                # Resize for UI efficiency (e.g., 800px width)
-                # This is crucial: don't send 20MP images to the UI event loop 5 times a second!
-                img.thumbnail((800, 600))
                 
                 # Callback to update UI
                 callback(self.camera_id, img)
-                
-                # Limit FPS (e.g., Target 5 FPS = 0.2s)
-                elapsed = time.time() - start_time
-                sleep_time = max(0.0, 0.2 - elapsed)
-                time.sleep(sleep_time)
+                self._report_frame_rate()
                 
             except Exception as e:
                 logger.error(f"Preview loop error: {e}")
                 time.sleep(1)
+
+    def _mailbox_preview_loop(self, callback):
+        """
+        Callback-mode preview: block on the mailbox instead of polling, so the
+        frame rate is set by the camera rather than by time.sleep.
+        """
+        while self.streaming:
+            slot = self.mailbox.get(timeout=0.5)
+            if slot is None:
+                continue
+            try:
+                with self._frame_lock:
+                    img = self._preview_image(slot.info, slot.buffer, slot.nFrameLen)
+            except Exception as e:
+                logger.error(f"Preview loop error: {e}")
+                continue
+            finally:
+                self.mailbox.recycle(slot)
+
+            if not self.streaming: break
+
+            callback(self.camera_id, img)
+            self._report_frame_rate()
+
+    def _ring_preview_loop(self, callback):
+        """
+        Ring-mode preview: convert straight out of the SDK node (no raw copy)
+        and hand the node back before the UI work.
+        """
+        while self.streaming:
+            with self._frame_lock:
+                stOutFrame = self._get_image_buffer(timeout_ms=500)
+                if stOutFrame is None:
+                    continue
+                try:
+                    img = self._preview_image(stOutFrame.stFrameInfo, stOutFrame.pBufAddr, stOutFrame.stFrameInfo.nFrameLen)
+                except Exception as e:
+                    logger.error(f"Preview loop error: {e}")
+                    continue
+                finally:
+                    self.handle.MV_CC_FreeImageBuffer(stOutFrame)
+
+            if not self.streaming: break
+
+            callback(self.camera_id, img)
+            self._report_frame_rate()
+
+def issue_action_command(cameras, device_key, group_key, group_mask, broadcast_address="255.255.255.255", ack_timeout_ms=100):
+    """
+    Fire one GigE action command broadcast for every camera armed with
+    arm_action_trigger(). Returns the number of devices that acknowledged.
+    """
+    stActionCmdInfo = MV_ACTION_CMD_INFO()
+    memset(byref(stActionCmdInfo), 0, sizeof(MV_ACTION_CMD_INFO))
+    stActionCmdInfo.nDeviceKey = device_key
+    stActionCmdInfo.nGroupKey = group_key
+    stActionCmdInfo.nGroupMask = group_mask
+    stActionCmdInfo.pBroadcastAddress = broadcast_address.encode("ascii")
+    stActionCmdInfo.nTimeOut = ack_timeout_ms
+
+    stActionCmdResults = MV_ACTION_CMD_RESULT_LIST()
+    memset(byref(stActionCmdResults), 0, sizeof(MV_ACTION_CMD_RESULT_LIST))
+
+    # Static in the C API; any handle object can issue it
+    ret = cameras[0].handle.MV_GIGE_IssueActionCommand(stActionCmdInfo, stActionCmdResults)
+    if ret != 0:
+        raise Exception(f"Issue action command failed: {hex(ret)}")
+
+    acked = 0
+    for i in range(stActionCmdResults.nNumResults):
+        result = stActionCmdResults.pResults[i]
+        if result.nStatus == 0:
+            acked += 1
+        else:
+            address = bytes(result.strDeviceAddress).split(b"\0", 1)[0].decode("ascii", errors="ignore")
+            logger.warning(f"Action command rejected by {address}: status {hex(result.nStatus)}")
+    return acked
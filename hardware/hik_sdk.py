@@ -0,0 +1,24 @@
+import sys
+from config import FAKE_SDK
+from utils.logger import setup_logger
+
+logger = setup_logger("HikSDK")
+
+# --- SDK IMPORT CHECK ---
+# Default installation path for Hikrobot MVS Python SDK
+# Shared by every module that talks to MvCameraControl (import * from here).
+SDK_PATH = r"C:\Program Files (x86)\MVS\Development\Samples\Python\MvImport"
+
+if FAKE_SDK:
+    # Simulated cameras with the same MvCamera API (see hardware/fake_mvs.py)
+    logger.warning("Using the simulated MVS SDK (fake_sdk). No real cameras will be opened.")
+    from hardware.fake_mvs import *
+    HIK_SDK_AVAILABLE = True
+else:
+    try:
+        sys.path.append(SDK_PATH)
+        from MvCameraControl_class import *
+        HIK_SDK_AVAILABLE = True
+    except ImportError:
+        HIK_SDK_AVAILABLE = False
+        logger.warning(f"Hikvision SDK not found at {SDK_PATH}. Please verify installation path.")
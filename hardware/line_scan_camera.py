@@ -0,0 +1,224 @@
+import os
+import time
+import queue
+import threading
+import numpy as np
+from PIL import Image
+from hardware.hik_sdk import *
+from hardware.hik_camera import HikCamera, _buffer_view, PIXEL_TYPE_MONO8
+from utils.logger import setup_logger
+
+logger = setup_logger("LineScan")
+
+class StripWriter:
+    """
+    Encodes a memory-mapped scan image strip by strip on its own thread.
+    Acquisition only copies blocks into the memmap and announces finished
+    rows; the encoder reads them back through the page cache, so neither
+    side holds the whole scan in RAM and a slow encoder never backs up the
+    camera ring.
+    """
+    def __init__(self, image, folder, basename, strip_lines, quality):
+        self.image = image
+        self.folder = folder
+        self.basename = basename
+        self.strip_lines = strip_lines
+        self.quality = quality
+        self.paths = []
+        self.encode_s = 0.0
+        self._next_row = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def rows_done(self, rows):
+        """
+        Rows [0, rows) are final: queue every complete strip.
+        """
+        while rows - self._next_row >= self.strip_lines:
+            self._queue.put((self._next_row, self._next_row + self.strip_lines))
+            self._next_row += self.strip_lines
+
+    def finish(self, rows):
+        """
+        Queue the last (partial) strip and wait for the encoder to drain.
+        """
+        self.rows_done(rows)
+        if rows > self._next_row:
+            self._queue.put((self._next_row, rows))
+        self.stop()
+        return self.paths
+
+    def stop(self):
+        """
+        End the encoder thread after the strips already queued.
+        """
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            start, end = item
+            t0 = time.perf_counter()
+            strip = self.image[start:end]
+            img = Image.fromarray(strip[:, :, 0] if strip.shape[2] == 1 else strip)
+            path = os.path.join(self.folder, f"{self.basename}_s{len(self.paths) + 1:04d}.jpg")
+            try:
+                img.save(path, "JPEG", quality=self.quality)
+                self.paths.append(path)
+            except Exception as e:
+                logger.error(f"Strip {start}-{end} encode failed: {e}")
+            self.encode_s += time.perf_counter() - t0
+
+class LineScanCamera(HikCamera):
+    """
+    Hikrobot line-scan camera. Each SDK frame is a block of block_lines
+    lines (the Height node); scan() streams blocks from the node ring into a
+    preallocated memory-mapped image of the requested length while a
+    StripWriter encodes finished strips.
+
+    line_trigger: None = free-run at line_rate (AcquisitionLineRate), or an
+    input ("Line0".."Line3") for encoder-driven LineStart triggering.
+    """
+    is_line_scan = True
+    # Height is the block size, set after the profile restore on every connect
+    PROFILE_CHECK_NODES = tuple(node for node in HikCamera.PROFILE_CHECK_NODES if node[1] != "Height")
+
+    def __init__(self, camera_id, ip_address, block_lines=1024, line_rate=0, line_trigger=None, **kwargs):
+        kwargs["acquisition_mode"] = "ring"
+        super().__init__(camera_id, ip_address, **kwargs)
+        self.block_lines = block_lines
+        self.line_rate = line_rate
+        self.line_trigger = line_trigger
+        self.last_scan = None
+
+    def connect(self):
+        if not super().connect():
+            return False
+        self._reconfigure_stream(self._apply_block_height)
+        return True
+
+    def _apply_block_height(self):
+        ret = self.nodes.set_int("Height", self.block_lines)
+        if ret != 0:
+            logger.warning(f"Cam {self.camera_id} set block height {self.block_lines} failed: {hex(ret)}")
+        logger.info(f"Cam {self.camera_id} line scan: {self.nodes.get_int('Width')} px x "
+                    f"{self.nodes.get_int('Height')} lines per block")
+
+    def start_streaming(self, callback):
+        # Free-running area preview has no meaning for a line sensor
+        logger.info(f"Camera {self.camera_id} is line scan: no live preview.")
+
+    # --- Scan ---
+    def _start_line_acquisition(self):
+        if self.line_trigger:
+            writes = [("enum", "TriggerSelector", "LineStart"), ("enum", "TriggerMode", 1),
+                      ("enum", "TriggerSource", self.line_trigger)]
+        else:
+            writes = [("enum", "TriggerSelector", "FrameBurstStart"), ("enum", "TriggerMode", 0)]
+            if self.line_rate:
+                writes += [("int", "AcquisitionLineRate", int(self.line_rate)), ("bool", "AcquisitionLineRateEnable", True)]
+        failed = self.nodes.apply(writes)
+        if failed:
+            logger.debug(f"Cam {self.camera_id} line acquisition nodes not set: {failed}")
+        self.handle.MV_CC_ClearImageBuffer()
+
+    def _stop_line_acquisition(self):
+        # Back to one software-triggered block per grab_image()
+        if self.line_trigger:
+            self.nodes.apply([("enum", "TriggerMode", 0), ("enum", "TriggerSelector", "FrameBurstStart")])
+        self.nodes.apply([("enum", "TriggerMode", 1), ("enum", "TriggerSource", 7)])
+        self.handle.MV_CC_ClearImageBuffer()
+
+    def _block_array(self, stOutFrame):
+        """
+        (lines, width, channels) view of one block: Mono8 as is, anything
+        else converted to RGB8 in the reusable RGB buffer.
+        """
+        stFrameInfo = stOutFrame.stFrameInfo
+        if stFrameInfo.enPixelType == PIXEL_TYPE_MONO8:
+            lines, width = stFrameInfo.nHeight, stFrameInfo.nWidth
+            return _buffer_view(stOutFrame.pBufAddr, lines * width).reshape(lines, width, 1)
+        arr = self._convert_frame(stFrameInfo, stOutFrame.pBufAddr, stFrameInfo.nFrameLen)
+        return arr if arr.ndim == 3 else arr[:, :, None]
+
+    def scan(self, length_lines, folder, basename, strip_lines=4096, quality=80, keep_raw=False, timeout_ms=2000):
+        """
+        Acquire length_lines lines into <folder>/<basename>.raw (np.memmap) and
+        JPEG-encode it as <basename>_sNNNN.jpg strips while the scan runs.
+        Returns a dict with the strip paths, raw path (if kept), a preview PIL
+        image and timings; encode_tail_s is how long encoding ran past the
+        last block.
+        """
+        if not self.connected or not self.handle:
+            raise Exception(f"LineScanCamera {self.camera_id} not connected")
+        os.makedirs(folder, exist_ok=True)
+        raw_path = os.path.join(folder, f"{basename}.raw")
+        image = None
+        writer = None
+        rows = 0
+        preview_rows = []
+        t0 = time.perf_counter()
+
+        try:
+            with self._frame_lock:
+                self._start_line_acquisition()
+                try:
+                    while rows < length_lines:
+                        stOutFrame = self._get_image_buffer(timeout_ms)
+                        if stOutFrame is None:
+                            logger.error(f"Cam {self.camera_id} scan stalled at line {rows}/{length_lines}")
+                            break
+                        try:
+                            block = self._block_array(stOutFrame)
+                            if image is None:
+                                width, channels = block.shape[1], block.shape[2]
+                                image = np.memmap(raw_path, dtype=np.uint8, mode="w+", shape=(length_lines, width, channels))
+                                writer = StripWriter(image, folder, basename, strip_lines, quality)
+                                hstep = max(1, width // 800)
+                                vstep = max(1, length_lines // 600)
+                            n = min(block.shape[0], length_lines - rows)
+                            image[rows:rows + n] = block[:n]
+                            # Preview: every vstep-th scan line, aligned to absolute row numbers
+                            first = (-rows) % vstep
+                            preview_rows.append(np.array(block[first:n:vstep, ::hstep]))
+                        finally:
+                            self.handle.MV_CC_FreeImageBuffer(stOutFrame)
+                        rows += n
+                        writer.rows_done(rows)
+                finally:
+                    self._stop_line_acquisition()
+
+            scan_s = time.perf_counter() - t0
+            if writer is None:
+                raise Exception(f"Cam {self.camera_id} scan produced no data")
+            image.flush()
+            paths = writer.finish(rows)
+        except Exception:
+            # Stop the encoder and leave nothing behind: no raw memmap, no partial strips
+            if writer is not None:
+                writer.stop()
+                writer.image = None
+                for path in writer.paths:
+                    os.remove(path)
+            image = None  # Close the memmap before deleting its file (Windows)
+            if os.path.exists(raw_path):
+                os.remove(raw_path)
+            raise
+        encode_tail_s = time.perf_counter() - t0 - scan_s
+        writer.image = None
+        del image
+        if not keep_raw:
+            os.remove(raw_path)
+
+        preview_arr = np.concatenate(preview_rows)
+        preview = Image.fromarray(preview_arr[:, :, 0] if preview_arr.shape[2] == 1 else preview_arr)
+        preview.thumbnail((800, 600))
+        self.last_scan = {"lines": rows, "strips": paths, "raw": raw_path if keep_raw else None,
+                          "scan_s": scan_s, "encode_s": writer.encode_s, "encode_tail_s": encode_tail_s}
+        logger.info(f"Cam {self.camera_id} scanned {rows} lines in {scan_s:.2f}s, {len(paths)} strips, "
+                    f"encoding finished {encode_tail_s:.2f}s after the last block")
+        return dict(self.last_scan, preview=preview)
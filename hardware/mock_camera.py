@@ -1,3 +1,4 @@
+import os
 import time
 import random
 import numpy as np
@@ -8,6 +9,14 @@ from utils.logger import setup_logger
 logger = setup_logger("Hardware")
 
 class CameraBase:
+    # True when grab_to_file() can encode JPEG directly from the device buffer
+    supports_raw_encode = False
+    # True when record_clip() can write a video clip through the SDK recorder
+    supports_clip_record = False
+    # Format of the images grab_image() returns: "RGB8" (PIL "RGB") or "Mono8"
+    # (PIL "L"; stays single-channel through overlay, resize and JPEG encode)
+    pixel_format = "RGB8"
+
     def connect(self):
         raise NotImplementedError
     
@@ -17,21 +26,128 @@ class CameraBase:
     def grab_image(self):
         raise NotImplementedError
 
+def _load_font(size):
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except IOError:
+        return ImageFont.load_default()
+
+class FramePool:
+    """
+    Frames shared by every MockCamera with the same geometry: generated (or
+    loaded from sample JPEGs) once, plus an 800x600 thumbnail of each for
+    preview. Grabs only copy a pooled frame instead of synthesizing one.
+    """
+    _pools = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, width, height, size, sample_dir=None):
+        key = (width, height, size, sample_dir)
+        with cls._lock:
+            if key not in cls._pools:
+                cls._pools[key] = cls(width, height, size, sample_dir)
+            return cls._pools[key]
+
+    def __init__(self, width, height, size, sample_dir=None):
+        t0 = time.perf_counter()
+        self.frames = self._load_samples(sample_dir, size) if sample_dir else []
+        if not self.frames:
+            self.frames = [self._synthesize(width, height, seed) for seed in range(size)]
+        self.thumbnails = []
+        for frame in self.frames:
+            thumb = frame.copy()
+            thumb.thumbnail((800, 600))
+            self.thumbnails.append(thumb)
+        logger.info(f"Mock frame pool: {len(self.frames)} x {self.frames[0].size} in {time.perf_counter() - t0:.2f}s")
+
+    @staticmethod
+    def _load_samples(sample_dir, size):
+        frames = []
+        try:
+            names = sorted(n for n in os.listdir(sample_dir) if n.lower().endswith((".jpg", ".jpeg", ".png")))
+        except OSError as e:
+            logger.warning(f"Mock sample dir unavailable ({e}); using synthetic frames.")
+            return frames
+        for name in names[:size]:
+            with Image.open(os.path.join(sample_dir, name)) as img:
+                frames.append(img.convert("RGB"))
+        return frames
+
+    @staticmethod
+    def _synthesize(width, height, seed):
+        # Gradient scene + tiled noise: cheap to build, still compresses like a photo
+        rng = np.random.default_rng(seed)
+        x = np.linspace(0, 200, width, dtype=np.float32)
+        y = np.linspace(0, 200, height, dtype=np.float32)[:, None]
+        arr = np.empty((height, width, 3), dtype=np.uint8)
+        arr[..., 0] = x
+        arr[..., 1] = y
+        arr[..., 2] = (x + y) / 2
+        noise = rng.integers(0, 50, (256, 256, 1), dtype=np.uint8)
+        arr += np.tile(noise, (height // 256 + 1, width // 256 + 1, 3))[:height, :width]
+        return Image.fromarray(arr, "RGB")
+
 class MockCamera(CameraBase):
-    def __init__(self, camera_id):
+    """
+    pool_size=0 synthesizes a new noise frame on every grab (slow, 60 MB per
+    grab at 20 MP). pool_size>0 serves frames from a shared FramePool and
+    models grab latency as exposure + readout +/- jitter, so the mock costs
+    about what the hardware does. Pooled mocks also stream preview like
+    HikCamera (start_streaming/stop_streaming).
+    """
+    def __init__(self, camera_id, width=5472, height=3648, pool_size=0, sample_dir=None,
+                 exposure_ms=10.0, readout_ms=60.0, jitter_ms=5.0, preview_fps=5.0):
         self.camera_id = camera_id
         self.connected = False
+        self.width = width
+        self.height = height
+        self.pool_size = pool_size
+        self.sample_dir = sample_dir
+        self.exposure_ms = exposure_ms
+        self.readout_ms = readout_ms
+        self.jitter_ms = jitter_ms
+        self.preview_fps = preview_fps
+        self.resulting_fps = None
+        self.fps_listener = None  # callback(camera_id, fps), about once a second while previewing
+        self.pool = None
+        self.frame_count = 0
+        self._count_lock = threading.Lock()  # frame_count is advanced by the preview and capture threads
+        self.streaming = False
+        self.stream_thread = None
+        self._font = None
         
     def connect(self):
         time.sleep(0.1)  # Simulate init time
+        if self.pool_size > 0:
+            self.pool = FramePool.get(self.width, self.height, self.pool_size, self.sample_dir)
+            self._font = _load_font(max(20, int(self.pool.frames[0].size[1] * 0.015)))
         self.connected = True
         logger.info(f"Camera {self.camera_id} connected.")
         return True
 
     def disconnect(self):
+        self.stop_streaming()
         self.connected = False
         logger.info(f"Camera {self.camera_id} disconnected.")
 
+    def _frame_time(self):
+        """
+        Seconds one triggered frame takes: exposure + readout +/- jitter.
+        """
+        jitter = random.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, self.exposure_ms + self.readout_ms + jitter) / 1000.0
+
+    def _next_frame_number(self):
+        with self._count_lock:
+            self.frame_count += 1
+            return self.frame_count
+
+    def _stamp(self, img, font, frame_number):
+        draw = ImageDraw.Draw(img)
+        draw.text((10, 10), f"CAM ID: {self.camera_id}\nFrame: {frame_number}\nLot: MOCK-001",
+                  fill=(0, 255, 0), font=font)
+
     def grab_image(self):
         """
         Simulate grabbing an image.
@@ -39,12 +155,25 @@ class MockCamera(CameraBase):
         """
         if not self.connected:
             raise Exception(f"Camera {self.camera_id} is not connected!")
+        if self.pool is None:
+            return self._generate_image()
 
+        t0 = time.perf_counter()
+        frame_number = self._next_frame_number()
+        # A copy: callers (timestamp overlay) draw on the returned image
+        img = self.pool.frames[frame_number % len(self.pool.frames)].copy()
+        self._stamp(img, self._font, frame_number)
+        remaining = self._frame_time() - (time.perf_counter() - t0)
+        if remaining > 0:
+            time.sleep(remaining)
+        return img
+
+    def _generate_image(self):
         # Simulate exposure time
         time.sleep(random.uniform(0.05, 0.2))
 
         # Create a generated image (Noise + Text)
-        width, height = 5472, 3648
+        width, height = self.width, self.height
         # Random noise background
         arr = np.random.randint(0, 50, (height, width, 3), dtype=np.uint8)
         img = Image.fromarray(arr, 'RGB')
@@ -63,3 +192,52 @@ class MockCamera(CameraBase):
         draw.text((10, 10), text, fill=(0, 255, 0), font=font)
         
         return img
+
+    # --- Streaming ---
+    def start_streaming(self, callback):
+        """
+        Free-running preview at preview_fps from the pooled thumbnails.
+        callback(camera_id, pil_image)
+        """
+        if self.streaming or self.pool is None:
+            return
+        self.streaming = True
+        self.stream_thread = threading.Thread(target=self._preview_loop, args=(callback,), daemon=True)
+        self.stream_thread.start()
+
+    def stop_streaming(self):
+        if not self.streaming:
+            return
+        self.streaming = False
+        if self.stream_thread:
+            self.stream_thread.join(timeout=2.0)
+            self.stream_thread = None
+
+    def set_preview_fps(self, fps):
+        self.preview_fps = fps
+
+    def _preview_loop(self, callback):
+        font = _load_font(16)
+        next_frame = time.perf_counter()
+        window_start, window_frames = next_frame, 0
+        while self.streaming:
+            frame_number = self._next_frame_number()
+            img = self.pool.thumbnails[frame_number % len(self.pool.thumbnails)].copy()
+            self._stamp(img, font, frame_number)
+            try:
+                callback(self.camera_id, img)
+            except Exception as e:
+                logger.error(f"Mock preview callback error: {e}")
+            window_frames += 1
+            now = time.perf_counter()
+            if now - window_start >= 1.0:
+                # Delivered rate stands in for the camera's ResultingFrameRate
+                self.resulting_fps = window_frames / (now - window_start)
+                window_start, window_frames = now, 0
+                if self.fps_listener:
+                    self.fps_listener(self.camera_id, self.resulting_fps)
+            # 0 = camera maximum: one exposure + readout per frame, as a free-running sensor
+            period = 1.0 / self.preview_fps if self.preview_fps and self.preview_fps > 0 else self._frame_time()
+            period = max(period, 0.001)  # Never spin, even with zero exposure/readout settings
+            next_frame = max(next_frame + period, time.perf_counter())
+            time.sleep(max(0.0, next_frame - time.perf_counter()))
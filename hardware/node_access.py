@@ -0,0 +1,130 @@
+from hardware.hik_sdk import *
+from utils.logger import setup_logger
+
+logger = setup_logger("NodeAccess")
+
+# Read-mostly nodes: served from cache until a write or invalidate() may have changed them
+CACHED_NODES = ("PayloadSize", "Width", "Height", "OffsetX", "OffsetY", "WidthMax", "HeightMax",
+                "PixelFormat", "GevTimestampTickFrequency")
+
+# Writes to these never change image geometry/format, so they keep the cache
+_GEOMETRY_INDEPENDENT = ("Trigger", "Action", "Exposure", "Gain", "Acquisition", "Balance",
+                         "GevSCPD", "GevIEEE1588", "UserSet")
+
+class NodeAccessor:
+    """
+    Typed GenICam node access for one open device handle.
+    Every SDK call is a GVCP round-trip and is counted in round_trips;
+    CACHED_NODES are read once and then served locally.
+    """
+    def __init__(self, handle):
+        self.handle = handle
+        self._cache = {}
+        self.round_trips = 0
+        self.cache_hits = 0
+
+    # --- Reads ---
+    def _read(self, name, struct, getter, field, default):
+        if name in self._cache:
+            self.cache_hits += 1
+            return self._cache[name]
+        memset(byref(struct), 0, sizeof(struct))
+        self.round_trips += 1
+        if getter(name, struct) != 0:
+            return default
+        value = getattr(struct, field)
+        if name in CACHED_NODES:
+            self._cache[name] = value
+        return value
+
+    def get_int(self, name, default=None):
+        return self._read(name, MVCC_INTVALUE(), self.handle.MV_CC_GetIntValue, "nCurValue", default)
+
+    def get_int_max(self, name, default=None):
+        """
+        Upper limit (nMax) of an integer node; never cached.
+        """
+        stIntValue = MVCC_INTVALUE()
+        memset(byref(stIntValue), 0, sizeof(stIntValue))
+        self.round_trips += 1
+        if self.handle.MV_CC_GetIntValue(name, stIntValue) != 0:
+            return default
+        return stIntValue.nMax
+
+    def get_float(self, name, default=None):
+        return self._read(name, MVCC_FLOATVALUE(), self.handle.MV_CC_GetFloatValue, "fCurValue", default)
+
+    def get_enum(self, name, default=None):
+        return self._read(name, MVCC_ENUMVALUE(), self.handle.MV_CC_GetEnumValue, "nCurValue", default)
+
+    def get_bool(self, name, default=None):
+        stBool = c_bool(False)
+        self.round_trips += 1
+        if self.handle.MV_CC_GetBoolValue(name, stBool) != 0:
+            return default
+        return stBool.value
+
+    # --- Writes ---
+    def _written(self, name):
+        if not name.startswith(_GEOMETRY_INDEPENDENT):
+            self._cache.clear()
+
+    def set_int(self, name, value):
+        self.round_trips += 1
+        self._written(name)
+        return self.handle.MV_CC_SetIntValue(name, value)
+
+    def set_float(self, name, value):
+        self.round_trips += 1
+        self._written(name)
+        return self.handle.MV_CC_SetFloatValue(name, value)
+
+    def set_enum(self, name, value):
+        """
+        value: int entry value, or str symbolic entry name (e.g. "Action1").
+        """
+        self.round_trips += 1
+        self._written(name)
+        if isinstance(value, str):
+            return self.handle.MV_CC_SetEnumValueByString(name, value)
+        return self.handle.MV_CC_SetEnumValue(name, value)
+
+    def set_bool(self, name, value):
+        self.round_trips += 1
+        self._written(name)
+        return self.handle.MV_CC_SetBoolValue(name, value)
+
+    def command(self, name):
+        self.round_trips += 1
+        self._written(name)
+        return self.handle.MV_CC_SetCommandValue(name)
+
+    _SETTERS = {"int": "set_int", "float": "set_float", "enum": "set_enum", "bool": "set_bool"}
+
+    def apply(self, writes):
+        """
+        Apply a write set [(kind, name, value), ...] in one pass, in order.
+        kind is "int", "float", "enum", "bool" or "command" (value ignored).
+        Returns {name: ret} for the writes that failed.
+        """
+        failed = {}
+        for kind, name, value in writes:
+            if kind == "command":
+                ret = self.command(name)
+            else:
+                ret = getattr(self, self._SETTERS[kind])(name, value)
+            if ret != 0:
+                failed[name] = ret
+        return failed
+
+    def invalidate(self):
+        """
+        Drop cached values and the SDK's own node cache (MV_CC_InvalidateNodes),
+        e.g. after an external tool or a feature load changed the device.
+        """
+        self._cache.clear()
+        self.round_trips += 1
+        return self.handle.MV_CC_InvalidateNodes()
+
+    def stats(self):
+        return {"round_trips": self.round_trips, "cache_hits": self.cache_hits}
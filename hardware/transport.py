@@ -0,0 +1,91 @@
+from hardware.hik_sdk import *
+from utils.logger import setup_logger
+
+logger = setup_logger("GigETransport")
+
+# Ethernet (preamble+header+FCS+IFG) + IPv4 + UDP + GVSP header bytes per packet
+PACKET_OVERHEAD_BYTES = 38 + 20 + 8 + 8
+# Valid GVSP packet sizes: IPv4 minimum datagram up to jumbo frames
+PACKET_SIZE_MIN = 576
+PACKET_SIZE_MAX = 9000
+
+def packet_delay_ticks(packet_size, cameras_per_link, link_mbps, utilization=0.9, tick_hz=1_000_000_000):
+    """
+    GevSCPD (inter-packet delay, in timestamp ticks) that caps one camera at
+    its share of the link: link * utilization / cameras_per_link.
+    The delay is the packet interval at that share minus the wire time at
+    full link speed.
+    """
+    link_bps = link_mbps * 1_000_000
+    wire_bits = (packet_size + PACKET_OVERHEAD_BYTES) * 8
+    budget_bps = link_bps * utilization / max(1, cameras_per_link)
+    delay_s = wire_bits / budget_bps - wire_bits / link_bps
+    return max(0, int(delay_s * tick_hz))
+
+class GigETransportSettings:
+    """
+    Stream/control channel policy applied by HikCamera.connect for GigE devices.
+    cameras_per_link=None means "count the cameras enumerated on the same NIC".
+    """
+    def __init__(self, link_mbps=1000, utilization=0.9, cameras_per_link=None,
+                 resend=True, resend_max_percent=10, resend_timeout_ms=50,
+                 gvsp_timeout_ms=300, gvcp_timeout_ms=500):
+        self.link_mbps = link_mbps
+        self.utilization = utilization
+        self.cameras_per_link = cameras_per_link
+        self.resend = resend
+        self.resend_max_percent = resend_max_percent
+        self.resend_timeout_ms = resend_timeout_ms
+        self.gvsp_timeout_ms = gvsp_timeout_ms
+        self.gvcp_timeout_ms = gvcp_timeout_ms
+
+    def apply(self, nodes, camera_id, cameras_per_link, payload_size=0):
+        """
+        Configure packet size, inter-packet delay, resend and GVSP/GVCP
+        timeouts on an open (not yet grabbing) device through its
+        NodeAccessor. Returns a summary dict.
+        """
+        handle = nodes.handle
+        if self.cameras_per_link:
+            cameras_per_link = self.cameras_per_link
+
+        # 1. Packet size: largest the NIC/switch path supports (jumbo frames if enabled)
+        # The binding returns c_uint: an SDK error code (0x8000xxxx) arrives as a large positive size
+        packet_size = int(handle.MV_CC_GetOptimalPacketSize())
+        max_size = min(PACKET_SIZE_MAX, nodes.get_int_max("GevSCPSPacketSize") or PACKET_SIZE_MAX)
+        if PACKET_SIZE_MIN <= packet_size <= max_size:
+            ret = nodes.set_int("GevSCPSPacketSize", packet_size)
+            if ret != 0:
+                logger.warning(f"Cam {camera_id} set packet size failed: {hex(ret)}")
+                packet_size = nodes.get_int("GevSCPSPacketSize") or 1500
+        else:
+            logger.warning(f"Cam {camera_id} get optimal packet size returned {hex(packet_size)} "
+                           f"(valid {PACKET_SIZE_MIN}..{max_size}), keeping the camera's packet size")
+            packet_size = nodes.get_int("GevSCPSPacketSize") or 1500
+
+        # 2. Inter-packet delay: share the link between cameras on the same NIC
+        tick_hz = nodes.get_int("GevTimestampTickFrequency") or 1_000_000_000
+        delay = packet_delay_ticks(packet_size, cameras_per_link, self.link_mbps, self.utilization, tick_hz)
+        ret = nodes.set_int("GevSCPD", delay)
+        if ret != 0:
+            logger.warning(f"Cam {camera_id} set GevSCPD failed: {hex(ret)}")
+
+        # 3. Host-side stream/control policy
+        handle.MV_GIGE_SetResend(1 if self.resend else 0, self.resend_max_percent, self.resend_timeout_ms)
+        handle.MV_GIGE_SetGvspTimeout(self.gvsp_timeout_ms)
+        handle.MV_GIGE_SetGvcpTimeout(self.gvcp_timeout_ms)
+
+        budget_mbps = self.link_mbps * self.utilization / max(1, cameras_per_link)
+        frame_ms = payload_size * 8 / (budget_mbps * 1000) if payload_size else 0
+        logger.info(f"Cam {camera_id} transport: packet={packet_size}B GevSCPD={delay} ticks | "
+                    f"budget {budget_mbps:.0f} Mbps ({cameras_per_link} cams on {self.link_mbps} Mbps link) | "
+                    f"~{frame_ms:.0f} ms per frame")
+        return {"packet_size": packet_size, "packet_delay": delay, "budget_mbps": budget_mbps, "frame_ms": frame_ms}
+
+def multicast_group_for(base_group, camera_id):
+    """
+    Per-camera multicast group: camera_id added to the last octet of
+    base_group, so monitor stations only receive the cameras they join.
+    """
+    a, b, c, d = (int(x) for x in base_group.split("."))
+    return f"{a}.{b}.{c}.{(d + camera_id) % 256}"
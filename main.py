@@ -1,5 +1,6 @@
 import tkinter as tk
 import queue
+import threading
 import sys
 import os
 
@@ -9,6 +10,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from config import LOCAL_TEMP_BUFFER, REMOTE_SERVER_STORAGE
 from services.capture_manager import CaptureManager
 from services.upload_manager import UploadManager
+from services.camera_supervisor import CameraSupervisor
 from services.file_service import FileService
 from ui.dashboard import DashboardApp
 from PIL import Image, ImageFile
@@ -46,6 +48,10 @@ def main():
         if app:
             app.update_camera_image(idx, pil_image)
 
+    def ui_update_fps(idx, fps):
+        if app:
+            app.update_camera_fps(idx, fps)
+
     def ui_update_queue(count):
         if app:
             app.update_upload_count(count)
@@ -53,9 +59,11 @@ def main():
     capture_mgr = CaptureManager(
         upload_queue, 
         update_cam_status_callback=ui_update_cam,
-        update_cam_image_callback=ui_update_image
+        update_cam_image_callback=ui_update_image,
+        update_cam_fps_callback=ui_update_fps
     )
     upload_mgr = UploadManager(upload_queue, update_ui_callback=ui_update_queue)
+    supervisor = CameraSupervisor(capture_mgr)
 
     def on_snap():
         logger.info("UI: Snap Triggered")
@@ -73,16 +81,22 @@ def main():
     app = DashboardApp(root, on_snap=on_snap, on_confirm=on_confirm, on_retake=on_retake, capture_manager=capture_mgr)
 
     # 6. Start Background Services
-    capture_mgr.initialize_cameras()
-    
-    # START AUTO PREVIEW
-    capture_mgr.start_preview()
+    # Cameras connect in the background so the dashboard shows each status as it arrives
+    def start_cameras():
+        capture_mgr.initialize_cameras()
+        # START AUTO PREVIEW
+        capture_mgr.start_preview()
+        # Reconnect dropped cameras individually from here on
+        supervisor.start()
+
+    threading.Thread(target=start_cameras, daemon=True).start()
     
     upload_mgr.start()
 
     # 7. Cleanup on Close
     def on_close():
         logger.info("Shutting down...")
+        supervisor.stop()
         capture_mgr.shutdown()
         upload_mgr.stop()
         root.destroy()
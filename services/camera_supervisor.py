@@ -0,0 +1,88 @@
+import threading
+import time
+from utils.logger import setup_logger
+
+logger = setup_logger("CameraSupervisor")
+
+class CameraSupervisor:
+    """
+    Watches connected cameras (exception callback + MV_CC_IsDeviceConnected
+    polling) and reconnects only the ones that failed, with exponential
+    backoff. Healthy cameras are never touched.
+    Only cameras that implement is_alive()/reconnect() are supervised.
+    """
+    def __init__(self, capture_manager, poll_interval=2.0, backoff_initial=1.0, backoff_max=30.0):
+        self.capture_manager = capture_manager
+        self.poll_interval = poll_interval
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.running = False
+        self.thread = None
+        self._wake = threading.Event()
+        self._failed = {} # camera_id -> {"camera", "backoff", "next_try"}
+
+    def start(self):
+        self.running = True
+        for cam in self.capture_manager.cameras:
+            self.watch(cam)
+        for cam in self.capture_manager.offline_cameras:
+            self._mark_failed(cam)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        logger.info("Camera Supervisor started.")
+
+    def stop(self):
+        self.running = False
+        self._wake.set()
+        if self.thread:
+            self.thread.join()
+        logger.info("Camera Supervisor stopped.")
+
+    def watch(self, cam):
+        if hasattr(cam, "exception_listener"):
+            # Device-lost callbacks wake the loop instead of waiting for the next poll
+            cam.exception_listener = lambda c: self._wake.set()
+
+    def _run(self):
+        while self.running:
+            for cam in list(self.capture_manager.cameras):
+                if hasattr(cam, "is_alive") and cam.camera_id not in self._failed and not cam.is_alive():
+                    self._mark_failed(cam)
+
+            now = time.monotonic()
+            for camera_id, state in list(self._failed.items()):
+                if self.capture_manager.connect_pending(state["camera"]):
+                    continue # Startup connect still blocked in the SDK; retry after it returns
+                if now >= state["next_try"]:
+                    self._try_reconnect(camera_id, state)
+
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def _mark_failed(self, cam):
+        if not hasattr(cam, "reconnect"):
+            return
+        logger.error(f"Camera {cam.camera_id} lost. Scheduling reconnect.")
+        self.capture_manager.remove_camera(cam)
+        self._failed[cam.camera_id] = {"camera": cam, "backoff": self.backoff_initial,
+                                       "next_try": time.monotonic() + self.backoff_initial}
+
+    def _try_reconnect(self, camera_id, state):
+        cam = state["camera"]
+        logger.info(f"Reconnecting Camera {camera_id}...")
+        try:
+            ok = cam.reconnect()
+        except Exception as e:
+            logger.error(f"Camera {camera_id} reconnect raised: {e}")
+            ok = False
+
+        if ok:
+            del self._failed[camera_id]
+            self.watch(cam)
+            self.capture_manager.rejoin_camera(cam)
+            logger.info(f"Camera {camera_id} recovered.")
+            return
+
+        state["backoff"] = min(state["backoff"] * 2, self.backoff_max)
+        state["next_try"] = time.monotonic() + state["backoff"]
+        logger.warning(f"Camera {camera_id} still offline. Next attempt in {state['backoff']:.0f}s.")
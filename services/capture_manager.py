@@ -1,73 +1,378 @@
 import threading
 import time
 import queue
-from concurrent.futures import ThreadPoolExecutor
-from config import CAMERA_COUNT, LOCAL_TEMP_BUFFER, USE_REAL_CAMERA, CAMERA_IPS, RESIZE_RATIO
+from concurrent.futures import ThreadPoolExecutor, wait
+from config import CAMERA_COUNT, LOCAL_TEMP_BUFFER, USE_REAL_CAMERA, CAMERA_IPS, RESIZE_RATIO, ACQUISITION_MODE, RING_NODE_COUNT, PREVIEW_BINNING, PREVIEW_DEMOSAIC, CAMERA_CONNECT_TIMEOUT
+from config import SYNC_TRIGGER, ACTION_DEVICE_KEY, ACTION_GROUP_KEY, ACTION_GROUP_MASK
+from config import GIGE_LINK_MBPS, GIGE_LINK_UTILIZATION, GIGE_RESEND, GIGE_GVSP_TIMEOUT_MS, GIGE_GVCP_TIMEOUT_MS
+from config import TRIGGER_STAGGER_WINDOW_MS, CAMERA_WIDTH, CAMERA_HEIGHT, HB_TRANSFER
+from config import FEATURE_PROFILES, FEATURE_PROFILE_DIR
+from config import JPEG_ENCODER, TIMESTAMP_OVERLAY
+from config import LINE_SCAN_CAMERAS, LINE_SCAN_LENGTH, LINE_SCAN_BLOCK_LINES, LINE_SCAN_STRIP_LINES, LINE_SCAN_LINE_RATE, LINE_SCAN_TRIGGER
+from config import GENTL_CAMERAS, GENTL_CTI_PATH
+from config import MOCK_FRAME_POOL, MOCK_SAMPLE_DIR, MOCK_EXPOSURE_MS, MOCK_READOUT_MS, MOCK_JITTER_MS
+from config import MULTICAST_PREVIEW, MONITOR_STATION, MULTICAST_GROUP, MULTICAST_PORT
+from config import PREVIEW_FPS, PREVIEW_FPS_PER_CAMERA
+from config import CLIP_RECORDING, CLIP_PRE_SECONDS, CLIP_POST_SECONDS, CLIP_FRAME_BUDGET, CLIP_WIDTH
+from config import MULTI_LIGHT_CAMERAS, MULTI_LIGHT_COUNT
+from config import BAYER_CVT_QUALITY, BAYER_GAMMA, BAYER_CCM, BAYER_CCM_SCALE
 from hardware.mock_camera import MockCamera
-from hardware.hik_camera import HikCamera
+from hardware.hik_camera import HikCamera, issue_action_command
+from hardware.line_scan_camera import LineScanCamera
+from hardware.gentl_camera import GenTLCamera
+from hardware.device_registry import DeviceRegistry, GenTLRegistry, GenTLDeviceEntry
+from hardware.transport import GigETransportSettings, multicast_group_for
+from hardware.feature_profiles import FeatureProfileStore
 from services.file_service import FileService
+from services.clip_recorder import ClipRecorder
 from utils.logger import setup_logger
 from utils.image_utils import overlay_timestamp
 
 logger = setup_logger("CaptureService")
 
+class TriggerScheduler:
+    """
+    Staggers software triggers of cameras that share a host NIC so their
+    readouts do not hit the link at the same moment.
+
+    Within one interface, camera k fires k * slot after the first, where slot
+    is the time one frame needs at the link budget (link * utilization), so
+    readouts queue back to back instead of colliding. window_ms caps the total
+    spread: 0 fires everything together (best exposure simultaneity, GevSCPD
+    pacing only), larger windows trade simultaneity for staying under budget.
+    Cameras on different interfaces never delay each other.
+    """
+    def __init__(self, link_mbps, utilization, window_ms):
+        self.link_mbps = link_mbps
+        self.utilization = utilization
+        self.window_ms = window_ms
+
+    def plan(self, cameras):
+        """
+        Returns a trigger offset in seconds for each camera (same order).
+        """
+        offsets = [0.0] * len(cameras)
+        if self.window_ms <= 0:
+            return offsets
+
+        groups = {}
+        for i, cam in enumerate(cameras):
+            device = getattr(cam, "device", None)
+            if isinstance(device, GenTLDeviceEntry):
+                continue  # Frame-grabber links are not shared between cameras
+            interface = device.interface_ip if device is not None and device.interface_ip else "local"
+            groups.setdefault(interface, []).append(i)
+
+        budget_bps = self.link_mbps * 1_000_000 * self.utilization
+        for interface, members in groups.items():
+            if len(members) < 2:
+                continue
+            payload = max(getattr(cameras[i], "nPayloadSize", 0) or CAMERA_WIDTH * CAMERA_HEIGHT for i in members)
+            slot = payload * 8 / budget_bps
+            slot = min(slot, self.window_ms / 1000.0 / (len(members) - 1))
+            for k, i in enumerate(members):
+                offsets[i] = k * slot
+            logger.info(f"Stagger {interface}: {len(members)} cams, slot {slot * 1000:.0f} ms, "
+                        f"spread {(len(members) - 1) * slot * 1000:.0f} ms")
+        return offsets
+
 class CaptureManager:
-    def __init__(self, upload_queue, update_cam_status_callback=None, update_cam_image_callback=None):
+    def __init__(self, upload_queue, update_cam_status_callback=None, update_cam_image_callback=None,
+                 update_cam_fps_callback=None):
         self.cameras = []
         self.upload_queue = upload_queue
         self.executor = ThreadPoolExecutor(max_workers=CAMERA_COUNT)
         self.update_cam_status_callback = update_cam_status_callback 
         self.update_cam_image_callback = update_cam_image_callback # callback(cam_idx, pil_image)
-        self.pending_captures = {} # {index: pil_image}
+        self.update_cam_fps_callback = update_cam_fps_callback # callback(cam_idx, resulting_fps) while previewing
+        # {index: (pil_image, or [pil_image per light] for multi-light, camera pixel_format, batch id)}
+        self.pending_captures = {}
+        self.pending_scans = {} # {index: [strip paths]} written by line-scan cameras, awaiting review
+        self._init_lock = threading.Lock()
+        self._abandoned = set() # cameras whose connect() missed the deadline and is still running
+        self._connect_results = {} # cam -> connect() result, for connects that beat the deadline
+        self.last_sync_skew_ms = None # Exposure skew of the last synchronized batch
+        self.offline_cameras = [] # Cameras that failed to connect or dropped (for the supervisor)
+        self.preview_active = False
+        self.preview_callback = None
+        self._preview_lock = threading.Lock() # Streams are started/stopped by the UI and the clip feed
+        self._clip_feed_id = 0 # Bumped per batch; only the latest post-trigger feed may stop the streams
+        self.scheduler = TriggerScheduler(GIGE_LINK_MBPS, GIGE_LINK_UTILIZATION, TRIGGER_STAGGER_WINDOW_MS)
+        # Preview frames around each trigger, kept even when the operator retakes
+        self.clip_recorder = None
+        if CLIP_RECORDING:
+            self.clip_recorder = ClipRecorder(LOCAL_TEMP_BUFFER, pre_s=CLIP_PRE_SECONDS, post_s=CLIP_POST_SECONDS,
+                                              frame_budget=CLIP_FRAME_BUDGET, width=CLIP_WIDTH)
+            self.clip_recorder.on_clip = lambda cam_id, path: self.upload_queue.put(path)
         # Status codes: 0=Disconnected, 1=Connected, 2=Capturing, 3=Done/Success, 4=Error, 5=Reviewing
 
     def initialize_cameras(self):
+        """
+        Connect all cameras concurrently. Each camera reports its status as soon
+        as it finishes; cameras still connecting after CAMERA_CONNECT_TIMEOUT
+        are marked disconnected and do not hold up the others.
+        """
         logger.info(f"Initializing {CAMERA_COUNT} cameras... (Real Hardware: {USE_REAL_CAMERA})")
+        registry = None
+        gentl_registry = None
+        transport = None
+        profile_store = FeatureProfileStore(FEATURE_PROFILE_DIR) if FEATURE_PROFILES else None
+        if USE_REAL_CAMERA:
+            # One discovery for all cameras; each binds by IP/serial from this snapshot
+            registry = DeviceRegistry()
+            registry.enumerate()
+            transport = GigETransportSettings(link_mbps=GIGE_LINK_MBPS, utilization=GIGE_LINK_UTILIZATION,
+                                              resend=GIGE_RESEND, gvsp_timeout_ms=GIGE_GVSP_TIMEOUT_MS,
+                                              gvcp_timeout_ms=GIGE_GVCP_TIMEOUT_MS)
+            if GENTL_CAMERAS:
+                # Frame grabbers are enumerated through their GenTL producer, not MV_CC_EnumDevices
+                gentl_registry = GenTLRegistry(GENTL_CTI_PATH)
+                gentl_registry.enumerate()
+
+        # Fast conversion for preview, configured quality + gamma/CCM for saved frames
+        conversion_profiles = {
+            "preview": {"quality": 0, "gamma": 0.0, "ccm": None, "ccm_scale": BAYER_CCM_SCALE},
+            "full": {"quality": BAYER_CVT_QUALITY, "gamma": BAYER_GAMMA, "ccm": BAYER_CCM or None,
+                     "ccm_scale": BAYER_CCM_SCALE},
+        }
+
+        # Monitor stations watch the control station's multicast stream read-only
+        access = "monitor" if MONITOR_STATION else "control" if MULTICAST_PREVIEW else "exclusive"
+
+        cams = []
         for i in range(CAMERA_COUNT):
-            if USE_REAL_CAMERA:
+            multi_light = MULTI_LIGHT_COUNT if i+1 in MULTI_LIGHT_CAMERAS else 0
+            if USE_REAL_CAMERA and i+1 in GENTL_CAMERAS:
+                cam = GenTLCamera(camera_id=i+1, ip_address=CAMERA_IPS.get(i+1, ""), cti_path=GENTL_CTI_PATH,
+                                  registry=gentl_registry, profile_store=profile_store,
+                                  acquisition_mode=ACQUISITION_MODE,
+                                  ring_node_count=RING_NODE_COUNT,
+                                  preview_binning=PREVIEW_BINNING,
+                                  preview_demosaic=PREVIEW_DEMOSAIC,
+                                  preview_fps=PREVIEW_FPS_PER_CAMERA.get(i+1, PREVIEW_FPS),
+                                  multi_light=multi_light,
+                                  conversion_profiles=conversion_profiles)
+            elif USE_REAL_CAMERA and i+1 in LINE_SCAN_CAMERAS:
+                cam = LineScanCamera(camera_id=i+1, ip_address=CAMERA_IPS.get(i+1, "0.0.0.0"), registry=registry,
+                                     transport=transport, profile_store=profile_store, hb_transfer=HB_TRANSFER,
+                                     block_lines=LINE_SCAN_BLOCK_LINES, line_rate=LINE_SCAN_LINE_RATE,
+                                     line_trigger=LINE_SCAN_TRIGGER,
+                                     conversion_profiles=conversion_profiles, ptp=SYNC_TRIGGER)
+            elif USE_REAL_CAMERA:
                 ip = CAMERA_IPS.get(i+1, "0.0.0.0")
-                cam = HikCamera(camera_id=i+1, ip_address=ip)
+                cam = HikCamera(camera_id=i+1, ip_address=ip, registry=registry, transport=transport,
+                                profile_store=profile_store,
+                                acquisition_mode=ACQUISITION_MODE,
+                                ring_node_count=RING_NODE_COUNT,
+                                preview_binning=PREVIEW_BINNING,
+                                preview_demosaic=PREVIEW_DEMOSAIC,
+                                hb_transfer=HB_TRANSFER,
+                                access=access,
+                                multicast_group=multicast_group_for(MULTICAST_GROUP, i+1) if access != "exclusive" else None,
+                                multicast_port=MULTICAST_PORT,
+                                preview_fps=PREVIEW_FPS_PER_CAMERA.get(i+1, PREVIEW_FPS),
+                                multi_light=multi_light,
+                                conversion_profiles=conversion_profiles,
+                                ptp=SYNC_TRIGGER)
             else:
-                cam = MockCamera(camera_id=i+1)
-            
-            if cam.connect():
-                self.cameras.append(cam)
+                cam = MockCamera(camera_id=i+1, width=CAMERA_WIDTH, height=CAMERA_HEIGHT,
+                                 pool_size=MOCK_FRAME_POOL, sample_dir=MOCK_SAMPLE_DIR,
+                                 exposure_ms=MOCK_EXPOSURE_MS, readout_ms=MOCK_READOUT_MS,
+                                 jitter_ms=MOCK_JITTER_MS,
+                                 preview_fps=PREVIEW_FPS_PER_CAMERA.get(i+1, PREVIEW_FPS))
+            cam.fps_listener = self._on_camera_fps
+            cams.append(cam)
+
+        self._abandoned = set()
+        self._connect_results = {}
+        pool = ThreadPoolExecutor(max_workers=CAMERA_COUNT, thread_name_prefix="CamInit")
+        futures = [pool.submit(self._connect_camera, i, cam) for i, cam in enumerate(cams)]
+        wait(futures, timeout=CAMERA_CONNECT_TIMEOUT)
+
+        with self._init_lock:
+            # Outcomes are recorded under the lock, so a connect finishing right now is not lost
+            for i, cam in enumerate(cams):
+                if cam not in self._connect_results:
+                    # The SDK call cannot be interrupted; _connect_camera cleans up if it ever returns
+                    self._abandoned.add(cam)
+                    logger.error(f"Camera {i+1} did not connect within {CAMERA_CONNECT_TIMEOUT}s")
+                    if self.update_cam_status_callback:
+                        self.update_cam_status_callback(i, 0) # Error
+            # Keep camera order stable regardless of completion order
+            self.cameras = [cam for cam in cams if self._connect_results.get(cam)]
+            # Timed-out cameras too: the supervisor retries them once the stuck connect returns
+            self.offline_cameras = [cam for cam in cams if not self._connect_results.get(cam)]
+        pool.shutdown(wait=False)
+        if self.clip_recorder:
+            self.clip_recorder.attach(self.cameras)
+        logger.info(f"All cameras initialized ({len(self.cameras)}/{CAMERA_COUNT} connected).")
+
+    def _connect_camera(self, index, cam):
+        try:
+            ok = cam.connect()
+        except Exception as e:
+            logger.error(f"Camera {index+1} connect raised: {e}")
+            ok = False
+
+        with self._init_lock:
+            if cam in self._abandoned:
+                # Finished after the deadline: release the device, it is not in self.cameras.
+                # The supervisor reconnects it from offline_cameras.
+                if ok:
+                    cam.disconnect()
+                self._abandoned.discard(cam)
+                return False
+            self._connect_results[cam] = ok
+            if ok:
                 if self.update_cam_status_callback:
-                    self.update_cam_status_callback(i, 1) # Connected
+                    self.update_cam_status_callback(index, 1) # Connected
             else:
-                logger.error(f"Failed to connect to Camera {i+1}")
+                logger.error(f"Failed to connect to Camera {index+1}")
                 if self.update_cam_status_callback:
-                    self.update_cam_status_callback(i, 0) # Error
-        logger.info("All cameras initialized.")
+                    self.update_cam_status_callback(index, 0) # Error
+        return ok
 
     def trigger_batch_capture(self, save_now=True):
         """
         Trigger all cameras.
         If save_now is False, images are stored in pending_captures for review.
         """
+        if MONITOR_STATION:
+            logger.warning("Monitor station: capture is only triggered from the control station.")
+            return
         logger.info(f"Trigger received! Batch capture (Save={save_now}).")
         timestamp_str = time.strftime("%Y%m%d_%H%M%S")
         self.pending_captures.clear()
+        self._drop_pending_scans()
+        clip_feed = None
+        if self.clip_recorder:
+            # With preview stopped for review the "after" frames start once the grabs are done
+            self.clip_recorder.trigger(self.cameras, timestamp_str, hold=not self.preview_active)
+            clip_feed = self._begin_clip_feed()
         
+        for cam in self.cameras:
+            if self.update_cam_status_callback:
+                self.update_cam_status_callback(cam.camera_id - 1, 2) # Capturing
+
+        if SYNC_TRIGGER and self.cameras and all(isinstance(cam, HikCamera) for cam in self.cameras):
+            # Arming and skew measurement block until all frames arrive: keep it off the UI thread
+            threading.Thread(target=self._sync_batch_capture, args=(timestamp_str, save_now, clip_feed), daemon=True).start()
+            return
+
+        # Fire times relative to a common start so offsets do not drift with submit order
+        offsets = self.scheduler.plan(self.cameras)
+        start = time.perf_counter()
         futures = []
         for i, cam in enumerate(self.cameras):
-            if self.update_cam_status_callback:
-                self.update_cam_status_callback(i, 2) # Capturing
-            futures.append(self.executor.submit(self._capture_task, cam, i, timestamp_str, save_now))
+            futures.append(self.executor.submit(self._capture_task, cam, cam.camera_id - 1, timestamp_str, save_now,
+                                                fire_at=start + offsets[i]))
+        if clip_feed:
+            threading.Thread(target=self._feed_clip_recorder, args=(futures, clip_feed), daemon=True).start()
 
-    def _capture_task(self, camera, index, batch_id, save_now):
+    def _begin_clip_feed(self):
+        """
+        New batch: end any post-trigger feed still streaming (the cameras must
+        be back in trigger mode for the capture) and return its feed id.
+        """
+        with self._preview_lock:
+            self._clip_feed_id += 1
+            if not self.preview_active:
+                for cam in self.cameras:
+                    if cam.supports_clip_record:
+                        cam.stop_streaming()
+            return self._clip_feed_id
+
+    def _feed_clip_recorder(self, futures, feed_id):
+        """
+        The dashboard stops preview for the capture, so once the grabs are
+        done restart the clips' post-trigger window and stream, feeding only
+        the clip recorder, until it has passed.
+        """
+        wait(futures)
+        self.clip_recorder.restart_post_window()
+        cams = [cam for cam in self.cameras if cam.supports_clip_record]
+        with self._preview_lock:
+            if feed_id != self._clip_feed_id or self.preview_active:
+                return
+            deadline = time.perf_counter() + self.clip_recorder.post_s
+            for cam in cams:
+                cam.start_streaming(self._on_preview_frame)
+        time.sleep(max(0.0, deadline - time.perf_counter()))
+        with self._preview_lock:
+            # Preview restarted (Retake) or a newer batch took over: leave the streams alone
+            if feed_id != self._clip_feed_id or self.preview_active:
+                return
+            for cam in cams:
+                cam.stop_streaming()
+
+    def _sync_batch_capture(self, batch_id, save_now, clip_feed=None):
+        """
+        Arm every camera for Action1, start the waiting grabs, fire one action
+        command broadcast and report the exposure skew from device timestamps.
+        Falls back to per-camera software triggers if any camera cannot arm.
+        """
+        armed = [cam.arm_action_trigger(ACTION_DEVICE_KEY, ACTION_GROUP_KEY, ACTION_GROUP_MASK) for cam in self.cameras]
+        send_trigger = not all(armed)
+        if send_trigger:
+            logger.warning("Not every camera accepted the action trigger. Using software triggers for this batch.")
+            for cam in self.cameras:
+                cam.disarm_action_trigger()
+
+        futures = [self.executor.submit(self._capture_task, cam, cam.camera_id - 1, batch_id, save_now, send_trigger)
+                   for cam in self.cameras]
         try:
-            img = camera.grab_image()
+            if not send_trigger:
+                acked = issue_action_command(self.cameras, ACTION_DEVICE_KEY, ACTION_GROUP_KEY, ACTION_GROUP_MASK)
+                logger.info(f"Action command issued ({acked}/{len(self.cameras)} acknowledged).")
+        except Exception as e:
+            logger.error(f"Synchronized trigger failed: {e}")
+        finally:
+            wait(futures)
+            for cam in self.cameras:
+                cam.disarm_action_trigger()
+
+        if not send_trigger:
+            self._report_sync_skew(futures)
+        if clip_feed:
+            self._feed_clip_recorder(futures, clip_feed)
+
+    def _report_sync_skew(self, futures):
+        timestamps = [cam.last_frame_timestamp for cam, fut in zip(self.cameras, futures)
+                      if fut.result() and cam.last_frame_timestamp is not None]
+        if len(timestamps) < 2:
+            return
+        # Device ticks; PTP-synchronized Hikrobot cameras tick at 1 GHz
+        tick_hz = self.cameras[0].timestamp_tick_hz or 1_000_000_000
+        self.last_sync_skew_ms = (max(timestamps) - min(timestamps)) * 1000.0 / tick_hz
+        logger.info(f"Synchronized batch exposure skew: {self.last_sync_skew_ms:.3f} ms across {len(timestamps)} cameras")
+
+    def _capture_task(self, camera, index, batch_id, save_now, send_trigger=True, fire_at=None):
+        try:
+            if fire_at is not None:
+                delay = fire_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            if getattr(camera, "is_line_scan", False):
+                # Scans are written strip by strip as they arrive; too large to hold in memory for review
+                return self._capture_scan(camera, index, batch_id, save_now)
+            if getattr(camera, "multi_light", 0) > 1:
+                # One trigger and one readout for every lighting channel
+                return self._capture_multi_light(camera, index, batch_id, save_now, send_trigger)
+            if save_now and self._use_sdk_encoder(camera):
+                return self._capture_direct(camera, index, batch_id, send_trigger)
+
+            if send_trigger:
+                img = camera.grab_image()
+            else:
+                img = camera.grab_image(send_trigger=False)
             logger.debug(f"Cam {index+1} Grab success. Type: {type(img)}")
+            if self.clip_recorder:
+                # The capture itself is the clip's frame at the trigger
+                self.clip_recorder.add_frame(index+1, img)
             
             # --- OVERLAY TIMESTAMP ---
-            try:
-                img = overlay_timestamp(img, camera_id=index+1)
-                logger.debug(f"Cam {index+1} Overlay success.")
-            except Exception as e_overlay:
-                logger.error(f"Cam {index+1} Overlay failed: {e_overlay}")
-                # Continue without overlay if it fails
-                pass
+            if TIMESTAMP_OVERLAY:
+                img = self._overlay(img, index)
 
             # Update UI immediately for preview
             if self.update_cam_image_callback:
@@ -75,35 +380,143 @@ class CaptureManager:
 
             if not save_now:
                 # Store for review
-                self.pending_captures[index] = img
+                self.pending_captures[index] = (img, camera.pixel_format, batch_id)
                 if self.update_cam_status_callback:
                     self.update_cam_status_callback(index, 5) # Reviewing
-                return
+                return True
 
             # Save immediately
-            self._save_and_queue(index, img, batch_id)
+            self._save_and_queue(index, img, batch_id, pixel_format=camera.pixel_format)
+            return True
                     
         except Exception as e:
             logger.error(f"Error capturing from Cam {index+1}: {e}")
             if self.update_cam_status_callback:
                 self.update_cam_status_callback(index, 4) # Exception
+            return False
+
+    def _overlay(self, img, index):
+        try:
+            img = overlay_timestamp(img, camera_id=index+1)
+            logger.debug(f"Cam {index+1} Overlay success.")
+        except Exception as e_overlay:
+            logger.error(f"Cam {index+1} Overlay failed: {e_overlay}")
+            # Continue without overlay if it fails
+        return img
+
+    def _capture_multi_light(self, camera, index, batch_id, save_now, send_trigger=True):
+        """
+        Split one multi-light frame into its per-light images and save them
+        as CAM<n>_<batch>_L<k>.jpg (or hold the list for review).
+        """
+        images = camera.grab_multi_light(send_trigger=send_trigger)
+        if TIMESTAMP_OVERLAY:
+            images = [self._overlay(img, index) for img in images]
+        logger.debug(f"Cam {index+1} multi-light grab: {len(images)} lights")
+
+        if self.clip_recorder:
+            self.clip_recorder.add_frame(index+1, images[0])
+        # Preview shows the first light
+        if self.update_cam_image_callback:
+            self.update_cam_image_callback(index, images[0])
+
+        if not save_now:
+            self.pending_captures[index] = (images, camera.pixel_format, batch_id)
+            if self.update_cam_status_callback:
+                self.update_cam_status_callback(index, 5) # Reviewing
+            return True
+
+        for light, img in enumerate(images, start=1):
+            self._save_and_queue(index, img, batch_id, light=light, pixel_format=camera.pixel_format)
+        return True
+
+    def _use_sdk_encoder(self, camera):
+        """
+        The SDK encoder writes the frame as captured, so it is only used when
+        nothing has to be drawn on or resized.
+        """
+        return (JPEG_ENCODER == "sdk" and camera.supports_raw_encode
+                and not TIMESTAMP_OVERLAY and RESIZE_RATIO >= 100)
+
+    def _capture_direct(self, camera, index, batch_id, send_trigger=True):
+        from config import JPEG_QUALITY
+
+        filename = f"CAM{index+1}_{batch_id}.jpg"
+        saved_path, preview = FileService.save_frame(camera, LOCAL_TEMP_BUFFER, filename,
+                                                     quality=JPEG_QUALITY, send_trigger=send_trigger)
+        if preview is not None and self.clip_recorder:
+            self.clip_recorder.add_frame(index+1, preview)
+        if preview is not None and self.update_cam_image_callback:
+            self.update_cam_image_callback(index, preview)
+        if not saved_path:
+            if self.update_cam_status_callback:
+                self.update_cam_status_callback(index, 4) # Save Error
+            return False
+
+        self.upload_queue.put(saved_path)
+        logger.debug(f"Cam {index+1} captured & queued (SDK encoder).")
+        if self.update_cam_status_callback:
+            self.update_cam_status_callback(index, 3) # Success
+        return True
+
+    def _capture_scan(self, camera, index, batch_id, save_now=True):
+        """
+        The strips are on disk once the scan returns; for review they are
+        only queued for upload by confirm_save (discard deletes them).
+        """
+        from config import JPEG_QUALITY
+
+        result = camera.scan(LINE_SCAN_LENGTH, LOCAL_TEMP_BUFFER, f"CAM{index+1}_{batch_id}",
+                             strip_lines=LINE_SCAN_STRIP_LINES, quality=JPEG_QUALITY)
+        if self.update_cam_image_callback:
+            self.update_cam_image_callback(index, result["preview"])
+        ok = result["lines"] == LINE_SCAN_LENGTH and bool(result["strips"])
+        if ok and not save_now:
+            self.pending_scans[index] = result["strips"]
+            if self.update_cam_status_callback:
+                self.update_cam_status_callback(index, 5) # Reviewing
+            return True
+        for path in result["strips"]:
+            self.upload_queue.put(path)
+        if self.update_cam_status_callback:
+            self.update_cam_status_callback(index, 3 if ok else 4)
+        return ok
+
+    def _drop_pending_scans(self):
+        for paths in self.pending_scans.values():
+            for path in paths:
+                FileService.delete_file(path)
+        self.pending_scans.clear()
 
     def confirm_save(self):
         """
         Save all pending captures to disk and queue for upload.
         """
         logger.info("Confirming save for pending captures...")
-        timestamp_str = time.strftime("%Y%m%d_%H%M%S")
         
-        # We can run this in parallel too, but simple loop is fine for saving
-        for index, img in self.pending_captures.items():
+        # We can run this in parallel too, but simple loop is fine for saving.
+        # Files keep the trigger-time batch id, so they match the batch's clip and scan strips.
+        for index, (img, pixel_format, batch_id) in self.pending_captures.items():
             try:
-                self._save_and_queue(index, img, timestamp_str)
+                if isinstance(img, list):
+                    # Multi-light capture: one file per light
+                    for light, light_img in enumerate(img, start=1):
+                        self._save_and_queue(index, light_img, batch_id, light=light, pixel_format=pixel_format)
+                else:
+                    self._save_and_queue(index, img, batch_id, pixel_format=pixel_format)
             except Exception as e:
                 logger.error(f"Error saving pending Cam {index+1}: {e}")
                 self.update_cam_status_callback(index, 4)
 
+        # Line-scan strips are already saved: queue them
+        for index, paths in self.pending_scans.items():
+            for path in paths:
+                self.upload_queue.put(path)
+            if self.update_cam_status_callback:
+                self.update_cam_status_callback(index, 3) # Success
+
         self.pending_captures.clear()
+        self.pending_scans.clear()
 
     def discard_capture(self):
         """
@@ -111,11 +524,12 @@ class CaptureManager:
         """
         logger.info("Discarding pending captures.")
         self.pending_captures.clear()
-        for i in range(len(self.cameras)):
+        self._drop_pending_scans()
+        for cam in self.cameras:
              if self.update_cam_status_callback:
-                self.update_cam_status_callback(i, 1) # Reset to Ready
+                self.update_cam_status_callback(cam.camera_id - 1, 1) # Reset to Ready
 
-    def _save_and_queue(self, index, img, batch_id):
+    def _save_and_queue(self, index, img, batch_id, light=None, pixel_format="RGB8"):
         from config import JPEG_QUALITY
         
         # Apply Resizing if needed
@@ -134,8 +548,10 @@ class CaptureManager:
              except Exception as e:
                 logger.error(f"Resize failed for Cam {index+1}: {e}")
 
-        filename = f"CAM{index+1}_{batch_id}.jpg"
-        saved_path = FileService.save_image(img, LOCAL_TEMP_BUFFER, filename, quality=JPEG_QUALITY)
+        filename = f"CAM{index+1}_{batch_id}.jpg" if light is None else f"CAM{index+1}_{batch_id}_L{light}.jpg"
+        # The camera's pixel_format tag: Mono8 is written as grayscale JPEG
+        saved_path = FileService.save_image(img, LOCAL_TEMP_BUFFER, filename, quality=JPEG_QUALITY,
+                                            pixel_format=pixel_format)
         
         if saved_path:
             self.upload_queue.put(saved_path)
@@ -152,24 +568,95 @@ class CaptureManager:
         """
         logger.info("Starting live preview for all cameras...")
         
-        def preview_callback(cam_id, img):
-            # Map camera_id (1-based) to index (0-based) for UI callback
-            if self.update_cam_image_callback:
-                idx = cam_id - 1
-                self.update_cam_image_callback(idx, img)
+        with self._preview_lock:
+            self.preview_active = True
+            self.preview_callback = self._on_preview_frame
+            # HikCamera, pooled MockCamera
+            self._for_each_camera("start_streaming", self._on_preview_frame)
+
+    def _on_preview_frame(self, cam_id, img):
+        if self.clip_recorder:
+            self.clip_recorder.add_frame(cam_id, img)
+        # Map camera_id (1-based) to index (0-based) for UI callback
+        # (a post-trigger clip feed streams with preview off: the UI keeps the capture)
+        if self.preview_active and self.update_cam_image_callback:
+            idx = cam_id - 1
+            self.update_cam_image_callback(idx, img)
 
+    def set_preview_fps(self, camera_id, fps):
+        """
+        Change one camera's preview rate at runtime (0 = camera maximum).
+        """
         for cam in self.cameras:
-            if isinstance(cam, HikCamera): # Or MockCamera if it supported streaming
-                cam.start_streaming(preview_callback)
+            if cam.camera_id == camera_id and hasattr(cam, "set_preview_fps"):
+                cam.set_preview_fps(fps)
+                logger.info(f"Camera {camera_id} preview rate set to {fps} fps")
+                return True
+        return False
+
+    def _on_camera_fps(self, camera_id, fps):
+        if self.update_cam_fps_callback:
+            self.update_cam_fps_callback(camera_id - 1, fps)
 
     def stop_preview(self):
         """
         Stop live preview for all cameras.
         """
         logger.info("Stopping live preview...")
-        for cam in self.cameras:
-            if hasattr(cam, 'stop_streaming'): # Safety check
-                cam.stop_streaming()
+        with self._preview_lock:
+            self.preview_active = False
+            self._for_each_camera("stop_streaming")
+
+    def _for_each_camera(self, method, *args):
+        """
+        Call method on every camera that has it, all cameras in parallel.
+        Each one joins its stream thread and round-trips StopGrabbing/StartGrabbing
+        and trigger nodes, so one at a time adds up to seconds.
+        """
+        cams = [cam for cam in self.cameras if hasattr(cam, method)]
+        if not cams:
+            return
+        with ThreadPoolExecutor(max_workers=len(cams), thread_name_prefix="Preview") as pool:
+            futures = {pool.submit(getattr(cam, method), *args): cam for cam in cams}
+        for fut, cam in futures.items():
+            if fut.exception():
+                logger.error(f"Camera {cam.camera_id} {method} failed: {fut.exception()}")
+
+    def remove_camera(self, cam):
+        """
+        Take a failed camera out of the active set (supervisor hook).
+        """
+        with self._init_lock:
+            if cam in self.cameras:
+                self.cameras.remove(cam)
+            if cam not in self.offline_cameras:
+                self.offline_cameras.append(cam)
+        if self.update_cam_status_callback:
+            self.update_cam_status_callback(cam.camera_id - 1, 0) # Disconnected
+
+    def connect_pending(self, cam):
+        """
+        True while a startup connect() that missed its deadline is still running for cam.
+        """
+        with self._init_lock:
+            return cam in self._abandoned
+
+    def rejoin_camera(self, cam):
+        """
+        Put a reconnected camera back in camera-id order and resume its preview.
+        """
+        with self._init_lock:
+            if cam in self.offline_cameras:
+                self.offline_cameras.remove(cam)
+            if cam not in self.cameras:
+                self.cameras.append(cam)
+                self.cameras.sort(key=lambda c: c.camera_id)
+        if self.clip_recorder:
+            self.clip_recorder.attach(self.cameras)
+        if self.update_cam_status_callback:
+            self.update_cam_status_callback(cam.camera_id - 1, 1) # Connected
+        if self.preview_active and hasattr(cam, "start_streaming"):
+            cam.start_streaming(self.preview_callback)
 
     def shutdown(self):
         self.stop_preview()
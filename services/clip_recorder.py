@@ -0,0 +1,135 @@
+import os
+import time
+import threading
+from collections import deque
+import numpy as np
+from PIL import Image
+from utils.logger import setup_logger
+
+logger = setup_logger("ClipRecorder")
+
+class ClipRecorder:
+    """
+    Keeps the last few seconds of preview frames per camera and, when a
+    batch is triggered, writes pre_s seconds before and post_s seconds after
+    the trigger as CAM<n>_<batch_id>.avi through the camera's SDK recorder
+    (MV_CC_StartRecord / InputOneFrame / StopRecord, as in Python/Recording).
+    Frames come from the preview stream and the batch capture itself; while
+    preview is stopped for review, CaptureManager keeps a recorder-only
+    stream running until the post-trigger window has passed.
+
+    Memory is capped by frame_budget: the frames of all cameras together,
+    each downscaled to width pixels wide, never exceed that count. Half of a
+    camera's share is its pre-trigger ring, the other half caps the frames
+    collected after a trigger.
+    """
+    def __init__(self, folder, pre_s=3.0, post_s=2.0, frame_budget=120, width=640, bitrate_kbps=2000):
+        self.folder = folder
+        self.pre_s = pre_s
+        self.post_s = post_s
+        self.frame_budget = frame_budget
+        self.width = width
+        self.bitrate_kbps = bitrate_kbps
+        self.on_clip = None  # callback(camera_id, path) for each written clip
+        self._rings = {}     # camera_id -> deque of (time, frame array)
+        self._pending = {}   # camera_id -> (post window start or None = held, frames, path, camera)
+        self._size = None    # (width, height) of every stored frame
+        self._lock = threading.Lock()
+
+    def attach(self, cameras):
+        """
+        One ring per camera that can record; the frame budget is split evenly.
+        """
+        recordable = [cam for cam in cameras if cam.supports_clip_record]
+        with self._lock:
+            per_camera = max(2, self.frame_budget // max(1, len(recordable)))
+            self._rings = {cam.camera_id: deque(self._rings.get(cam.camera_id, ()), maxlen=per_camera // 2)
+                           for cam in recordable}
+        if recordable:
+            logger.info(f"Clip recorder: {len(recordable)} cameras, {per_camera} frames each "
+                        f"({self.pre_s:.0f}s before / {self.post_s:.0f}s after a trigger)")
+
+    def add_frame(self, camera_id, img):
+        """
+        Preview frame tap: downscale and store (and extend a pending clip).
+        """
+        ring = self._rings.get(camera_id)
+        if ring is None:
+            return
+        frame = np.asarray(self._fit(img))
+        now = time.perf_counter()
+        with self._lock:
+            ring.append((now, frame))
+            pending = self._pending.get(camera_id)
+            if pending and (pending[0] is None or now <= pending[0] + self.post_s) and len(pending[1]) < 2 * ring.maxlen:
+                pending[1].append((now, frame))
+
+    def _fit(self, img):
+        if self._size is None:
+            w, h = img.size
+            height = max(2, int(h * self.width / w) // 2 * 2)
+            self._size = (self.width, height)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        if img.size != self._size:
+            img = img.resize(self._size, Image.Resampling.BILINEAR)
+        return img
+
+    def trigger(self, cameras, batch_id, hold=False):
+        """
+        Freeze the pre-trigger frames of every camera and write each clip
+        once the post-trigger window has passed. hold=True keeps the window
+        open (collecting e.g. the capture frames) until restart_post_window().
+        """
+        now = time.perf_counter()
+        with self._lock:
+            for cam in cameras:
+                ring = self._rings.get(cam.camera_id)
+                if ring is None or cam.camera_id in self._pending:
+                    continue
+                frames = [(t, f) for t, f in ring if t >= now - self.pre_s]
+                path = os.path.join(self.folder, f"CAM{cam.camera_id}_{batch_id}.avi")
+                self._pending[cam.camera_id] = (None if hold else now, frames, path, cam)
+        if not hold:
+            self._schedule_flush()
+
+    def restart_post_window(self):
+        """
+        Start the post-trigger window of the held clips now: for captures that
+        stop the preview, the "after" frames only begin once the grabs are done.
+        """
+        now = time.perf_counter()
+        with self._lock:
+            for cid, (start, frames, path, cam) in self._pending.items():
+                if start is None:
+                    self._pending[cid] = (now, frames, path, cam)
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        timer = threading.Timer(self.post_s, self._flush)
+        timer.daemon = True
+        timer.start()
+
+    def _flush(self):
+        now = time.perf_counter()
+        with self._lock:
+            # Timer and perf_counter clocks differ slightly: allow a small margin
+            due = [cid for cid, pending in self._pending.items()
+                   if pending[0] is not None and now >= pending[0] + self.post_s - 0.05]
+            jobs = [self._pending.pop(cid) for cid in due]
+        for _, frames, path, cam in jobs:
+            if len(frames) < 2:
+                logger.info(f"Cam {cam.camera_id} clip skipped: {len(frames)} frames around the trigger")
+                continue
+            # Typical frame spacing: the pause while the batch was grabbed must not slow the clip down
+            interval = float(np.median(np.diff([t for t, _ in frames])))
+            fps = min(60.0, max(1.0, 1.0 / interval)) if interval > 0 else 1.0
+            try:
+                ok = cam.record_clip([f for _, f in frames], fps, path, self.bitrate_kbps)
+            except Exception as e:
+                logger.error(f"Cam {cam.camera_id} clip failed: {e}")
+                ok = False
+            if ok:
+                logger.info(f"Cam {cam.camera_id} clip: {len(frames)} frames at {fps:.1f} fps -> {path}")
+                if self.on_clip:
+                    self.on_clip(cam.camera_id, path)
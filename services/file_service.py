@@ -15,9 +15,11 @@ class FileService:
                 logger.error(f"Failed to create directory {path}: {e}")
 
     @staticmethod
-    def save_image(image, folder, filename, quality=95):
+    def save_image(image, folder, filename, quality=95, pixel_format="RGB8"):
         """
         Save PIL Image to disk.
+        pixel_format "Mono8" writes a single-channel (grayscale) JPEG,
+        anything else RGB.
         Returns absolute path of the saved file or None on failure.
         """
         try:
@@ -30,9 +32,9 @@ class FileService:
             ImageFile.LOAD_TRUNCATED_IMAGES = True
             ImageFile.MAXBLOCK = 65536 * 1024 # Increase buffer size
             
-            # Create a localized copy and ensure RGB mode (removes alpha/palette issues)
+            # Create a localized copy and ensure RGB (or L for Mono8) mode (removes alpha/palette issues)
             # This creates a completely fresh memory buffer
-            safe_image = image.convert("RGB")
+            safe_image = image.convert("L" if pixel_format == "Mono8" else "RGB")
             
             try:
                 # Attempt 1: Standard JPEG
@@ -63,6 +65,24 @@ class FileService:
             logger.error(f"Failed to save image {filename}: {e}\n{tb}")
             return None
 
+    @staticmethod
+    def save_frame(camera, folder, filename, quality=95, send_trigger=True):
+        """
+        Capture and JPEG-encode straight from the camera's SDK frame buffer
+        (camera.grab_to_file), skipping the PIL RGB round-trip.
+        Only for frames saved as-is: no overlay and no resize.
+        Returns (absolute path or None on failure, preview PIL image or None).
+        """
+        try:
+            FileService.ensure_directory(folder)
+            filepath = os.path.abspath(os.path.join(folder, filename))
+            preview = camera.grab_to_file(filepath, quality=quality, send_trigger=send_trigger)
+            logger.info(f"Saved image to {filepath} (Q={quality}, SDK encoder)")
+            return filepath, preview
+        except Exception as e:
+            logger.error(f"Failed to save image {filename} with SDK encoder: {e}")
+            return None, None
+
     @staticmethod
     def move_file(src_path, dest_folder):
         """
@@ -0,0 +1,60 @@
+import sys
+import os
+import ctypes
+
+# Runs on the simulated SDK: no cameras needed
+os.environ["AUTOPHOTE_FAKE_SDK"] = "1"
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from hardware import fake_mvs
+from hardware.hik_camera import HikCamera
+
+CAMERA_IP = "192.168.1.101"
+
+def _wipe_camera_buffers(cam):
+    """
+    Zero every buffer a returned image could alias: pData, the mailbox slots,
+    the SDK ring nodes (already handed back) and the multi-light split buffers.
+    """
+    buffers = [cam.pData]
+    buffers += [slot.buffer for slot in cam.mailbox._free if slot.buffer is not None]
+    buffers += list(getattr(cam.handle, "_free", []))
+    buffers += list(cam._split_bufs or [])
+    for buf in buffers:
+        ctypes.memset(buf, 0, ctypes.sizeof(buf))
+
+def _check_grab(mode, pixel_format, multi_light=0):
+    fake_mvs.configure(width=640, height=480, connect_ms=1, pixel_format=pixel_format, camera_ips=[CAMERA_IP])
+    cam = HikCamera(1, CAMERA_IP, acquisition_mode=mode, multi_light=multi_light)
+    assert cam.connect(), f"connect failed ({mode}, {pixel_format})"
+    try:
+        images = cam.grab_multi_light() if multi_light else [cam.grab_image()]
+        before = [img.tobytes() for img in images]
+        _wipe_camera_buffers(cam)
+        for img, pixels in zip(images, before):
+            assert img.tobytes() == pixels, f"{mode} {pixel_format} image changed with the camera buffer"
+    finally:
+        cam.disconnect()
+
+def test_grab_image_owns_pixels():
+    for pixel_format in ("Mono8", "BayerRG8"):
+        for mode in ("poll", "callback", "ring"):
+            _check_grab(mode, pixel_format)
+
+def test_grab_multi_light_owns_pixels():
+    for pixel_format in ("Mono8", "BayerRG8"):
+        _check_grab("poll", pixel_format, multi_light=2)
+
+def main():
+    failed = 0
+    for test in (test_grab_image_owns_pixels, test_grab_multi_light_owns_pixels):
+        try:
+            test()
+            print(f"PASS {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"FAIL {test.__name__}: {e}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,11 @@ import tkinter as tk
 from tkinter import ttk, Toplevel
 from PIL import Image, ImageTk
 import threading
-from config import UI_PREVIEW_WIDTH, UI_PREVIEW_HEIGHT, CAMERA_COUNT
+from concurrent.futures import ThreadPoolExecutor
+from config import UI_PREVIEW_WIDTH, UI_PREVIEW_HEIGHT, CAMERA_COUNT, PREVIEW_FPS, PREVIEW_FPS_PER_CAMERA
+from utils.logger import setup_logger
+
+logger = setup_logger("Dashboard")
 
 # Dictionary for status colors
 STATUS_COLORS = {
@@ -25,8 +29,12 @@ class DashboardApp:
         self.on_snap_cb = on_snap
         self.on_confirm_cb = on_confirm
         self.on_retake_cb = on_retake
+        # Preview stop/start and the snap/confirm/retake callbacks block on the cameras:
+        # one worker keeps them off the Tk thread and in click order
+        self.camera_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="UICamera")
         
         self.cam_labels = []
+        self.cam_fps_labels = []
         self.cam_canvases = []
         self.tk_images = [None] * CAMERA_COUNT 
         self.original_images = [None] * CAMERA_COUNT 
@@ -167,6 +175,16 @@ class DashboardApp:
             
             # Use accent color for CAM ID
             tk.Label(header_frame, text=f"CAM {i+1}", font=("Segoe UI", 12, "bold"), bg=self.colors["surface"], fg=self.colors["accent"]).pack(side=tk.LEFT, padx=5)
+
+            # Preview rate: target (adjustable) and the camera's ResultingFrameRate
+            fps_var = tk.StringVar(value=f"{PREVIEW_FPS_PER_CAMERA.get(i+1, PREVIEW_FPS):g}")
+            spn_fps = tk.Spinbox(header_frame, from_=1, to=30, width=3, textvariable=fps_var, font=("Segoe UI", 9),
+                                 command=lambda idx=i, var=fps_var: self.on_preview_fps_change(idx, var))
+            spn_fps.bind("<Return>", lambda e, idx=i, var=fps_var: self.on_preview_fps_change(idx, var))
+            spn_fps.pack(side=tk.RIGHT, padx=5)
+            lbl_fps = tk.Label(header_frame, text="-- fps", font=("Segoe UI", 9), bg=self.colors["surface"], fg=self.colors["text_dim"])
+            lbl_fps.pack(side=tk.RIGHT, padx=5)
+            self.cam_fps_labels.append(lbl_fps)
             
             # Image Preview (Black bg)
             preview_canvas = tk.Canvas(frame, bg="black", highlightthickness=0, cursor="hand2")
@@ -365,7 +383,7 @@ class DashboardApp:
         btn_save.pack(fill=tk.X, ipady=10)
 
     def save_settings_ui(self):
-        from config import save_settings
+        from config import save_settings, load_settings
         from tkinter import messagebox
         
         try:
@@ -387,7 +405,9 @@ class DashboardApp:
             # Load Constants for Dimensions (locked)
             from config import CAMERA_WIDTH, CAMERA_HEIGHT
 
-            payload = {
+            # Start from the stored settings so keys without a UI field survive
+            payload = dict(load_settings())
+            payload.update({
                 "camera_count": new_count,
                 "camera_width": CAMERA_WIDTH, 
                 "camera_height": CAMERA_HEIGHT,
@@ -396,7 +416,7 @@ class DashboardApp:
                 "local_temp_buffer": new_local,
                 "remote_server_storage": new_remote,
                 "camera_ips": new_ips
-            }
+            })
             
             success = save_settings(payload)
             if success:
@@ -417,14 +437,13 @@ class DashboardApp:
             if self.notebook.index("current") != 0: return
         except: pass
         
-        # Stop preview before capturing high-res
-        if self.capture_manager:
-            self.capture_manager.stop_preview()
-            
         self.btn_snap.grid_remove()
         self.btn_retake.grid(row=1, column=0, sticky="nsew", padx=(20, 10), pady=20)
         self.btn_confirm.grid(row=1, column=1, sticky="nsew", padx=(10, 20), pady=20)
-        if self.on_snap_cb: self.on_snap_cb()
+
+        # Stop preview before capturing high-res
+        steps = [self.capture_manager.stop_preview] if self.capture_manager else []
+        self.run_camera_steps(steps + [self.on_snap_cb])
 
     def handle_retake(self):
         try:
@@ -436,10 +455,8 @@ class DashboardApp:
         self.btn_snap.grid(row=1, column=0, columnspan=2, sticky="nsew", padx=20, pady=20)
         
         # Resume preview
-        if self.capture_manager:
-            self.capture_manager.start_preview()
-            
-        if self.on_retake_cb: self.on_retake_cb()
+        steps = [self.capture_manager.start_preview] if self.capture_manager else []
+        self.run_camera_steps(steps + [self.on_retake_cb])
 
     def handle_confirm(self):
         try:
@@ -450,11 +467,24 @@ class DashboardApp:
         self.btn_confirm.grid_remove()
         self.btn_snap.grid(row=1, column=0, columnspan=2, sticky="nsew", padx=20, pady=20)
         
-        if self.on_confirm_cb: self.on_confirm_cb()
-
         # Resume preview after confirm action (which saves files)
+        steps = [self.on_confirm_cb]
         if self.capture_manager:
-            self.capture_manager.start_preview()
+            steps.append(self.capture_manager.start_preview)
+        self.run_camera_steps(steps)
+
+    def run_camera_steps(self, steps):
+        """
+        Run blocking camera calls in order on the camera worker (None entries are skipped).
+        """
+        def run():
+            try:
+                for step in steps:
+                    if step:
+                        step()
+            except Exception as e:
+                logger.error(f"Camera action failed: {e}")
+        self.camera_worker.submit(run)
 
     def update_camera_status(self, index, status_code):
         color_map = {
@@ -478,6 +508,21 @@ class DashboardApp:
         if 0 <= index < len(self.cam_labels):
             self.cam_labels[index].config(text=text, bg=bg_color, fg=fg_color) 
 
+    def on_preview_fps_change(self, index, var):
+        try:
+            fps = float(var.get())
+        except ValueError:
+            return
+        if self.capture_manager and fps > 0:
+            self.capture_manager.set_preview_fps(index + 1, fps)
+
+    def update_camera_fps(self, index, fps):
+        self.root.after(0, lambda: self._set_cam_fps(index, fps))
+
+    def _set_cam_fps(self, index, fps):
+        if 0 <= index < len(self.cam_fps_labels):
+            self.cam_fps_labels[index].config(text=f"{fps:.1f} fps")
+
     def update_camera_image(self, index, pil_image):
         self.root.after(0, lambda: self._set_cam_image(index, pil_image))
 
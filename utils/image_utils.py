@@ -34,7 +34,7 @@ def overlay_timestamp(image, camera_id=None):
     
     # Outline/Shadow
     outline_color = "black"
-    text_color = "#00FF00" # Green
+    text_color = "#00FF00" if image.mode == "RGB" else 255 # Green, white on Mono8 ("L") images
     
     # draw.text((x, y), text, font=font, fill=text_color, stroke_width=stroke_width, stroke_fill=outline_color)
     # Fallback to simple text due to "raster overflow" error in some PIL versions with large images